@@ -0,0 +1,121 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# Benchmark of MegaMini geometry node group variants (see GEO_NODES_VARIANT_GROUPS in geo_nodes.py), on a high resolution UV sphere.
+# Run from the repository folder with:
+#     blender -b --python benchmarks/geo_nodes_benchmark.py -- [segments] [repeat_count]
+# Each variant is evaluated repeat_count times (an input value is changed before each evaluation, so the modifier is
+# re-evaluated), and evaluated vertex positions of the variants are compared.
+
+import os
+import sys
+import time
+
+import bpy
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mega_mini.geo_nodes import GEO_NODES_VARIANT_GROUPS
+
+# input values for MegaMini node group, by input index
+BENCHMARK_INPUT_VALUES = {
+    1: 0.5,                 # FP Power
+    2: 0.25,                # FP Min Dist
+    3: 0.01,                # FP Min Scale
+    4: 1.5,                 # Place Scale Mult
+    5: (3.0, -2.0, 1.0),    # Place Loc
+    6: (0.1, 0.2, 0.3),     # Place Rot
+    7: (1.0, 2.0, 0.5),     # Place Scale
+    8: (0.5, 4.0, -1.0),    # Object Loc
+    9: (-0.3, 0.4, 0.5),    # Object Rot
+    10: (2.0, 1.0, 1.5),    # Object Scale
+}
+
+def create_sphere(segments):
+    bpy.ops.object.select_all(action='DESELECT')
+    bpy.ops.mesh.primitive_uv_sphere_add(segments=segments, ring_count=segments//2, radius=10.0)
+    return bpy.context.active_object
+
+def create_benchmark_node_group(variant):
+    mega_mini_group_name, create_func = GEO_NODES_VARIANT_GROUPS[variant]
+    mega_mini_group = create_func(mega_mini_group_name)
+    node_group = bpy.data.node_groups.new(name="Benchmark:"+variant, type='GeometryNodeTree')
+    node_group.inputs.new(type='NodeSocketGeometry', name="Geometry")
+    node_group.outputs.new(type='NodeSocketGeometry', name="Geometry")
+    tree_nodes = node_group.nodes
+    tree_nodes.clear()
+    group_input = tree_nodes.new(type="NodeGroupInput")
+    group_output = tree_nodes.new(type="NodeGroupOutput")
+    group_node = tree_nodes.new(type="GeometryNodeGroup")
+    group_node.name = "MegaMiniGeoNodeGroup"
+    group_node.node_tree = mega_mini_group
+    for index, value in BENCHMARK_INPUT_VALUES.items():
+        group_node.inputs[index].default_value = value
+    node_group.links.new(group_input.outputs[0], group_node.inputs[0])
+    node_group.links.new(group_node.outputs[0], group_output.inputs[0])
+    return node_group
+
+def get_evaluated_positions(ob):
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    mesh = ob.evaluated_get(depsgraph).data
+    positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", positions)
+    return positions.reshape(-1, 3)
+
+def benchmark_variant(ob, variant, repeat_count):
+    geo_nodes_mod = ob.modifiers.new(name="Benchmark", type='NODES')
+    geo_nodes_mod.node_group = create_benchmark_node_group(variant)
+    group_node = geo_nodes_mod.node_group.nodes["MegaMiniGeoNodeGroup"]
+    # first evaluation is not timed
+    positions = get_evaluated_positions(ob)
+    times = []
+    for i in range(repeat_count):
+        # change FP Min Scale by a tiny amount, so the modifier is evaluated again
+        group_node.inputs[3].default_value = BENCHMARK_INPUT_VALUES[3] + (i % 2) * 1e-6
+        start = time.perf_counter()
+        get_evaluated_positions(ob)
+        times.append(time.perf_counter() - start)
+    group_node.inputs[3].default_value = BENCHMARK_INPUT_VALUES[3]
+    positions = get_evaluated_positions(ob)
+    ob.modifiers.remove(geo_nodes_mod)
+    return times, positions
+
+def main():
+    argv = sys.argv[sys.argv.index("--")+1:] if "--" in sys.argv else []
+    segments = int(argv[0]) if len(argv) > 0 else 1024
+    repeat_count = int(argv[1]) if len(argv) > 1 else 10
+
+    ob = create_sphere(segments)
+    print("MegaMini geo nodes benchmark, vertex count: " + str(len(ob.data.vertices)) + ", repeat count: " +
+          str(repeat_count))
+    results = {}
+    for variant in GEO_NODES_VARIANT_GROUPS:
+        times, positions = benchmark_variant(ob, variant, repeat_count)
+        results[variant] = positions
+        print("%-10s  min: %8.2f ms  mean: %8.2f ms" % (variant, min(times) * 1000.0,
+                                                         sum(times) / len(times) * 1000.0))
+    max_coord = np.abs(results['STANDARD']).max()
+    for variant in GEO_NODES_VARIANT_GROUPS:
+        if variant == 'STANDARD':
+            continue
+        max_diff = np.abs(results['STANDARD'] - results[variant]).max()
+        print("Max position difference (STANDARD vs. " + variant + "): " + str(max_diff) + ", max coordinate: " +
+              str(max_coord))
+
+main()
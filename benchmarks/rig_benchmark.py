@@ -0,0 +1,154 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# Benchmark suite for MegaMini rig creation, attach, geometry nodes, frame evaluation, and .blend save/load, with
+# synthetic scenes of many Places. Run from the repository folder with:
+#     blender -b --python benchmarks/rig_benchmark.py -- [--counts 10 100 1000 10000] [--frames 20]
+#         [--output mega_mini_benchmark.json] [--no-geo-nodes]
+# Results are written to a JSON file, so results of different versions can be compared.
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import bpy
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import mega_mini
+from mega_mini.rig import (OBSERVER_BNAME, create_mega_mini_armature)
+
+if bpy.app.version < (2,80,0):
+    from mega_mini.imp_v27 import (select_object, set_active_object, link_object_to_scene)
+else:
+    from mega_mini.imp_v28 import (select_object, set_active_object, link_object_to_scene)
+
+def get_args():
+    argv = sys.argv[sys.argv.index("--")+1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="MegaMini benchmark suite")
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000, 10000],
+                        help="Number of Places in each synthetic scene")
+    parser.add_argument("--frames", type=int, default=20, help="Number of frames to evaluate in each scene")
+    parser.add_argument("--output", default="mega_mini_benchmark.json", help="JSON output file path")
+    parser.add_argument("--no-geo-nodes", action="store_true", help="Do not benchmark Add Geometry Nodes")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for object locations")
+    return parser.parse_args(argv)
+
+# run 'func', and store its duration (seconds) in 'result' with key 'name', or store the error if 'func' fails
+def time_step(result, name, func):
+    start = time.perf_counter()
+    try:
+        func()
+    except Exception as e:
+        result[name + "_error"] = str(e)
+        return False
+    result[name] = time.perf_counter() - start
+    return True
+
+def reset_scene():
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+
+def create_objects(context, count, rng):
+    mesh = bpy.data.meshes.new("BenchmarkMesh")
+    mesh.from_pydata([(-1, -1, 0), (1, -1, 0), (1, 1, 0), (-1, 1, 0)], [], [(0, 1, 2, 3)])
+    obs = []
+    for i in range(count):
+        ob = bpy.data.objects.new("BenchmarkObject", mesh)
+        ob.location = (rng.uniform(-1e6, 1e6), rng.uniform(-1e6, 1e6), rng.uniform(-1e5, 1e5))
+        link_object_to_scene(context, ob)
+        obs.append(ob)
+    return obs
+
+def select_attach_objects(context, obs, mega_mini_rig):
+    for ob in context.scene.objects:
+        select_object(ob, False)
+    for ob in obs:
+        select_object(ob, True)
+    select_object(mega_mini_rig, True)
+    set_active_object(context, mega_mini_rig)
+
+def benchmark_place_count(count, args, rng):
+    result = { "place_count": count }
+    reset_scene()
+    context = bpy.context
+    scene = context.scene
+
+    if not time_step(result, "create_rig", lambda: create_mega_mini_armature(context, 1000.0, 0.5, 0.0, 0.0)):
+        return result
+    mega_mini_rig = context.active_object
+    obs = create_objects(context, count, rng)
+
+    select_attach_objects(context, obs, mega_mini_rig)
+    if not time_step(result, "attach_multi_place", lambda: bpy.ops.mega_mini.attach_multi_place()):
+        return result
+    result["driver_count"] = 0 if mega_mini_rig.animation_data is None else \
+        len(mega_mini_rig.animation_data.drivers)
+
+    if not args.no_geo_nodes and bpy.app.version >= (2,90,0):
+        for ob in context.scene.objects:
+            select_object(ob, ob in obs)
+        time_step(result, "add_geo_nodes", lambda: bpy.ops.mega_mini.add_geo_nodes())
+
+    # animate Observer, so every frame changes all Places
+    pb_observer = mega_mini_rig.pose.bones[OBSERVER_BNAME]
+    scene.frame_start = 1
+    scene.frame_end = args.frames
+    for frame, loc in [(1, (0.0, 0.0, 0.0)), (args.frames, (5e5, 5e5, 0.0))]:
+        pb_observer.location = loc
+        pb_observer.keyframe_insert("location", frame=frame)
+    def evaluate_frames():
+        for frame in range(1, args.frames + 1):
+            scene.frame_set(frame)
+    if time_step(result, "frames_total", evaluate_frames):
+        result["frame_mean"] = result["frames_total"] / args.frames
+
+    filepath = os.path.join(tempfile.gettempdir(), "mega_mini_benchmark_" + str(count) + ".blend")
+    time_step(result, "save", lambda: bpy.ops.wm.save_as_mainfile(filepath=filepath))
+    time_step(result, "load", lambda: bpy.ops.wm.open_mainfile(filepath=filepath))
+    if os.path.exists(filepath):
+        result["file_size"] = os.path.getsize(filepath)
+        os.remove(filepath)
+    return result
+
+def main():
+    args = get_args()
+    rng = random.Random(args.seed)
+    mega_mini.register()
+    results = []
+    try:
+        for count in args.counts:
+            result = benchmark_place_count(count, args, rng)
+            print("MegaMini benchmark: " + json.dumps(result))
+            results.append(result)
+    finally:
+        mega_mini.unregister()
+    with open(args.output, "w") as f:
+        json.dump({
+            "blender_version": bpy.app.version_string,
+            "mega_mini_version": ".".join([ str(v) for v in mega_mini.bl_info["version"] ]),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "frames": args.frames,
+            "results": results,
+        }, f, indent=2)
+    print("MegaMini benchmark results written to: " + args.output)
+
+main()
@@ -16,7 +16,7 @@
 #
 # ##### END GPL LICENSE BLOCK #####
 
-# TODO: show current MegaMini rig stats, including bones by way of list box
+# TODO: show current MegaMini rig bones by way of list box
 
 bl_info = {
     "name": "Mega Mini",
@@ -32,10 +32,29 @@ bl_info = {
 import bpy
 from bpy.props import PointerProperty
 
-from .rig import (OBJ_PROP_SCALE, OBJ_PROP_FP_POWER, OBJ_PROP_FP_MIN_DIST, OBJ_PROP_FP_MIN_SCALE, OBJ_PROP_BONE_SCL_MULT)
-from .rig import (MEGAMINI_CreateMegaMiniRig, is_mega_mini_rig)
+from .rig import (OBJ_PROP_SCALE, OBJ_PROP_FP_POWER, OBJ_PROP_FP_MIN_DIST, OBJ_PROP_FP_MIN_SCALE, OBJ_PROP_BONE_SCL_MULT,
+    OBJ_PROP_USE_SOLVER, OBJ_PROP_USE_CULL, OBJ_PROP_CULL_MIN_SCALE, OBJ_PROP_BAKED,
+    OBJ_PROP_USE_TRAJECTORY)
+from .rig import (MEGAMINI_CreateMegaMiniRig, MEGAMINI_DedupWidgets, is_mega_mini_rig,
+    rig_index_depsgraph_update_post, rig_index_clear_handler)
 from .attach import (MEGAMINI_AttachCreatePlace, MEGAMINI_AttachSinglePlace, MEGAMINI_AttachMultiPlace)
 from .geo_nodes import MEGAMINI_AddGeoNodes
+from .instances import MEGAMINI_AttachInstances
+from .catalog import (MEGAMINI_ImportCatalog, CATALOG_IMPORT_MODE_ITEMS)
+from .solver import (MEGAMINI_SolverEnable, MEGAMINI_SolverDisable, solver_frame_change_post,
+    solver_depsgraph_update_post, solver_load_post)
+from .actual_loc import (MEGAMINI_ActualLocStore, MEGAMINI_ActualLocUpdate)
+from .rescale import MEGAMINI_RescaleRig
+from .trajectory import (MEGAMINI_TrajectoryAddKepler, MEGAMINI_TrajectoryLoadEphemeris, MEGAMINI_TrajectoryClear,
+    MEGAMINI_TrajectoryRefresh, trajectory_frame_change_pre, trajectory_load_post)
+from .lod import (MEGAMINI_LodAddLevel, MEGAMINI_LodClearLevels, lod_frame_change_post, lod_depsgraph_update_post,
+    lod_load_post, get_lod_levels)
+from .driver_audit import (MEGAMINI_DriverAudit, MEGAMINI_DriverFix)
+from .profiler import (MEGAMINI_UpdateRigStats, MEGAMINI_MeasureRigDriverTime, draw_rig_profile,
+    profile_pre_handler, profile_post_handler, profile_load_post)
+from .bake import (MEGAMINI_BakeRig, MEGAMINI_UnbakeRig)
+from .cull import (MEGAMINI_CullEnable, MEGAMINI_CullDisable, cull_frame_change_post, cull_depsgraph_update_post,
+    cull_load_post)
 
 if bpy.app.version < (2,80,0):
     Region = "TOOLS"
@@ -59,6 +78,9 @@ class MEGAMINI_PT_Rig(bpy.types.Panel):
         box.prop(scn, "MegaMini_NewObserverFP_Power")
         box.prop(scn, "MegaMini_NewObserverFP_MinDist")
         box.prop(scn, "MegaMini_NewObserverFP_MinScale")
+        box = layout.box()
+        box.label(text="Widgets")
+        box.operator("mega_mini.dedup_widgets")
 
 class MEGAMINI_PT_Attach(bpy.types.Panel):
     bl_label = "Attach"
@@ -74,8 +96,23 @@ class MEGAMINI_PT_Attach(bpy.types.Panel):
         box.operator("mega_mini.create_proxy_place")
         box.operator("mega_mini.attach_single_place")
         box.operator("mega_mini.attach_multi_place")
+        if bpy.app.version >= (2,90,0):
+            box.operator("mega_mini.attach_instances")
         box.prop(scn, "MegaMini_AttachPreCreateRig")
         box.prop(scn, "MegaMini_AttachNoReParent")
+        box = layout.box()
+        box.label(text="Catalog")
+        box.operator("mega_mini.import_catalog")
+        box.prop(scn, "MegaMini_CatalogFilepath")
+        box.prop(scn, "MegaMini_CatalogImportMode")
+        if bpy.app.version >= (2,80,0):
+            box.prop(scn, "MegaMini_CatalogInstanceCollection")
+        box.prop(scn, "MegaMini_CatalogChunkSize")
+        box.prop(scn, "MegaMini_CatalogPositionScale")
+        row = box.row()
+        row.prop(scn, "MegaMini_CatalogColumnX")
+        row.prop(scn, "MegaMini_CatalogColumnY")
+        row.prop(scn, "MegaMini_CatalogColumnZ")
 
 class MEGAMINI_PT_GeoNodes(bpy.types.Panel):
     bl_label = "Geometry Nodes"
@@ -89,11 +126,35 @@ class MEGAMINI_PT_GeoNodes(bpy.types.Panel):
         box = layout.box()
         box.operator("mega_mini.add_geo_nodes")
         box.prop(scn, "MegaMini_GeoNodesOverrideCreate")
+        box.prop(scn, "MegaMini_GeoNodesUseObjectInfo")
+        box.prop(scn, "MegaMini_GeoNodesGroupVariant")
         box.prop(scn, "MegaMini_GeoNodesCreateUseAltGroup")
         col = box.column()
         col.active = scn.MegaMini_GeoNodesCreateUseAltGroup
         col.prop(scn, "MegaMini_GeoNodesCreateAltGroup")
 
+class MEGAMINI_PT_Lod(bpy.types.Panel):
+    bl_label = "LOD"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = Region
+    bl_category = "MegaMini"
+
+    def draw(self, context):
+        scn = context.scene
+        active_ob = context.active_object
+        layout = self.layout
+        box = layout.box()
+        box.label(text="Active Object LOD Levels")
+        if active_ob != None:
+            for level in get_lod_levels(active_ob):
+                mesh = level.get("mesh")
+                box.label(text=str(level["min_scale"]) + ": " + ("None" if mesh is None else mesh.name))
+        box.operator("mega_mini.lod_add_level")
+        box.operator("mega_mini.lod_clear_levels")
+        box.prop(scn, "MegaMini_LodMinScale")
+        box.prop(scn, "MegaMini_LodUseMaterial")
+        box.prop(scn, "MegaMini_LodSubsurfLevels")
+
 class MEGAMINI_PT_ActiveRig(bpy.types.Panel):
     bl_label = "Active Rig"
     bl_space_type = "VIEW_3D"
@@ -105,7 +166,7 @@ class MEGAMINI_PT_ActiveRig(bpy.types.Panel):
         # display panel only if active object is a MegaMini Rig
         if not is_mega_mini_rig(active_ob):
             return
-        #scn = context.scene
+        scn = context.scene
         layout = self.layout
         box = layout.box()
         # https://blender.stackexchange.com/questions/148924/add-custom-property-to-panel
@@ -113,14 +174,67 @@ class MEGAMINI_PT_ActiveRig(bpy.types.Panel):
         box.prop(active_ob, '["'+OBJ_PROP_FP_POWER+'"]')
         box.prop(active_ob, '["'+OBJ_PROP_FP_MIN_DIST+'"]')
         box.prop(active_ob, '["'+OBJ_PROP_FP_MIN_SCALE+'"]')
+        box = layout.box()
+        box.label(text="Solver")
+        if active_ob.get(OBJ_PROP_USE_SOLVER, False):
+            box.operator("mega_mini.solver_disable")
+        else:
+            box.operator("mega_mini.solver_enable")
+        box = layout.box()
+        box.label(text="Culling")
+        if active_ob.get(OBJ_PROP_USE_CULL, False):
+            box.operator("mega_mini.cull_disable")
+            box.prop(active_ob, '["'+OBJ_PROP_CULL_MIN_SCALE+'"]')
+        else:
+            box.operator("mega_mini.cull_enable")
+        box = layout.box()
+        box.label(text="Trajectory")
+        if OBJ_PROP_USE_TRAJECTORY in active_ob:
+            box.prop(active_ob, '["'+OBJ_PROP_USE_TRAJECTORY+'"]')
+            box.operator("mega_mini.trajectory_refresh")
+        box.prop_search(scn, "MegaMini_TrajectoryCenter", active_ob.data, "bones")
+        box.operator("mega_mini.trajectory_add_kepler")
+        box.prop(scn, "MegaMini_KeplerSemiMajorAxis")
+        box.prop(scn, "MegaMini_KeplerEccentricity")
+        box.prop(scn, "MegaMini_KeplerInclination")
+        box.prop(scn, "MegaMini_KeplerAscendingNode")
+        box.prop(scn, "MegaMini_KeplerArgPeriapsis")
+        box.prop(scn, "MegaMini_KeplerMeanAnomaly")
+        box.prop(scn, "MegaMini_KeplerEpoch")
+        box.prop(scn, "MegaMini_KeplerPeriod")
+        box.operator("mega_mini.trajectory_load_ephemeris")
+        box.prop(scn, "MegaMini_EphemerisFilepath")
+        box.prop(scn, "MegaMini_EphemerisStartFrame")
+        box.prop(scn, "MegaMini_EphemerisFrameStep")
+        box.operator("mega_mini.trajectory_clear")
+        box = layout.box()
+        box.label(text="Rescale")
+        box.prop(context.scene, "MegaMini_RescaleNewScale")
+        box.operator("mega_mini.rescale_rig")
+        box = layout.box()
+        box.label(text="Actual Locations")
+        box.operator("mega_mini.actual_loc_store")
+        box.operator("mega_mini.actual_loc_update")
+        draw_rig_profile(layout, context.scene, active_ob)
+        box = layout.box()
+        box.label(text="Drivers")
+        box.operator("mega_mini.driver_audit")
+        box.operator("mega_mini.driver_fix")
+        box = layout.box()
+        box.label(text="Bake")
+        box.operator("mega_mini.bake_rig")
+        if active_ob.get(OBJ_PROP_BAKED, False):
+            box.operator("mega_mini.unbake_rig")
 
 classes = [
     MEGAMINI_PT_Rig,
     MEGAMINI_PT_Attach,
     MEGAMINI_CreateMegaMiniRig,
+    MEGAMINI_DedupWidgets,
     MEGAMINI_AttachCreatePlace,
     MEGAMINI_AttachMultiPlace,
     MEGAMINI_AttachSinglePlace,
+    MEGAMINI_ImportCatalog,
 ]
 # geometry node support is only for Blender v2.9+ (or maybe v3.0+ ...)
 # TODO: check what version is needed for current geometry nodes setup
@@ -128,22 +242,74 @@ if bpy.app.version >= (2,90,0):
     classes.extend([
         MEGAMINI_PT_GeoNodes,
         MEGAMINI_AddGeoNodes,
+        MEGAMINI_AttachInstances,
     ])
 classes.extend([
+    MEGAMINI_PT_Lod,
+    MEGAMINI_LodAddLevel,
+    MEGAMINI_LodClearLevels,
     MEGAMINI_PT_ActiveRig,
+    MEGAMINI_SolverEnable,
+    MEGAMINI_SolverDisable,
+    MEGAMINI_CullEnable,
+    MEGAMINI_CullDisable,
+    MEGAMINI_ActualLocStore,
+    MEGAMINI_ActualLocUpdate,
+    MEGAMINI_RescaleRig,
+    MEGAMINI_TrajectoryAddKepler,
+    MEGAMINI_TrajectoryLoadEphemeris,
+    MEGAMINI_TrajectoryClear,
+    MEGAMINI_TrajectoryRefresh,
+    MEGAMINI_BakeRig,
+    MEGAMINI_UnbakeRig,
+    MEGAMINI_DriverAudit,
+    MEGAMINI_DriverFix,
+    MEGAMINI_UpdateRigStats,
+    MEGAMINI_MeasureRigDriverTime,
 ])
 
 def register():
     for cls in classes:
         bpy.utils.register_class(cls)
     register_props()
+    register_handlers()
 
 def unregister():
+    unregister_handlers()
     for cls in classes:
         bpy.utils.unregister_class(cls)
+    bts = bpy.types.Scene
+    del bts.MegaMini_EphemerisFrameStep
+    del bts.MegaMini_EphemerisStartFrame
+    del bts.MegaMini_EphemerisFilepath
+    del bts.MegaMini_KeplerPeriod
+    del bts.MegaMini_KeplerEpoch
+    del bts.MegaMini_KeplerMeanAnomaly
+    del bts.MegaMini_KeplerArgPeriapsis
+    del bts.MegaMini_KeplerAscendingNode
+    del bts.MegaMini_KeplerInclination
+    del bts.MegaMini_KeplerEccentricity
+    del bts.MegaMini_KeplerSemiMajorAxis
+    del bts.MegaMini_TrajectoryCenter
+    del bts.MegaMini_RescaleNewScale
+    del bts.MegaMini_ProfileEnable
+    del bts.MegaMini_LodSubsurfLevels
+    del bts.MegaMini_LodUseMaterial
+    del bts.MegaMini_LodMinScale
     del bts.MegaMini_GeoNodesCreateAltGroup
     del bts.MegaMini_GeoNodesCreateUseAltGroup
+    del bts.MegaMini_GeoNodesGroupVariant
+    del bts.MegaMini_GeoNodesUseObjectInfo
     del bts.MegaMini_GeoNodesOverrideCreate
+    if bpy.app.version >= (2,80,0):
+        del bts.MegaMini_CatalogInstanceCollection
+    del bts.MegaMini_CatalogColumnZ
+    del bts.MegaMini_CatalogColumnY
+    del bts.MegaMini_CatalogColumnX
+    del bts.MegaMini_CatalogPositionScale
+    del bts.MegaMini_CatalogChunkSize
+    del bts.MegaMini_CatalogImportMode
+    del bts.MegaMini_CatalogFilepath
     del bts.MegaMini_AttachNoReParent
     del bts.MegaMini_AttachPreCreateRig
     del bts.MegaMini_NewObserverFP_MinScale
@@ -151,6 +317,62 @@ def unregister():
     del bts.MegaMini_NewObserverFP_Power
     del bts.MegaMini_NewObserverScale
 
+def get_handler_lists():
+    handlers = bpy.app.handlers
+    handler_lists = [
+        (handlers.load_post, rig_index_clear_handler),
+        (handlers.undo_post, rig_index_clear_handler),
+        (handlers.redo_post, rig_index_clear_handler),
+        # culling is before Solver, so Solver skips newly culled Places
+        (handlers.frame_change_post, cull_frame_change_post),
+        (handlers.frame_change_post, solver_frame_change_post),
+        # LOD is after Solver, so LOD uses new Place scales
+        (handlers.frame_change_post, lod_frame_change_post),
+        (handlers.load_post, cull_load_post),
+        (handlers.load_post, lod_load_post),
+        (handlers.load_post, trajectory_load_post),
+        # trajectory ProxyPlace locations are written before scene is evaluated
+        (handlers.frame_change_pre, trajectory_frame_change_pre),
+        (handlers.load_post, solver_load_post),
+        (handlers.load_post, profile_load_post),
+        # profile handlers are first in 'pre' lists and last in 'post' lists, to include time of other handlers
+        (handlers.frame_change_post, profile_post_handler),
+    ]
+    # depsgraph update handler is only available in Blender v2.8+
+    if bpy.app.version >= (2,80,0):
+        handler_lists.extend([
+            (handlers.depsgraph_update_post, rig_index_depsgraph_update_post),
+            (handlers.depsgraph_update_post, cull_depsgraph_update_post),
+            (handlers.depsgraph_update_post, solver_depsgraph_update_post),
+            (handlers.depsgraph_update_post, lod_depsgraph_update_post),
+            (handlers.depsgraph_update_post, profile_post_handler),
+        ])
+    # else rig index cannot be cached in Blender v2.7, because changes to objects cannot be detected
+    else:
+        handler_lists.append((handlers.scene_update_post, rig_index_clear_handler))
+    return handler_lists
+
+# handlers that must run before other handlers in the same list
+def get_first_handler_lists():
+    handlers = bpy.app.handlers
+    handler_lists = [ (handlers.frame_change_pre, profile_pre_handler) ]
+    if bpy.app.version >= (2,81,0):
+        handler_lists.append((handlers.depsgraph_update_pre, profile_pre_handler))
+    return handler_lists
+
+def register_handlers():
+    for handler_list, func in get_first_handler_lists():
+        if func not in handler_list:
+            handler_list.insert(0, func)
+    for handler_list, func in get_handler_lists():
+        if func not in handler_list:
+            handler_list.append(func)
+
+def unregister_handlers():
+    for handler_list, func in get_first_handler_lists() + get_handler_lists():
+        if func in handler_list:
+            handler_list.remove(func)
+
 def only_geo_node_group_poll(self, object):
     return object.type == 'GEOMETRY'
 
@@ -179,13 +401,84 @@ def register_props():
         "have a parent object will not be 're-parented' to the MegaMini Rig. Only the 'root parents', and " +
         "non-parented objects will be attached to MegeMini rig", default=True)
 
+    bts.MegaMini_CatalogFilepath = bp.StringProperty(name="Catalog File", description="Catalog file to import, " +
+        "CSV (first row is column names) or NumPy .npy (2D array with columns x, y, z, and optional bone scale " +
+        "multiplier and instance index)", subtype='FILE_PATH', default="")
+    bts.MegaMini_CatalogImportMode = bp.EnumProperty(name="Import Mode", description="Create Places (bones) or " +
+        "instanced points for catalog rows", items=CATALOG_IMPORT_MODE_ITEMS, default='PLACES')
+    bts.MegaMini_CatalogChunkSize = bp.IntProperty(name="Chunk Size", description="Number of catalog rows read " +
+        "and created at a time. In Instances mode, one instances object is created per chunk", default=10000, min=1)
+    bts.MegaMini_CatalogPositionScale = bp.FloatProperty(name="Position Scale", description="Catalog positions " +
+        "are multiplied by this value before conversion to Proxy coordinates, e.g. to convert catalog units to " +
+        "scene units", default=1.0)
+    bts.MegaMini_CatalogColumnX = bp.StringProperty(name="X", description="Name of catalog CSV column with X " +
+        "position", default="x")
+    bts.MegaMini_CatalogColumnY = bp.StringProperty(name="Y", description="Name of catalog CSV column with Y " +
+        "position", default="y")
+    bts.MegaMini_CatalogColumnZ = bp.StringProperty(name="Z", description="Name of catalog CSV column with Z " +
+        "position", default="z")
+    if bpy.app.version >= (2,80,0):
+        bts.MegaMini_CatalogInstanceCollection = bp.PointerProperty(name="Instance Collection",
+            description="Objects in this collection are instanced on catalog points, in Instances import mode",
+            type=bpy.types.Collection)
+
     bts.MegaMini_GeoNodesOverrideCreate = bp.BoolProperty(name="Override Create", description="MegaMini Geometry " +
         "Nodes custom node group is re-created when geometry nodes are added to object(s), and any previous custom " +
         "group with the same name is deprecated", default=False)
+    bts.MegaMini_GeoNodesUseObjectInfo = bp.BoolProperty(name="Use Object Info", description="Object world " +
+        "transform is read by Self Object and Object Info nodes, instead of by drivers. Requires Blender 3.4 or " +
+        "later", default=False)
+    bts.MegaMini_GeoNodesGroupVariant = bp.EnumProperty(name="Group Variant", description="MegaMini Geometry " +
+        "Nodes custom node group to use", items=[
+        ('STANDARD', "Standard", "Standard node group, with Object and Place transforms done and undone per vertex"),
+        ('FUSED', "Fused", "Faster node group, with Object and Place transforms composed once per evaluation, " +
+         "so less math is done per vertex"),
+        ('PER_POINT', "Per Point", "Same as Fused, and instances and point cloud radii are also scaled by " +
+         "forced perspective scale of each point. Use with large point clouds / instances, e.g. star fields"),
+        ], default='STANDARD')
     bts.MegaMini_GeoNodesCreateUseAltGroup = bp.BoolProperty(name="Use Alt Group", description="Add MegaMini Geo " +
         "node group to alternate geometry node group", default=False)
     bts.MegaMini_GeoNodesCreateAltGroup = bp.PointerProperty(name="Group Name", type=bpy.types.NodeTree,
         poll=only_geo_node_group_poll)
 
+    bts.MegaMini_TrajectoryCenter = bp.StringProperty(name="Center", description="Place (or ProxyPlace) bone " +
+        "that trajectory positions are relative to, e.g. planet of a moon. Leave empty for no center Place",
+        default="")
+    bts.MegaMini_KeplerSemiMajorAxis = bp.FloatProperty(name="Semi-major Axis", description="Kepler orbit " +
+        "semi-major axis, in actual units (not Proxy units)", default=1000.0, min=0.0)
+    bts.MegaMini_KeplerEccentricity = bp.FloatProperty(name="Eccentricity", description="Kepler orbit " +
+        "eccentricity, zero for circular orbit", default=0.0, min=0.0, max=0.999)
+    bts.MegaMini_KeplerInclination = bp.FloatProperty(name="Inclination", description="Kepler orbit inclination",
+        default=0.0, subtype='ANGLE')
+    bts.MegaMini_KeplerAscendingNode = bp.FloatProperty(name="Ascending Node", description="Kepler orbit " +
+        "longitude of ascending node", default=0.0, subtype='ANGLE')
+    bts.MegaMini_KeplerArgPeriapsis = bp.FloatProperty(name="Arg. of Periapsis", description="Kepler orbit " +
+        "argument of periapsis", default=0.0, subtype='ANGLE')
+    bts.MegaMini_KeplerMeanAnomaly = bp.FloatProperty(name="Mean Anomaly", description="Kepler orbit mean " +
+        "anomaly at Epoch frame", default=0.0, subtype='ANGLE')
+    bts.MegaMini_KeplerEpoch = bp.FloatProperty(name="Epoch", description="Frame of Kepler orbit Mean Anomaly",
+        default=0.0)
+    bts.MegaMini_KeplerPeriod = bp.FloatProperty(name="Period", description="Kepler orbit period, in frames",
+        default=250.0, min=0.0)
+    bts.MegaMini_EphemerisFilepath = bp.StringProperty(name="Ephemeris File", description="Ephemeris file to " +
+        "load, CSV or NumPy .npy, with one row per sample of actual position (uses Catalog column and position " +
+        "scale options)", subtype='FILE_PATH', default="")
+    bts.MegaMini_EphemerisStartFrame = bp.FloatProperty(name="Start Frame", description="Frame of first " +
+        "ephemeris sample", default=1.0)
+    bts.MegaMini_EphemerisFrameStep = bp.FloatProperty(name="Frame Step", description="Number of frames " +
+        "between ephemeris samples", default=1.0, min=0.0)
+    bts.MegaMini_RescaleNewScale = bp.FloatProperty(name="New Scale", description="New mega_mini_scale value " +
+        "for Rescale Rig", default=1000.0, min=0.0)
+    bts.MegaMini_ProfileEnable = bp.BoolProperty(name="Profile", description="Measure scene evaluation time, " +
+        "and geometry nodes modifier time of active MegaMini Rig, every time scene is evaluated", default=False)
+    bts.MegaMini_LodMinScale = bp.FloatProperty(name="LOD Min Scale", description="New LOD level is used when " +
+        "Place scale is greater than or equal to this value", default=0.0, min=0.0)
+    bts.MegaMini_LodUseMaterial = bp.BoolProperty(name="Use Material", description="New LOD level includes " +
+        "active object's active material, which will replace object's first material when LOD level is used",
+        default=False)
+    bts.MegaMini_LodSubsurfLevels = bp.IntProperty(name="Subsurf Levels", description="Viewport and render " +
+        "levels of object's Subdivision Surface modifiers when new LOD level is used. Set to -1 to not change " +
+        "Subdivision Surface levels", default=-1, min=-1)
+
 if __name__ == "__main__":
     register()
@@ -0,0 +1,140 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# Double precision actual location store: Blender transforms are single precision (float32), which is not enough for
+# e.g. solar system distances, so the actual location of each Place (offset from Observer, in actual space) can be
+# stored in the Place pose bone's 'mega_mini_actual_loc' custom property - a double precision array. When stored, the
+# actual location is the source of truth, and the ProxyPlace location is derived from it (actual location divided by
+# mega_mini_scale) in double precision, for all Places of a rig at once, by the Update Proxy Locations operator or the
+# Rescale Rig operator (see rescale.py). Derivation is never automatic, because mega_mini_scale may be animated, and
+# changing only mega_mini_scale does not rescale the other Proxy bones.
+# The rig's 'mega_mini_actual_loc_scale' custom property is the mega_mini_scale used for the last derivation.
+
+import bpy
+import numpy as np
+
+from .rig import (OBJ_PROP_SCALE, OBJ_PROP_ACTUAL_LOC, OBJ_PROP_ACTUAL_LOC_SCALE, is_mega_mini_rig,
+    get_mega_mini_rig_places)
+from .keyframes import (KEYFRAME_ATTRS, get_bone_fcurves, get_fcurves_keyframe_counts, read_fcurves_keyframes,
+    write_fcurves_keyframes, update_fcurves)
+
+# returns (place_bnames, proxy_place_bnames, actual_locs) for Places with actual location stored, actual_locs is
+# array of shape (N, 3) and type float64
+def get_rig_actual_locs(mega_mini_rig):
+    pose_bones = mega_mini_rig.pose.bones
+    place_bnames = []
+    proxy_place_bnames = []
+    actual_locs = []
+    for place_bname, proxy_place_bname, _ in get_mega_mini_rig_places(mega_mini_rig):
+        actual_loc = pose_bones[place_bname].get(OBJ_PROP_ACTUAL_LOC)
+        if actual_loc is None:
+            continue
+        place_bnames.append(place_bname)
+        proxy_place_bnames.append(proxy_place_bname)
+        actual_locs.append(actual_loc.to_list())
+    return place_bnames, proxy_place_bnames, np.array(actual_locs, dtype=np.float64).reshape(-1, 3)
+
+# set location keyframe values of ProxyPlace bones that have only one location keyframe (e.g. the keyframe inserted
+# when the Place was created), returns set of bone names that have more than one location keyframe (i.e. animated)
+def set_single_location_keyframes(armature, bname_locs):
+    fcurves = get_bone_fcurves(armature, [ bname for bname, _ in bname_locs ])
+    counts = get_fcurves_keyframe_counts(fcurves)
+    animated = (counts > 1).reshape(-1, 3).any(axis=1)
+    animated_bnames = set([ bname for (bname, _), is_animated in zip(bname_locs, animated.tolist()) if is_animated ])
+    # only F-Curves with one keyframe are changed
+    single = counts == 1
+    fcurves = [ fc for fc, is_single in zip(fcurves, single.tolist()) if is_single ]
+    if len(fcurves) == 0:
+        return animated_bnames
+    locs = np.array([ loc for _, loc in bname_locs ], dtype=np.float64).reshape(-1)[single]
+    counts = counts[single]
+    for attr_name in KEYFRAME_ATTRS:
+        values, _ = read_fcurves_keyframes(fcurves, attr_name, counts)
+        values[:, 1] = locs
+        write_fcurves_keyframes(fcurves, counts, values, attr_name)
+    update_fcurves(fcurves)
+    return animated_bnames
+
+# derive ProxyPlace locations from stored actual locations, for all Places of rig with actual location stored,
+# ProxyPlace bones with animated locations (more than one location keyframe) are not changed,
+# returns number of ProxyPlace locations changed
+def update_proxy_locs_from_actual(mega_mini_rig):
+    mega_mini_scale = mega_mini_rig[OBJ_PROP_SCALE]
+    _, proxy_place_bnames, actual_locs = get_rig_actual_locs(mega_mini_rig)
+    mega_mini_rig[OBJ_PROP_ACTUAL_LOC_SCALE] = mega_mini_scale
+    if len(proxy_place_bnames) == 0:
+        return 0
+    proxy_locs = (actual_locs / mega_mini_scale).tolist()
+    bname_locs = list(zip(proxy_place_bnames, proxy_locs))
+    animated_bnames = set_single_location_keyframes(mega_mini_rig, bname_locs)
+    pose_bones = mega_mini_rig.pose.bones
+    count = 0
+    for bname, loc in bname_locs:
+        if bname in animated_bnames:
+            continue
+        pose_bones[bname].location = loc
+        count += 1
+    return count
+
+# store actual locations of Places that do not have actual location stored, from current ProxyPlace locations
+# (precision is limited to single precision of ProxyPlace locations), returns number of actual locations stored
+def store_actual_locs_from_proxy(mega_mini_rig):
+    mega_mini_scale = mega_mini_rig[OBJ_PROP_SCALE]
+    pose_bones = mega_mini_rig.pose.bones
+    count = 0
+    for place_bname, proxy_place_bname, _ in get_mega_mini_rig_places(mega_mini_rig):
+        if OBJ_PROP_ACTUAL_LOC in pose_bones[place_bname]:
+            continue
+        proxy_loc = pose_bones[proxy_place_bname].location
+        pose_bones[place_bname][OBJ_PROP_ACTUAL_LOC] = [ float(v) * mega_mini_scale for v in proxy_loc ]
+        count += 1
+    mega_mini_rig[OBJ_PROP_ACTUAL_LOC_SCALE] = mega_mini_scale
+    return count
+
+class MEGAMINI_ActualLocStore(bpy.types.Operator):
+    bl_description = "Store actual location (double precision) of each Place of active MegaMini Rig that does " + \
+        "not have actual location stored, from current ProxyPlace location. ProxyPlace locations are derived " + \
+        "from actual locations by Update Proxy Locations, and by Rescale Rig"
+    bl_idname = "mega_mini.actual_loc_store"
+    bl_label = "Store Actual Locations"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        active_ob = context.active_object
+        if not is_mega_mini_rig(active_ob):
+            self.report({'ERROR'}, "Unable to store actual locations because Active Object is not a MegaMini Rig.")
+            return {'CANCELLED'}
+        count = store_actual_locs_from_proxy(active_ob)
+        self.report({'INFO'}, "Stored actual locations of " + str(count) + " Places")
+        return {'FINISHED'}
+
+class MEGAMINI_ActualLocUpdate(bpy.types.Operator):
+    bl_description = "Derive ProxyPlace locations of active MegaMini Rig from stored actual locations, in double " + \
+        "precision. ProxyPlace bones with animated locations are not changed"
+    bl_idname = "mega_mini.actual_loc_update"
+    bl_label = "Update Proxy Locations"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        active_ob = context.active_object
+        if not is_mega_mini_rig(active_ob):
+            self.report({'ERROR'}, "Unable to update Proxy locations because Active Object is not a MegaMini Rig.")
+            return {'CANCELLED'}
+        count = update_proxy_locs_from_actual(active_ob)
+        self.report({'INFO'}, "Updated " + str(count) + " ProxyPlace locations")
+        return {'FINISHED'}
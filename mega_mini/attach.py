@@ -23,87 +23,126 @@ from .rig import (PROXY_FIELD_BNAME, OBSERVER_BNAME, PROXY_OBSERVER_BNAME, PLACE
     PROXY_PLACE_FOCUS_BNAME, PLACE_BONEHEAD, PLACE_BONETAIL, PROXY_PLACE_BONEHEAD, PROXY_PLACE_BONETAIL,
     PROXY_PLACE_FOCUS_BONEHEAD, PROXY_PLACE_FOCUS_BONETAIL, PLACE_BONELAYERS, PROXY_PLACE_BONELAYERS,
     PROXY_PLACE_FOCUS_BONELAYERS)
-from .rig import (TRI_WIDGET_NAME, TRI_PINCH_WIDGET_NAME, QUAD_WIDGET_NAME, PINCH_QUAD_WIDGET_NAME, CIRCLE_WIDGET_NAME,
-    CARDIOD_WIDGET_NAME, WIDGET_TRIANGLE_OBJNAME, WIDGET_PINCH_TRIANGLE_OBJNAME, WIDGET_QUAD_OBJNAME,
-    WIDGET_PINCH_QUAD_OBJNAME, WIDGET_CIRCLE_OBJNAME, WIDGET_CARDIOD_OBJNAME)
+from .rig import (QUAD_WIDGET_NAME, PINCH_QUAD_WIDGET_NAME, CARDIOD_WIDGET_NAME, get_widget_objs_from_rig)
+from .rig import (OBJ_PROP_ACTUAL_LOC, OBJ_PROP_ACTUAL_LOC_SCALE)
 from .rig import (OBJ_PROP_BONE_SCL_MULT, OBJ_PROP_SCALE, OBJ_PROP_FP_POWER, OBJ_PROP_FP_MIN_DIST,
-    OBJ_PROP_FP_MIN_SCALE, MEGA_MINI_CUSTOM_NODE_GROUP_NAME, create_mega_mini_armature, is_mega_mini_rig)
+    OBJ_PROP_FP_MIN_SCALE, MEGA_MINI_CUSTOM_NODE_GROUP_NAME, create_mega_mini_armature, is_mega_mini_rig,
+    clear_rig_index)
+from .fp_math import fp_place_locs_scales
+from .keyframes import insert_bone_location_keyframes
 
 if bpy.app.version < (2,80,0):
-    from .imp_v27 import (select_object, get_cursor_location)
+    from .imp_v27 import (select_object, get_cursor_location, set_object_mode, update_view_layer)
 else:
-    from .imp_v28 import (select_object, get_cursor_location)
+    from .imp_v28 import (select_object, get_cursor_location, set_object_mode, update_view_layer)
 
 # "edit bones" must be created at origin (head at origin, ...), so that pose bone locations can be used by drivers
 # to perform offsets, distance calculations, etc.
 def create_proxy_bone_pair(context, mega_mini_rig, widget_objs, use_obs_loc, place_loc=None):
-    # save old view3d mode and enter Edit mode, to add bones to mega_mini_rig
-    old_3dview_mode = context.mode
-
-    bpy.ops.object.mode_set(mode='EDIT')
-
-    b_place = mega_mini_rig.data.edit_bones.new(name=PLACE_BNAME)
-    place_bname = b_place.name
-    b_place.head = mathutils.Vector(PLACE_BONEHEAD)
-    b_place.tail = mathutils.Vector(PLACE_BONETAIL)
-    b_place.parent = mega_mini_rig.data.edit_bones[OBSERVER_BNAME]
-    b_place.show_wire = True
-    b_place.layers = PLACE_BONELAYERS
-
-    b_proxy_place = mega_mini_rig.data.edit_bones.new(name=PROXY_PLACE_BNAME)
-    proxy_place_bname = b_proxy_place.name
-    b_proxy_place.head = mathutils.Vector(PROXY_PLACE_BONEHEAD)
-    b_proxy_place.tail = mathutils.Vector(PROXY_PLACE_BONETAIL)
-    b_proxy_place.parent = mega_mini_rig.data.edit_bones[PROXY_FIELD_BNAME]
-    b_proxy_place.show_wire = True
-    b_proxy_place.layers = PROXY_PLACE_BONELAYERS
-
-    b_proxy_place_focus = mega_mini_rig.data.edit_bones.new(name=PROXY_PLACE_FOCUS_BNAME)
-    proxy_place_focus_bname = b_proxy_place_focus.name
-    b_proxy_place_focus.head = mathutils.Vector(PROXY_PLACE_FOCUS_BONEHEAD)
-    b_proxy_place_focus.tail = mathutils.Vector(PROXY_PLACE_FOCUS_BONETAIL)
-    b_proxy_place_focus.parent = b_proxy_place
-    b_proxy_place_focus.show_wire = True
-    b_proxy_place_focus.layers = PROXY_PLACE_FOCUS_BONELAYERS
+    return create_proxy_bone_pairs(context, mega_mini_rig, widget_objs, use_obs_loc, [place_loc])[0]
+
+# create a Place/ProxyPlace/ProxyPlaceFocus bone set for each location in 'place_locs', with all edit bones created
+# in one Edit mode session, and all pose bone data/drivers/keyframes created in one Pose mode session,
+# a location of None will use the ProxyObserver location if 'use_obs_loc' is True, locations are divided by
+# mega_mini_scale unless 'is_proxy_loc' is True (i.e. locations are already in Proxy coordinates),
+# actual locations (double precision, see actual_loc.py) are stored in Place bones - from 'actual_locs' if given,
+# otherwise from 'place_locs' if they are not Proxy coordinates,
+# returns list of (place_bname, proxy_place_bname)
+def create_proxy_bone_pairs(context, mega_mini_rig, widget_objs, use_obs_loc, place_locs, is_proxy_loc=False,
+                            actual_locs=None):
+    # save old mode of rig and enter Edit mode, to add bones to mega_mini_rig
+    old_rig_mode = mega_mini_rig.mode
+
+    set_object_mode(context, mega_mini_rig, 'EDIT')
+
+    edit_bones = mega_mini_rig.data.edit_bones
+    b_observer = edit_bones[OBSERVER_BNAME]
+    b_proxy_field = edit_bones[PROXY_FIELD_BNAME]
+    new_bnames = []
+    for _ in place_locs:
+        b_place = edit_bones.new(name=PLACE_BNAME)
+        place_bname = b_place.name
+        b_place.head = mathutils.Vector(PLACE_BONEHEAD)
+        b_place.tail = mathutils.Vector(PLACE_BONETAIL)
+        b_place.parent = b_observer
+        b_place.show_wire = True
+        b_place.layers = PLACE_BONELAYERS
+
+        b_proxy_place = edit_bones.new(name=PROXY_PLACE_BNAME)
+        proxy_place_bname = b_proxy_place.name
+        b_proxy_place.head = mathutils.Vector(PROXY_PLACE_BONEHEAD)
+        b_proxy_place.tail = mathutils.Vector(PROXY_PLACE_BONETAIL)
+        b_proxy_place.parent = b_proxy_field
+        b_proxy_place.show_wire = True
+        b_proxy_place.layers = PROXY_PLACE_BONELAYERS
+
+        b_proxy_place_focus = edit_bones.new(name=PROXY_PLACE_FOCUS_BNAME)
+        proxy_place_focus_bname = b_proxy_place_focus.name
+        b_proxy_place_focus.head = mathutils.Vector(PROXY_PLACE_FOCUS_BONEHEAD)
+        b_proxy_place_focus.tail = mathutils.Vector(PROXY_PLACE_FOCUS_BONETAIL)
+        b_proxy_place_focus.parent = b_proxy_place
+        b_proxy_place_focus.show_wire = True
+        b_proxy_place_focus.layers = PROXY_PLACE_FOCUS_BONELAYERS
+
+        new_bnames.append((place_bname, proxy_place_bname, proxy_place_focus_bname))
 
     # switch to Pose mode to allow adding drivers, and to set pose bone location(s)
-    bpy.ops.object.mode_set(mode='POSE')
-
-    # custom bone shape, and show as Wireframe
-    mega_mini_rig.pose.bones[place_bname].custom_shape = bpy.data.objects[widget_objs[QUAD_WIDGET_NAME].name]
-    mega_mini_rig.pose.bones[proxy_place_bname].custom_shape = \
-        bpy.data.objects[widget_objs[PINCH_QUAD_WIDGET_NAME].name]
-    mega_mini_rig.pose.bones[proxy_place_focus_bname].custom_shape = \
-        bpy.data.objects[widget_objs[CARDIOD_WIDGET_NAME].name]
-
-    # add driver to place bone to make it scale with scaled bone
-    add_bone_scl_drivers(mega_mini_rig, place_bname, proxy_place_focus_bname, PROXY_OBSERVER_BNAME)
-    add_bone_loc_drivers(mega_mini_rig, place_bname, proxy_place_bname, PROXY_OBSERVER_BNAME)
-    add_bone_rot_drivers(mega_mini_rig, place_bname, proxy_place_bname)
-
-    # if a place location is given then convert the location to Proxy coordinates
-    if place_loc != None:
-        mega_mini_rig.pose.bones[proxy_place_bname].location = (place_loc[0] / mega_mini_rig[OBJ_PROP_SCALE],
-                                                                place_loc[1] / mega_mini_rig[OBJ_PROP_SCALE],
-                                                                place_loc[2] / mega_mini_rig[OBJ_PROP_SCALE])
-    # else if new proxy bone should use the proxy observer position, then do it
-    elif use_obs_loc:
-        # get position of Scaled observer, with it's "Copy Location" constraint included, by using "matrix"
-        mega_mini_rig.pose.bones[proxy_place_bname].location = (
-            mega_mini_rig.pose.bones[PROXY_OBSERVER_BNAME].matrix[0][3],
-            mega_mini_rig.pose.bones[PROXY_OBSERVER_BNAME].matrix[1][3],
-            mega_mini_rig.pose.bones[PROXY_OBSERVER_BNAME].matrix[2][3])
-
-    # insert keyframe, to prevent data loss, i.e. position erased, if user does menu Pose -> Clear Transform,
+    set_object_mode(context, mega_mini_rig, 'POSE')
+
+    pose_bones = mega_mini_rig.pose.bones
+    place_widget = bpy.data.objects[widget_objs[QUAD_WIDGET_NAME].name]
+    proxy_place_widget = bpy.data.objects[widget_objs[PINCH_QUAD_WIDGET_NAME].name]
+    proxy_place_focus_widget = bpy.data.objects[widget_objs[CARDIOD_WIDGET_NAME].name]
+    mega_mini_scale = mega_mini_rig[OBJ_PROP_SCALE]
+    # get position of Scaled observer, with it's "Copy Location" constraint included, by using "matrix"
+    proxy_obs_matrix = pose_bones[PROXY_OBSERVER_BNAME].matrix
+    proxy_obs_loc = (proxy_obs_matrix[0][3], proxy_obs_matrix[1][3], proxy_obs_matrix[2][3])
+    keyframe_bname_locs = []
+    has_actual_locs = False
+    for index, ((place_bname, proxy_place_bname, proxy_place_focus_bname), place_loc) in \
+            enumerate(zip(new_bnames, place_locs)):
+        # custom bone shape, and show as Wireframe
+        pose_bones[place_bname].custom_shape = place_widget
+        pose_bones[proxy_place_bname].custom_shape = proxy_place_widget
+        pose_bones[proxy_place_focus_bname].custom_shape = proxy_place_focus_widget
+
+        # add driver to place bone to make it scale with scaled bone
+        add_bone_scl_drivers(mega_mini_rig, place_bname, proxy_place_focus_bname, PROXY_OBSERVER_BNAME)
+        add_bone_loc_drivers(mega_mini_rig, place_bname, proxy_place_bname, PROXY_OBSERVER_BNAME)
+        add_bone_rot_drivers(mega_mini_rig, place_bname, proxy_place_bname)
+
+        if place_loc is None:
+            if use_obs_loc:
+                pose_bones[proxy_place_bname].location = proxy_obs_loc
+        elif is_proxy_loc:
+            pose_bones[proxy_place_bname].location = (place_loc[0], place_loc[1], place_loc[2])
+        # else convert the location to Proxy coordinates, in double precision
+        else:
+            actual_loc = (float(place_loc[0]), float(place_loc[1]), float(place_loc[2]))
+            pose_bones[proxy_place_bname].location = (actual_loc[0] / mega_mini_scale,
+                                                      actual_loc[1] / mega_mini_scale,
+                                                      actual_loc[2] / mega_mini_scale)
+            if actual_locs is None:
+                pose_bones[place_bname][OBJ_PROP_ACTUAL_LOC] = actual_loc
+                has_actual_locs = True
+        if actual_locs != None:
+            pose_bones[place_bname][OBJ_PROP_ACTUAL_LOC] = [ float(v) for v in actual_locs[index] ]
+            has_actual_locs = True
+        keyframe_bname_locs.append((proxy_place_bname, tuple(pose_bones[proxy_place_bname].location)))
+
+        pose_bones[place_bname][OBJ_PROP_BONE_SCL_MULT] = 1.0
+
+    # insert keyframes, to prevent data loss, i.e. position erased, if user does menu Pose -> Clear Transform,
     # presses Ctrl-G to reset location, etc.
-    mega_mini_rig.pose.bones[proxy_place_bname].keyframe_insert(data_path="location")
+    insert_bone_location_keyframes(mega_mini_rig, [ bname for bname, _ in keyframe_bname_locs ],
+                                   [context.scene.frame_current], [ loc for _, loc in keyframe_bname_locs ])
+    if has_actual_locs:
+        mega_mini_rig[OBJ_PROP_ACTUAL_LOC_SCALE] = mega_mini_scale
 
-    mega_mini_rig.pose.bones[place_bname][OBJ_PROP_BONE_SCL_MULT] = 1.0
+    # switch back to previous mode of rig
+    set_object_mode(context, mega_mini_rig, old_rig_mode)
 
-    # switch back to previous view3d mode
-    bpy.ops.object.mode_set(mode=old_3dview_mode)
-
-    return place_bname, proxy_place_bname
+    return [ (place_bname, proxy_place_bname) for place_bname, proxy_place_bname, _ in new_bnames ]
 
 def add_bone_scl_drivers(armature, place_bname, proxy_place_focus_bname, proxy_observer_bname):
     drv_scale_x = armature.pose.bones[place_bname].driver_add("scale", 0).driver
@@ -148,9 +187,10 @@ def add_bone_scl_drivers(armature, place_bname, proxy_place_focus_bname, proxy_o
     v_self_bone_scale.targets[0].id        = armature
     v_self_bone_scale.targets[0].data_path = "pose.bones[\""+place_bname+"\"][\""+OBJ_PROP_BONE_SCL_MULT+"\"]"
 
-    # MegaMini distance scaling formula:
-    drv_scale_x.expression = "max("+v_mega_mini_fp_min_scale.name+", "+v_self_bone_scale.name+" / ( (1 + max(0, " + \
-        v_mega_mini_scale.name+" * "+v_proxy_dist.name+" - "+v_mega_mini_fp_min_dist.name+") ) ** " + \
+    # MegaMini distance scaling formula, using pow() instead of '**' so Blender evaluates it as a 'simple expression'
+    # (without Python):
+    drv_scale_x.expression = "max("+v_mega_mini_fp_min_scale.name+", "+v_self_bone_scale.name+" / pow(1 + max(0, " + \
+        v_mega_mini_scale.name+" * "+v_proxy_dist.name+" - "+v_mega_mini_fp_min_dist.name+"), " + \
         v_mega_mini_fp_power.name+") )"
 
     # Y scale is copy of X scale value
@@ -331,23 +371,30 @@ def add_bone_rot_drivers(armature, place_bname, proxy_place_bname):
     v_rot_z.targets[0].data_path = "rotation_euler.z"
     drv_rot_z.expression = v_rot_z.name
 
-def get_widget_objs_from_rig(active_ob):
-    widget_objs = {}
-    for ob in bpy.data.objects:
-        if ob.parent == active_ob or (ob.parent != None and ob.parent.parent == active_ob):
-            if WIDGET_TRIANGLE_OBJNAME in ob.name:
-                widget_objs[TRI_WIDGET_NAME] = ob
-            elif WIDGET_PINCH_TRIANGLE_OBJNAME in ob.name:
-                widget_objs[TRI_PINCH_WIDGET_NAME] = ob
-            elif WIDGET_QUAD_OBJNAME in ob.name:
-                widget_objs[QUAD_WIDGET_NAME] = ob
-            elif WIDGET_PINCH_QUAD_OBJNAME in ob.name:
-                widget_objs[PINCH_QUAD_WIDGET_NAME] = ob
-            elif WIDGET_CIRCLE_OBJNAME in ob.name:
-                widget_objs[CIRCLE_WIDGET_NAME] = ob
-            elif WIDGET_CARDIOD_OBJNAME in ob.name:
-                widget_objs[CARDIOD_WIDGET_NAME] = ob
-    return widget_objs
+# get World matrix used by objects parented to a newly created Place bone (i.e. the Place bone's tail), computed
+# directly from ProxyPlace location and the forced perspective formulas - because the new Place bone drivers have
+# not yet been evaluated by the dependency graph
+def get_new_place_parent_matrix(mega_mini_rig, proxy_place_bname):
+    pose_bones = mega_mini_rig.pose.bones
+    rig_matrix = mega_mini_rig.matrix_world
+    pb_proxy_obs = pose_bones[PROXY_OBSERVER_BNAME]
+    proxy_obs_local = mega_mini_rig.convert_space(pose_bone=pb_proxy_obs, matrix=pb_proxy_obs.matrix,
+                                                  from_space='POSE', to_space='LOCAL').translation
+    proxy_place_loc = pose_bones[proxy_place_bname].location
+    # new ProxyPlace and ProxyPlaceFocus bones have no rotation/scale, and their rest positions are at the origin,
+    # so ProxyPlaceFocus head is at ProxyPlace location, relative to ProxyField
+    proxy_place_focus_world = rig_matrix @ pose_bones[PROXY_FIELD_BNAME].matrix @ proxy_place_loc
+    proxy_dist = (proxy_place_focus_world - rig_matrix @ pb_proxy_obs.head).length
+    # new Place bone mega_mini_bone_scl_mult is 1.0
+    locations, scales = fp_place_locs_scales([proxy_place_loc], proxy_obs_local, mega_mini_rig[OBJ_PROP_SCALE],
+        mega_mini_rig[OBJ_PROP_FP_POWER], mega_mini_rig[OBJ_PROP_FP_MIN_DIST], mega_mini_rig[OBJ_PROP_FP_MIN_SCALE],
+        1.0, [proxy_dist])
+    place_basis = mathutils.Matrix.Translation(mathutils.Vector(locations[0])) @ \
+        mathutils.Matrix.Scale(float(scales[0]), 4)
+    # Place bone is child of Observer bone, both with rest position at origin, and objects parented to a bone are
+    # parented to the bone's tail
+    return rig_matrix @ pose_bones[OBSERVER_BNAME].matrix @ place_basis @ \
+        mathutils.Matrix.Translation(mathutils.Vector(PLACE_BONETAIL))
 
 class MEGAMINI_AttachCreatePlace(bpy.types.Operator):
     bl_description = "Based on current position of MegaMini rig's ProxyObserver, create Place-ProxyPlace " + \
@@ -378,7 +425,7 @@ class MEGAMINI_AttachCreatePlace(bpy.types.Operator):
                 self.report({'ERROR'}, "Unable to Create Place because Active Object is not a MegaMini Rig.")
                 return {'CANCELLED'}
         # get widgets and create
-        widget_objs = get_widget_objs_from_rig(active_ob)
+        widget_objs = get_widget_objs_from_rig(context, active_ob)
         create_proxy_bone_pair(context, active_ob, widget_objs, True)
         return {'FINISHED'}
 
@@ -393,6 +440,7 @@ class MEGAMINI_AttachSinglePlace(bpy.types.Operator):
         active_ob = context.active_object
         # get list of objects, a separate copy of context's list - because context's list may change
         selected_obs = [ob for ob in context.selected_objects]
+        rig_created = False
         # error checks
         if not is_mega_mini_rig(active_ob):
             # create a rig if needed
@@ -408,36 +456,49 @@ class MEGAMINI_AttachSinglePlace(bpy.types.Operator):
                                           mega_mini_fp_min_scale)
                 # new active object
                 active_ob = context.active_object
+                rig_created = True
             else:
                 self.report({'ERROR'}, "Unable to attach object(s) because Active Object is not a MegaMini Rig.")
                 return {'CANCELLED'}
         if len(context.selected_objects) < 1:
             self.report({'ERROR'}, "Unable to attach object(s) to MegaMini Rig because no object(s) selected")
             return {'CANCELLED'}
-        widget_objs = get_widget_objs_from_rig(active_ob)
+        widget_objs = get_widget_objs_from_rig(context, active_ob)
         # expand the rig by creating new bones in the rig
         place_bname, proxy_place_bname = create_proxy_bone_pair(context, active_ob, widget_objs, True)
 
-        # debug: change current frame of animation, to force Blender to update the armature, drivers, etc. in the
-        # dependency graph - which Blender isn't automatically doing, for some reason...
-        # all of this is done avoid errors with locations of objects/bones when parenting objects to bones
-        bpy.context.scene.frame_set(bpy.context.scene.frame_current)
-        bpy.context.scene.frame_set(bpy.context.scene.frame_current)
+        # a rig created in this call has not been evaluated yet, so its World matrix and pose bone matrices are not
+        # valid until the view layer is updated
+        if rig_created:
+            update_view_layer(context)
+        # compute the new Place bone's World matrix directly, instead of forcing Blender to update the whole scene
+        # (e.g. with frame_set) so that the Place bone drivers are evaluated before parenting
+        place_parent_matrix_inv = get_new_place_parent_matrix(active_ob, proxy_place_bname).inverted_safe()
 
         # select only the objects that were selected before the function was called, and the
         # MegaMini Rig (which may have been 'pre-created')
-        bpy.ops.object.select_all(action='DESELECT')
+        for ob in context.selected_objects:
+            select_object(ob, False)
         select_object(active_ob, True)
         for ob in selected_obs:
+            # skip the MegaMini Rig, it cannot be parented to itself
+            if ob == active_ob:
+                continue
             # do not select objects that have a parent, if 'no re-parent' option is enabled
             if ob.parent != None and context.scene.MegaMini_AttachNoReParent:
                 continue
             select_object(ob, True)
+            # parent the object to the new Place bone, without changing the object's World location, same as
+            # 'Parent to Bone' operator
+            ob.parent = active_ob
+            ob.parent_type = 'BONE'
+            ob.parent_bone = place_bname
+            ob.matrix_parent_inverse = place_parent_matrix_inv
 
-        # make the new Place bone the active bone, to be used for parenting objects
+        # make the new Place bone the active bone
         active_ob.data.bones.active = active_ob.data.bones[place_bname]
-        # parent all the selected object(s) to the new Place bone
-        bpy.ops.object.parent_set(type='BONE')
+        # objects were re-parented, so cached rig membership may be wrong
+        clear_rig_index()
 
         return {'FINISHED'}
 
@@ -474,12 +535,15 @@ class MEGAMINI_AttachMultiPlace(bpy.types.Operator):
         if len(context.selected_objects) < 1:
             self.report({'ERROR'}, "Unable to attach object(s) to MegaMini Rig because no object(s) selected")
             return {'CANCELLED'}
-        widget_objs = get_widget_objs_from_rig(active_ob)
+        widget_objs = get_widget_objs_from_rig(context, active_ob)
 
         # select only the objects that were selected before the function was called, and the
         # MegaMini Rig (which may have been 'pre-created')
-        bpy.ops.object.select_all(action='DESELECT')
+        for ob in context.selected_objects:
+            select_object(ob, False)
         select_object(active_ob, True)
+        attach_obs = []
+        place_locs = []
         for ob in selected_obs:
             # skip the MegaMini Rig for this part (it's already been selected)
             if ob == active_ob:
@@ -488,11 +552,13 @@ class MEGAMINI_AttachMultiPlace(bpy.types.Operator):
             if ob.parent != None and context.scene.MegaMini_AttachNoReParent:
                 continue
             select_object(ob, True)
+            attach_obs.append(ob)
+            place_locs.append(ob.matrix_world.translation - get_cursor_location(context))
 
-            place_loc = ob.matrix_world.translation - get_cursor_location(context)
-            # expand the rig by creating new bones in the rig
-            place_bname, proxy_place_bname = create_proxy_bone_pair(context, active_ob, widget_objs, True, place_loc)
+        # expand the rig by creating new bones in the rig, all Places are created at once
+        bname_pairs = create_proxy_bone_pairs(context, active_ob, widget_objs, True, place_locs)
 
+        for ob, (place_bname, proxy_place_bname) in zip(attach_obs, bname_pairs):
             # object's location was converted to MegaMini Proxy coordinates, so zero object's location values
             ob.location.zero()
             # parent the object to the new Place,
@@ -502,10 +568,8 @@ class MEGAMINI_AttachMultiPlace(bpy.types.Operator):
             ob.matrix_parent_inverse.identity()
             # undo translation due to bone length
             ob.matrix_parent_inverse[1][3] = -PLACE_BONETAIL[1]
-
-        # debug: change current frame of animation, to force Blender to update the armature, drivers, etc. in the
-        # dependency graph - which Blender isn't automatically updating, for some reason...
-        # all of this is done to avoid errors with locations of objects/bones when parenting objects to bones
-        bpy.context.scene.frame_set(bpy.context.scene.frame_current)
-        bpy.context.scene.frame_set(bpy.context.scene.frame_current)
+        # objects are parented with their location zeroed, so Place bone matrices are not needed here - the
+        # dependency graph will evaluate the new Place bone drivers when the rig is next updated
+        # objects were re-parented, so cached rig membership may be wrong
+        clear_rig_index()
         return {'FINISHED'}
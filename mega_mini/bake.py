@@ -0,0 +1,286 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# MegaMini Bake: evaluate the Place bone drivers (location, rotation, scale) over a frame range, write the results as
+# keyframes of Place bone F-Curves (in action group "MegaMiniBake"), and mute the Place bone drivers. Unbake removes
+# the baked F-Curves and un-mutes the Place bone drivers.
+# If the rig's inputs are animated only by F-Curves (i.e. no constraints other than ProxyObserver's Copy Location,
+# no NLA, no rig object animation), then the driver inputs are evaluated directly from the F-Curves and the forced
+# perspective math is done for all frames and Places at once, without changing the current frame. Otherwise, the
+# scene is evaluated at each frame (with Place drivers muted) and all Places are computed at once for each frame.
+
+import bpy
+import numpy as np
+
+from .rig import (PROXY_FIELD_BNAME, PROXY_OBSERVER_BNAME, OBSERVER_BNAME, OBJ_PROP_SCALE, OBJ_PROP_FP_POWER,
+    OBJ_PROP_FP_MIN_DIST, OBJ_PROP_FP_MIN_SCALE, OBJ_PROP_BONE_SCL_MULT, OBJ_PROP_USE_SOLVER, OBJ_PROP_BAKED,
+    OBJ_PROP_USE_TRAJECTORY)
+from .rig import (is_mega_mini_rig, get_data_path_bone_name, get_mega_mini_rig_places, set_place_drivers_mute)
+from .fp_math import (fp_place_locs_scales, euler_xyz_to_matrices, quat_to_matrices, matrices_to_euler_xyz)
+from .solver import (solve_mega_mini_rig_places, disable_rig_solver)
+from .cull import get_culled_place_bnames
+from .keyframes import (get_pose_bone_data_path, get_bone_fcurves, insert_fcurves_keyframes)
+
+BAKE_ACTION_GROUP_NAME = "MegaMiniBake"
+PLACE_BAKE_PATHS = [ ("location", 3), ("rotation_euler", 3), ("scale", 3) ]
+
+# values of property over frames, evaluated from F-Curve if the property is animated, otherwise the current value,
+# returns array of shape (frame_count,)
+def get_fcurve_values(action, data_path, index, frames, current_value):
+    fc = None if action is None else action.fcurves.find(data_path, index=index)
+    if fc is None or fc.mute or len(fc.keyframe_points) == 0:
+        return np.full(len(frames), current_value, dtype=np.float64)
+    # constant F-Curve, e.g. ProxyPlace with one location keyframe
+    key_values = np.empty(len(fc.keyframe_points) * 2)
+    fc.keyframe_points.foreach_get("co", key_values)
+    if len(fc.modifiers) == 0 and np.all(key_values[1::2] == key_values[1]):
+        return np.full(len(frames), key_values[1], dtype=np.float64)
+    return np.array([ fc.evaluate(frame) for frame in frames ], dtype=np.float64)
+
+# values of vector property over frames, returns array of shape (frame_count, len(current_value))
+def get_fcurve_vectors(action, data_path, frames, current_value):
+    return np.stack([ get_fcurve_values(action, data_path, i, frames, current_value[i])
+                      for i in range(len(current_value)) ], axis=-1)
+
+# rotation matrices of pose bone over frames, returns array of shape (frame_count, 3, 3)
+def get_pose_bone_rot_matrices(action, pose_bone, frames):
+    if pose_bone.rotation_mode == 'QUATERNION':
+        return quat_to_matrices(get_fcurve_vectors(action, get_pose_bone_data_path(pose_bone.name,
+            ".rotation_quaternion"), frames, pose_bone.rotation_quaternion))
+    return euler_xyz_to_matrices(get_fcurve_vectors(action, get_pose_bone_data_path(pose_bone.name,
+        ".rotation_euler"), frames, pose_bone.rotation_euler))
+
+# check if Place driver inputs of rig can be evaluated directly from F-Curves
+def can_bake_from_fcurves(mega_mini_rig, places):
+    if mega_mini_rig.parent != None or len(mega_mini_rig.constraints) > 0:
+        return False
+    # ProxyPlace locations are written by trajectory frame change handler, not F-Curves
+    if mega_mini_rig.get(OBJ_PROP_USE_TRAJECTORY, False):
+        return False
+    anim_data = mega_mini_rig.animation_data
+    if anim_data != None:
+        if any([ not track.mute for track in anim_data.nla_tracks ]):
+            return False
+        # rig object transform must not be animated
+        if anim_data.action != None:
+            for fc in anim_data.action.fcurves:
+                if not fc.data_path.startswith(("pose.bones[", "[\"")):
+                    return False
+        # only Place bone drivers, and ProxyObserver constraint influence driver, are allowed
+        place_bnames = set([ p[0] for p in places ])
+        for fc in anim_data.drivers:
+            if fc.mute:
+                continue
+            if get_data_path_bone_name(fc.data_path) in place_bnames:
+                continue
+            if fc.data_path.startswith("pose.bones[\""+PROXY_OBSERVER_BNAME+"\"].constraints["):
+                continue
+            return False
+    pose_bones = mega_mini_rig.pose.bones
+    for bname in [PROXY_FIELD_BNAME, OBSERVER_BNAME]:
+        if len(pose_bones[bname].constraints) > 0:
+            return False
+    pb_proxy_obs = pose_bones[PROXY_OBSERVER_BNAME]
+    if len(pb_proxy_obs.constraints) != 1:
+        return False
+    con = pb_proxy_obs.constraints[0]
+    if con.type != 'COPY_LOCATION' or con.mute or con.target != mega_mini_rig or con.subtarget != OBSERVER_BNAME or \
+            con.target_space != 'LOCAL' or con.owner_space != 'LOCAL' or not con.use_offset or \
+            not (con.use_x and con.use_y and con.use_z) or con.invert_x or con.invert_y or con.invert_z:
+        return False
+    for bname in [PROXY_FIELD_BNAME] + [ p[1] for p in places ]:
+        if pose_bones[bname].rotation_mode not in ('XYZ', 'QUATERNION'):
+            return False
+    for _, proxy_place_bname, proxy_place_focus_bname in places:
+        if len(pose_bones[proxy_place_bname].constraints) > 0 or \
+                len(pose_bones[proxy_place_focus_bname].constraints) > 0:
+            return False
+    return True
+
+# compute Place bone values for all frames and Places at once, from F-Curves,
+# returns (locations, rotations, scales) as arrays of shape (frame_count, place_count, 3)
+def bake_places_from_fcurves(mega_mini_rig, places, frames):
+    action = None if mega_mini_rig.animation_data is None else mega_mini_rig.animation_data.action
+    pose_bones = mega_mini_rig.pose.bones
+    frame_count = len(frames)
+    place_count = len(places)
+    rig_matrix = np.array(mega_mini_rig.matrix_world, dtype=np.float64)
+    rig_props = {}
+    for prop_name in [OBJ_PROP_SCALE, OBJ_PROP_FP_POWER, OBJ_PROP_FP_MIN_DIST, OBJ_PROP_FP_MIN_SCALE]:
+        rig_props[prop_name] = get_fcurve_values(action, "[\""+prop_name+"\"]", 0, frames, mega_mini_rig[prop_name])
+
+    # ProxyField pose matrices, shape (frame_count, 4, 4)
+    pb_proxy_field = pose_bones[PROXY_FIELD_BNAME]
+    proxy_field_mats = np.zeros((frame_count, 4, 4))
+    proxy_field_mats[:, :3, :3] = get_pose_bone_rot_matrices(action, pb_proxy_field, frames) * \
+        get_fcurve_vectors(action, get_pose_bone_data_path(PROXY_FIELD_BNAME, ".scale"), frames,
+                           pb_proxy_field.scale)[:, np.newaxis, :]
+    proxy_field_mats[:, :3, 3] = get_fcurve_vectors(action, get_pose_bone_data_path(PROXY_FIELD_BNAME, ".location"),
+                                                    frames, pb_proxy_field.location)
+    proxy_field_mats[:, 3, 3] = 1.0
+    world_mats = rig_matrix @ proxy_field_mats
+
+    # ProxyObserver local location, with Copy Location constraint (offset, influence is 1 / mega_mini_scale),
+    # shape (frame_count, 3)
+    observer_locs = get_fcurve_vectors(action, get_pose_bone_data_path(OBSERVER_BNAME, ".location"), frames,
+                                       pose_bones[OBSERVER_BNAME].location)
+    proxy_obs_locals = get_fcurve_vectors(action, get_pose_bone_data_path(PROXY_OBSERVER_BNAME, ".location"), frames,
+        pose_bones[PROXY_OBSERVER_BNAME].location) + observer_locs / rig_props[OBJ_PROP_SCALE][:, np.newaxis]
+    proxy_obs_worlds = np.einsum('fij,fj->fi', world_mats[:, :3, :3], proxy_obs_locals) + world_mats[:, :3, 3]
+
+    # ProxyPlace values, shape (frame_count, place_count, ...)
+    proxy_place_locs = np.empty((frame_count, place_count, 3))
+    proxy_place_rot_mats = np.empty((frame_count, place_count, 3, 3))
+    proxy_place_eulers = np.empty((frame_count, place_count, 3))
+    focus_locals = np.empty((frame_count, place_count, 3))
+    bone_scl_mults = np.empty((frame_count, place_count))
+    for i, (place_bname, proxy_place_bname, proxy_place_focus_bname) in enumerate(places):
+        pb_proxy_place = pose_bones[proxy_place_bname]
+        pb_proxy_place_focus = pose_bones[proxy_place_focus_bname]
+        proxy_place_locs[:, i] = get_fcurve_vectors(action, get_pose_bone_data_path(proxy_place_bname, ".location"),
+                                                    frames, pb_proxy_place.location)
+        rot_mats = get_pose_bone_rot_matrices(action, pb_proxy_place, frames)
+        proxy_place_rot_mats[:, i] = rot_mats
+        # Place rotation driver copies ProxyPlace rotation as Euler XYZ
+        if pb_proxy_place.rotation_mode == 'XYZ':
+            proxy_place_eulers[:, i] = get_fcurve_vectors(action, get_pose_bone_data_path(proxy_place_bname,
+                ".rotation_euler"), frames, pb_proxy_place.rotation_euler)
+        else:
+            proxy_place_eulers[:, i] = matrices_to_euler_xyz(rot_mats)
+        # ProxyPlaceFocus head, relative to ProxyPlace, includes ProxyPlace scale
+        focus_locals[:, i] = get_fcurve_vectors(action, get_pose_bone_data_path(proxy_place_focus_bname,
+            ".location"), frames, pb_proxy_place_focus.location) * get_fcurve_vectors(action,
+            get_pose_bone_data_path(proxy_place_bname, ".scale"), frames, pb_proxy_place.scale)
+        bone_scl_mults[:, i] = get_fcurve_values(action, get_pose_bone_data_path(place_bname,
+            "[\""+OBJ_PROP_BONE_SCL_MULT+"\"]"), 0, frames, pose_bones[place_bname].get(OBJ_PROP_BONE_SCL_MULT, 1.0))
+
+    # ProxyPlaceFocus World locations, and distances to ProxyObserver
+    focus_proxy_field = np.einsum('fpij,fpj->fpi', proxy_place_rot_mats, focus_locals) + proxy_place_locs
+    focus_worlds = np.einsum('fij,fpj->fpi', world_mats[:, :3, :3], focus_proxy_field) + \
+        world_mats[:, np.newaxis, :3, 3]
+    proxy_dists = np.linalg.norm(focus_worlds - proxy_obs_worlds[:, np.newaxis, :], axis=-1)
+
+    locations = np.empty((frame_count, place_count, 3))
+    scales = np.empty((frame_count, place_count))
+    for f in range(frame_count):
+        locations[f], scales[f] = fp_place_locs_scales(proxy_place_locs[f], proxy_obs_locals[f],
+            rig_props[OBJ_PROP_SCALE][f], rig_props[OBJ_PROP_FP_POWER][f], rig_props[OBJ_PROP_FP_MIN_DIST][f],
+            rig_props[OBJ_PROP_FP_MIN_SCALE][f], bone_scl_mults[f], proxy_dists[f])
+    return locations, proxy_place_eulers, np.repeat(scales[:, :, np.newaxis], 3, axis=2)
+
+# compute Place bone values by evaluating scene at each frame, with all Places computed at once for each frame,
+# returns (locations, rotations, scales) as arrays of shape (frame_count, place_count, 3)
+def bake_places_from_scene(scene, mega_mini_rig, places, frames):
+    frame_count = len(frames)
+    place_count = len(places)
+    place_indexes = { p[0]: i for i, p in enumerate(places) }
+    locations = np.zeros((frame_count, place_count, 3))
+    rotations = np.zeros((frame_count, place_count, 3))
+    scales = np.ones((frame_count, place_count, 3))
+    old_frame = scene.frame_current
+    for f, frame in enumerate(frames):
+        scene.frame_set(frame)
+        for place_bname, location, rotation, scale in solve_mega_mini_rig_places(mega_mini_rig, places):
+            i = place_indexes[place_bname]
+            locations[f, i] = location
+            rotations[f, i] = rotation
+            scales[f, i] = scale
+    scene.frame_set(old_frame)
+    return locations, rotations, scales
+
+def remove_baked_fcurves(mega_mini_rig):
+    anim_data = mega_mini_rig.animation_data
+    if anim_data is None or anim_data.action is None:
+        return
+    action = anim_data.action
+    for fc in [ fc for fc in action.fcurves if fc.group != None and fc.group.name == BAKE_ACTION_GROUP_NAME ]:
+        action.fcurves.remove(fc)
+    group = action.groups.get(BAKE_ACTION_GROUP_NAME)
+    if group != None:
+        action.groups.remove(group)
+
+# write baked values as F-Curve keyframes, all keyframes of each F-Curve added at once
+def write_baked_fcurves(mega_mini_rig, places, frames, locations, rotations, scales):
+    place_bnames = [ place_bname for place_bname, _, _ in places ]
+    for (prop_path, prop_len), values in zip(PLACE_BAKE_PATHS, [locations, rotations, scales]):
+        fcurves = get_bone_fcurves(mega_mini_rig, place_bnames, prop_path, prop_len, replace=True,
+                                   action_group=BAKE_ACTION_GROUP_NAME)
+        # values have shape (frame_count, place_count, prop_len), F-Curve order is (place, index)
+        insert_fcurves_keyframes(fcurves, frames, values.transpose(1, 2, 0).reshape(-1, len(frames)))
+
+# returns True if Place values were evaluated from F-Curves, or False if scene was evaluated at each frame
+def bake_mega_mini_rig(scene, mega_mini_rig, frame_start, frame_end, frame_step=1):
+    if mega_mini_rig.get(OBJ_PROP_BAKED, False):
+        unbake_mega_mini_rig(mega_mini_rig)
+    # Solver would overwrite the baked values
+    if mega_mini_rig.get(OBJ_PROP_USE_SOLVER, False):
+        disable_rig_solver(mega_mini_rig)
+    places = get_mega_mini_rig_places(mega_mini_rig)
+    frames = np.arange(frame_start, frame_end + 1, frame_step, dtype=np.float64)
+    if len(places) == 0 or len(frames) == 0:
+        return True
+    # Place values do not depend on Place drivers, so mute Place drivers before evaluating, to save time
+    set_place_drivers_mute(mega_mini_rig, set([ p[0] for p in places ]), True)
+    from_fcurves = can_bake_from_fcurves(mega_mini_rig, places)
+    if from_fcurves:
+        locations, rotations, scales = bake_places_from_fcurves(mega_mini_rig, places, frames)
+    else:
+        locations, rotations, scales = bake_places_from_scene(scene, mega_mini_rig, places,
+                                                              [ int(f) for f in frames ])
+    write_baked_fcurves(mega_mini_rig, places, frames, locations, rotations, scales)
+    mega_mini_rig[OBJ_PROP_BAKED] = True
+    return from_fcurves
+
+def unbake_mega_mini_rig(mega_mini_rig):
+    remove_baked_fcurves(mega_mini_rig)
+    # drivers of culled Places stay muted
+    set_place_drivers_mute(mega_mini_rig, set([ p[0] for p in get_mega_mini_rig_places(mega_mini_rig) ]) -
+                           get_culled_place_bnames(mega_mini_rig), False)
+    mega_mini_rig[OBJ_PROP_BAKED] = False
+
+class MEGAMINI_BakeRig(bpy.types.Operator):
+    bl_description = "Bake Place bone drivers of active MegaMini Rig to keyframes, over scene frame range, and " + \
+        "mute Place bone drivers. Solver is disabled, if it was enabled"
+    bl_idname = "mega_mini.bake_rig"
+    bl_label = "Bake MegaMini"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        scn = context.scene
+        active_ob = context.active_object
+        if not is_mega_mini_rig(active_ob):
+            self.report({'ERROR'}, "Unable to bake because Active Object is not a MegaMini Rig.")
+            return {'CANCELLED'}
+        if not bake_mega_mini_rig(scn, active_ob, scn.frame_start, scn.frame_end, scn.frame_step):
+            self.report({'INFO'}, "Rig inputs are not animated only by F-Curves, so scene was evaluated at each " +
+                        "frame to bake.")
+        return {'FINISHED'}
+
+class MEGAMINI_UnbakeRig(bpy.types.Operator):
+    bl_description = "Remove baked Place bone keyframes of active MegaMini Rig, and un-mute Place bone drivers"
+    bl_idname = "mega_mini.unbake_rig"
+    bl_label = "Unbake MegaMini"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        active_ob = context.active_object
+        if not is_mega_mini_rig(active_ob):
+            self.report({'ERROR'}, "Unable to unbake because Active Object is not a MegaMini Rig.")
+            return {'CANCELLED'}
+        unbake_mega_mini_rig(active_ob)
+        return {'FINISHED'}
@@ -0,0 +1,191 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# Catalog importer: stream a catalog of positions (e.g. star catalog, or ephemeris table) from a CSV file or a NumPy
+# .npy file, in chunks of rows, and create Places (or instanced points) for all rows - without creating an object for
+# each row. Only one chunk of rows is in memory at a time (.npy files are memory mapped), so peak memory does not
+# depend on catalog size.
+# Catalog positions are actual positions, so ProxyPlace locations are (position * position_scale - cursor) divided by
+# mega_mini_scale, same as Multi Place attach. In Places mode, actual locations are also stored in double precision in
+# the Place bones (see actual_loc.py).
+# Catalog formats:
+#     CSV: first row is column names, position columns named by X/Y/Z column options, optional columns
+#         'mega_mini_bone_scl_mult' and 'mega_mini_instance_index'
+#     .npy: 2D float array, columns are x, y, z, and optional bone scale multiplier, and instance index
+# Instance index is index of object in Instance Collection's objects, sorted by name (by character code).
+
+import itertools
+import os
+
+import bpy
+import numpy as np
+
+from .rig import (OBJ_PROP_SCALE, OBJ_PROP_BONE_SCL_MULT, create_mega_mini_armature, is_mega_mini_rig,
+    get_widget_objs_from_rig, clear_rig_index)
+from .attach import create_proxy_bone_pairs
+from .instances import (INSTANCES_NODE_GROUP_PREFIX, ATTR_INSTANCE_INDEX, create_instances_object,
+    add_instances_modifier, create_instances_node_group)
+
+if bpy.app.version < (2,80,0):
+    from .imp_v27 import get_cursor_location
+else:
+    from .imp_v28 import get_cursor_location
+
+CATALOG_IMPORT_MODE_ITEMS = [
+    ('PLACES', "Places", "Create Place-ProxyPlace-ProxyPlaceFocus bones for each catalog row"),
+    ('INSTANCES', "Instances", "Create one instances object (point mesh) for each chunk of catalog rows, with " +
+     "instances from Instance Collection. Requires Blender 3.2+"),
+]
+
+# chunks of catalog rows, as tuple of arrays (positions, bone_scl_mults, instance_indexes) - positions array has
+# shape (N, 3), other arrays have shape (N,), or are None if catalog does not have the column
+def iter_catalog_chunks(filepath, chunk_size, x_column="x", y_column="y", z_column="z"):
+    if os.path.splitext(filepath)[1].lower() == ".npy":
+        return iter_npy_catalog_chunks(filepath, chunk_size)
+    return iter_csv_catalog_chunks(filepath, chunk_size, x_column, y_column, z_column)
+
+def iter_npy_catalog_chunks(filepath, chunk_size):
+    # memory map, so only the rows of one chunk are read at a time
+    catalog = np.load(filepath, mmap_mode='r')
+    if catalog.ndim != 2 or catalog.shape[1] < 3:
+        raise ValueError("Catalog array must have shape (N, 3) or more columns, shape is " + str(catalog.shape))
+    for start in range(0, catalog.shape[0], chunk_size):
+        chunk = np.asarray(catalog[start:start+chunk_size], dtype=np.float64)
+        bone_scl_mults = chunk[:, 3] if chunk.shape[1] > 3 else None
+        instance_indexes = chunk[:, 4].astype(np.int32) if chunk.shape[1] > 4 else None
+        yield chunk[:, 0:3], bone_scl_mults, instance_indexes
+
+def iter_csv_catalog_chunks(filepath, chunk_size, x_column, y_column, z_column):
+    with open(filepath, "r") as f:
+        header = [ name.strip() for name in f.readline().split(",") ]
+        try:
+            pos_cols = [ header.index(x_column), header.index(y_column), header.index(z_column) ]
+        except ValueError:
+            raise ValueError("Catalog CSV header does not have columns " + x_column + ", " + y_column + ", " +
+                             z_column)
+        use_cols = list(pos_cols)
+        bone_scl_mult_col = None
+        instance_index_col = None
+        if OBJ_PROP_BONE_SCL_MULT in header:
+            bone_scl_mult_col = len(use_cols)
+            use_cols.append(header.index(OBJ_PROP_BONE_SCL_MULT))
+        if ATTR_INSTANCE_INDEX in header:
+            instance_index_col = len(use_cols)
+            use_cols.append(header.index(ATTR_INSTANCE_INDEX))
+        while True:
+            lines = list(itertools.islice(f, chunk_size))
+            if len(lines) == 0:
+                break
+            chunk = np.loadtxt(lines, delimiter=",", usecols=use_cols, dtype=np.float64, ndmin=2)
+            bone_scl_mults = chunk[:, bone_scl_mult_col] if bone_scl_mult_col != None else None
+            instance_indexes = chunk[:, instance_index_col].astype(np.int32) if instance_index_col != None else None
+            yield chunk[:, 0:3], bone_scl_mults, instance_indexes
+
+# actual locations (shape (N, 3)) from catalog positions (shape (N, 3)), vectorized in double precision
+def catalog_to_actual_locs(positions, position_scale, cursor_loc):
+    return positions * position_scale - np.asarray(cursor_loc, dtype=np.float64).reshape(3)
+
+def import_catalog_places(context, mega_mini_rig, chunks, position_scale):
+    widget_objs = get_widget_objs_from_rig(context, mega_mini_rig)
+    mega_mini_scale = mega_mini_rig[OBJ_PROP_SCALE]
+    cursor_loc = tuple(get_cursor_location(context))
+    place_count = 0
+    for positions, bone_scl_mults, _ in chunks:
+        actual_locs = catalog_to_actual_locs(positions, position_scale, cursor_loc)
+        bname_pairs = create_proxy_bone_pairs(context, mega_mini_rig, widget_objs, False,
+            (actual_locs / mega_mini_scale).tolist(), is_proxy_loc=True, actual_locs=actual_locs.tolist())
+        if bone_scl_mults is not None:
+            pose_bones = mega_mini_rig.pose.bones
+            for (place_bname, _), mult in zip(bname_pairs, bone_scl_mults.tolist()):
+                pose_bones[place_bname][OBJ_PROP_BONE_SCL_MULT] = mult
+        place_count += len(bname_pairs)
+    return place_count
+
+# one instances object per chunk, all objects share one instances node group
+def import_catalog_instances(context, mega_mini_rig, chunks, position_scale, instance_collection, node_group_name):
+    mega_mini_scale = mega_mini_rig[OBJ_PROP_SCALE]
+    cursor_loc = tuple(get_cursor_location(context))
+    source_obs = sorted(instance_collection.objects, key=lambda ob: ob.name)
+    node_group = create_instances_node_group(mega_mini_rig, source_obs, node_group_name)
+    place_count = 0
+    for positions, bone_scl_mults, instance_indexes in chunks:
+        count = positions.shape[0]
+        proxy_locs = catalog_to_actual_locs(positions, position_scale, cursor_loc) / mega_mini_scale
+        instances_ob = create_instances_object(context, mega_mini_rig, proxy_locs,
+            instance_indexes if instance_indexes is not None else np.zeros(count, dtype=np.int32),
+            np.zeros((count, 3)), np.ones((count, 3)),
+            bone_scl_mults if bone_scl_mults is not None else np.ones(count))
+        add_instances_modifier(instances_ob, node_group)
+        place_count += count
+    clear_rig_index()
+    return place_count
+
+class MEGAMINI_ImportCatalog(bpy.types.Operator):
+    bl_description = "Import positions from catalog file (CSV or .npy) to active MegaMini Rig, in chunks of rows, " + \
+        "creating Places or instanced points without creating an object for each row"
+    bl_idname = "mega_mini.import_catalog"
+    bl_label = "Import Catalog"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        scn = context.scene
+        active_ob = context.active_object
+        filepath = bpy.path.abspath(scn.MegaMini_CatalogFilepath)
+        if not os.path.isfile(filepath):
+            self.report({'ERROR'}, "Unable to import catalog because file not found: " + filepath)
+            return {'CANCELLED'}
+        import_mode = scn.MegaMini_CatalogImportMode
+        if import_mode == 'INSTANCES':
+            if bpy.app.version < (3,2,0):
+                self.report({'ERROR'}, "Unable to import catalog instances because Blender 3.2 or later is required.")
+                return {'CANCELLED'}
+            if scn.MegaMini_CatalogInstanceCollection is None:
+                self.report({'ERROR'}, "Unable to import catalog instances because Instance Collection is not set.")
+                return {'CANCELLED'}
+        # error checks
+        if not is_mega_mini_rig(active_ob):
+            # create a rig if needed
+            if scn.MegaMini_AttachPreCreateRig:
+                mega_mini_scale = scn.MegaMini_NewObserverScale
+                mega_mini_fp_power = scn.MegaMini_NewObserverFP_Power
+                mega_mini_fp_min_dist = scn.MegaMini_NewObserverFP_MinDist
+                mega_mini_fp_min_scale = scn.MegaMini_NewObserverFP_MinScale
+                if mega_mini_scale <= 0:
+                    self.report({'ERROR'}, "Cannot PreCreate MegaMini Rig, error is Observer scale. Must be greater than zero.")
+                    return {'CANCELLED'}
+                create_mega_mini_armature(context, mega_mini_scale, mega_mini_fp_power, mega_mini_fp_min_dist,
+                                          mega_mini_fp_min_scale)
+                # new active object
+                active_ob = context.active_object
+            else:
+                self.report({'ERROR'}, "Unable to import catalog because Active Object is not a MegaMini Rig.")
+                return {'CANCELLED'}
+        chunks = iter_catalog_chunks(filepath, scn.MegaMini_CatalogChunkSize, scn.MegaMini_CatalogColumnX,
+                                     scn.MegaMini_CatalogColumnY, scn.MegaMini_CatalogColumnZ)
+        try:
+            if import_mode == 'INSTANCES':
+                place_count = import_catalog_instances(context, active_ob, chunks, scn.MegaMini_CatalogPositionScale,
+                    scn.MegaMini_CatalogInstanceCollection,
+                    INSTANCES_NODE_GROUP_PREFIX + os.path.splitext(os.path.basename(filepath))[0])
+            else:
+                place_count = import_catalog_places(context, active_ob, chunks, scn.MegaMini_CatalogPositionScale)
+        except ValueError as e:
+            self.report({'ERROR'}, "Unable to import catalog: " + str(e))
+            return {'CANCELLED'}
+        self.report({'INFO'}, "Imported " + str(place_count) + " catalog rows")
+        return {'FINISHED'}
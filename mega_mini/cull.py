@@ -0,0 +1,257 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# MegaMini Culling: Places with a forced perspective scale less than the rig's 'mega_mini_cull_min_scale' are culled,
+# i.e. their bone drivers are muted (so they are not evaluated), and their attached objects are hidden in viewport
+# and render. Distances from ProxyObserver to all ProxyPlaceFocus locations are computed at once (with numpy) to find
+# the Places near enough to ProxyObserver to possibly be visible, so only those Places need their scale checked.
+
+import bpy
+from bpy.app.handlers import persistent
+import numpy as np
+
+from .rig import (PROXY_OBSERVER_BNAME, OBJ_PROP_SCALE, OBJ_PROP_FP_POWER, OBJ_PROP_FP_MIN_DIST,
+    OBJ_PROP_FP_MIN_SCALE, OBJ_PROP_BONE_SCL_MULT, OBJ_PROP_USE_SOLVER, OBJ_PROP_USE_CULL, OBJ_PROP_CULL_MIN_SCALE,
+    OBJ_PROP_CULLED, OBJ_PROP_BAKED)
+from .rig import (is_mega_mini_rig, get_mega_mini_rig_places, set_place_drivers_mute, get_tracked_rigs)
+from .fp_math import (fp_scales, fp_cull_dist)
+
+# names of rigs that use culling
+cull_rig_names = set()
+# cache of Place data per rig, { rig_name: dict }, re-built when number of rig drivers or rig children changes
+cull_rig_data = {}
+# names of culled Places per rig, { rig_name: set(place_bname) }
+cull_rig_culled = {}
+# prevent the depsgraph handler from running culling again because of changes made by culling
+cull_running = False
+
+def is_cull_rig(ob):
+    return is_mega_mini_rig(ob) and ob.get(OBJ_PROP_USE_CULL, False)
+
+# Place names that are currently culled, e.g. so the Solver can skip them
+def get_culled_place_bnames(mega_mini_rig):
+    return cull_rig_culled.get(mega_mini_rig.name, set())
+
+def get_descendants(ob):
+    descendants = []
+    for child in ob.children:
+        descendants.append(child)
+        descendants.extend(get_descendants(child))
+    return descendants
+
+# objects attached to each Place, including children of attached objects, { place_bname: [ob] }
+def get_place_attached_obs(mega_mini_rig, place_bnames):
+    place_obs = { bname: [] for bname in place_bnames }
+    for ob in mega_mini_rig.children:
+        if ob.parent_type == 'BONE' and ob.parent_bone in place_obs:
+            place_obs[ob.parent_bone].append(ob)
+            place_obs[ob.parent_bone].extend(get_descendants(ob))
+    return place_obs
+
+def get_cull_rig_data(mega_mini_rig):
+    driver_count = 0 if mega_mini_rig.animation_data is None else len(mega_mini_rig.animation_data.drivers)
+    child_count = len(mega_mini_rig.children)
+    data = cull_rig_data.get(mega_mini_rig.name)
+    if data is not None and data["driver_count"] == driver_count and data["child_count"] == child_count:
+        return data
+    places = get_mega_mini_rig_places(mega_mini_rig)
+    pose_bones = mega_mini_rig.pose.bones
+    bone_indexes = { pb.name: index for index, pb in enumerate(pose_bones) }
+    data = {
+        "driver_count": driver_count,
+        "child_count": child_count,
+        "place_bnames": [ p[0] for p in places ],
+        "bone_scl_mults": np.array([ pose_bones[p[0]].get(OBJ_PROP_BONE_SCL_MULT, 1.0) for p in places ]),
+        "focus_indexes": np.array([ bone_indexes[p[2]] for p in places ], dtype=np.int64),
+        "place_obs": get_place_attached_obs(mega_mini_rig, [ p[0] for p in places ]),
+        "focus_world_locs": None,
+        "proxy_obs_world": None,
+        "focus_dists": None,
+    }
+    cull_rig_data[mega_mini_rig.name] = data
+    return data
+
+# distances from ProxyObserver to ProxyPlaceFocus World locations, re-computed only when the locations change
+def get_cull_focus_dists(mega_mini_rig, data, proxy_obs_world):
+    pose_bones = mega_mini_rig.pose.bones
+    heads = np.empty(len(pose_bones) * 3, dtype=np.float32)
+    pose_bones.foreach_get("head", heads)
+    heads = heads.reshape(-1, 3)[data["focus_indexes"]]
+    rig_matrix = np.array(mega_mini_rig.matrix_world, dtype=np.float64)
+    focus_world_locs = heads @ rig_matrix[:3, :3].T + rig_matrix[:3, 3]
+    proxy_obs_world = np.array(proxy_obs_world, dtype=np.float64)
+    if data["focus_dists"] is not None and np.array_equal(focus_world_locs, data["focus_world_locs"]) and \
+            np.array_equal(proxy_obs_world, data["proxy_obs_world"]):
+        return data["focus_dists"]
+    focus_dists = np.linalg.norm(focus_world_locs - proxy_obs_world, axis=1)
+    data["focus_world_locs"] = focus_world_locs
+    data["proxy_obs_world"] = proxy_obs_world
+    data["focus_dists"] = focus_dists
+    return focus_dists
+
+# returns set of Place names that should be culled
+def get_rig_cull_place_bnames(mega_mini_rig):
+    data = get_cull_rig_data(mega_mini_rig)
+    place_bnames = data["place_bnames"]
+    if len(place_bnames) == 0:
+        return set()
+    pose_bones = mega_mini_rig.pose.bones
+    bone_scl_mults = data["bone_scl_mults"]
+    mega_mini_scale = mega_mini_rig[OBJ_PROP_SCALE]
+    fp_power = mega_mini_rig[OBJ_PROP_FP_POWER]
+    fp_min_dist = mega_mini_rig[OBJ_PROP_FP_MIN_DIST]
+    fp_min_scale = mega_mini_rig[OBJ_PROP_FP_MIN_SCALE]
+    cull_min_scale = mega_mini_rig.get(OBJ_PROP_CULL_MIN_SCALE, 0.0)
+    cull_dist = fp_cull_dist(mega_mini_scale, fp_power, fp_min_dist, fp_min_scale, cull_min_scale,
+                             bone_scl_mults.max())
+    if cull_dist is None:
+        return set()
+    if cull_dist < 0:
+        return set(place_bnames)
+    # only Places within cull distance may be visible, so check scale of those Places
+    proxy_obs_world = mega_mini_rig.matrix_world @ pose_bones[PROXY_OBSERVER_BNAME].head
+    focus_dists = get_cull_focus_dists(mega_mini_rig, data, proxy_obs_world)
+    near_indexes = np.flatnonzero(focus_dists <= cull_dist)
+    near_dists = focus_dists[near_indexes]
+    visible = np.zeros(len(place_bnames), dtype=bool)
+    if len(near_indexes) > 0:
+        scales = fp_scales(near_dists, mega_mini_scale, fp_power, fp_min_dist, fp_min_scale,
+                           bone_scl_mults[near_indexes])
+        visible[near_indexes[scales >= cull_min_scale]] = True
+    return set([ place_bnames[i] for i in np.flatnonzero(~visible) ])
+
+def set_places_culled(mega_mini_rig, place_bnames, culled):
+    if len(place_bnames) == 0:
+        return
+    # Place drivers stay muted when un-culled if the rig uses the Solver, or is baked (only unbake un-mutes them)
+    set_place_drivers_mute(mega_mini_rig, place_bnames, culled or mega_mini_rig.get(OBJ_PROP_USE_SOLVER, False) or
+                           mega_mini_rig.get(OBJ_PROP_BAKED, False))
+    place_obs = get_cull_rig_data(mega_mini_rig)["place_obs"]
+    for bname in place_bnames:
+        for ob in place_obs.get(bname, []):
+            if culled:
+                # hide only objects that are visible, and remember which objects were hidden by culling
+                if ob.hide_viewport or ob.hide_render:
+                    continue
+                ob[OBJ_PROP_CULLED] = True
+                ob.hide_viewport = True
+                ob.hide_render = True
+            elif ob.get(OBJ_PROP_CULLED, False):
+                del ob[OBJ_PROP_CULLED]
+                ob.hide_viewport = False
+                ob.hide_render = False
+
+# culled state is not saved, and is lost when a rig is renamed, so find Places with objects hidden by culling
+def find_culled_place_bnames(mega_mini_rig):
+    places = get_mega_mini_rig_places(mega_mini_rig)
+    culled = set()
+    for bname, obs in get_place_attached_obs(mega_mini_rig, [ p[0] for p in places ]).items():
+        if any([ child.get(OBJ_PROP_CULLED, False) for child in obs ]):
+            culled.add(bname)
+    return culled
+
+def cull_mega_mini_rig(mega_mini_rig):
+    old_culled = cull_rig_culled.get(mega_mini_rig.name)
+    if old_culled is None:
+        old_culled = find_culled_place_bnames(mega_mini_rig)
+    new_culled = get_rig_cull_place_bnames(mega_mini_rig)
+    # only change Places that changed cull state, to prevent unnecessary depsgraph updates
+    set_places_culled(mega_mini_rig, old_culled - new_culled, False)
+    set_places_culled(mega_mini_rig, new_culled - old_culled, True)
+    cull_rig_culled[mega_mini_rig.name] = new_culled
+
+def cull_all_rigs():
+    global cull_running
+    if cull_running:
+        return
+    cull_running = True
+    try:
+        # forget about rigs that were deleted or had culling disabled, and find renamed rigs
+        mega_mini_rigs, lost_names = get_tracked_rigs(cull_rig_names, is_cull_rig)
+        for rig_name in lost_names:
+            cull_rig_data.pop(rig_name, None)
+            cull_rig_culled.pop(rig_name, None)
+        for mega_mini_rig in mega_mini_rigs:
+            cull_mega_mini_rig(mega_mini_rig)
+    finally:
+        cull_running = False
+
+@persistent
+def cull_frame_change_post(scene, *args):
+    cull_all_rigs()
+
+@persistent
+def cull_depsgraph_update_post(scene, *args):
+    cull_all_rigs()
+
+@persistent
+def cull_load_post(*args):
+    cull_rig_names.clear()
+    cull_rig_data.clear()
+    cull_rig_culled.clear()
+    for ob in bpy.data.objects:
+        if is_cull_rig(ob):
+            cull_rig_names.add(ob.name)
+            # find Places that were culled when file was saved
+            cull_rig_culled[ob.name] = find_culled_place_bnames(ob)
+
+def enable_rig_cull(mega_mini_rig):
+    mega_mini_rig[OBJ_PROP_USE_CULL] = True
+    if OBJ_PROP_CULL_MIN_SCALE not in mega_mini_rig:
+        mega_mini_rig[OBJ_PROP_CULL_MIN_SCALE] = 0.001
+    cull_rig_data.pop(mega_mini_rig.name, None)
+    cull_rig_names.add(mega_mini_rig.name)
+    cull_mega_mini_rig(mega_mini_rig)
+
+def disable_rig_cull(mega_mini_rig):
+    mega_mini_rig[OBJ_PROP_USE_CULL] = False
+    cull_rig_names.discard(mega_mini_rig.name)
+    culled = cull_rig_culled.pop(mega_mini_rig.name, None)
+    if culled is None:
+        culled = find_culled_place_bnames(mega_mini_rig)
+    set_places_culled(mega_mini_rig, culled, False)
+    cull_rig_data.pop(mega_mini_rig.name, None)
+
+class MEGAMINI_CullEnable(bpy.types.Operator):
+    bl_description = "Cull Places of active MegaMini Rig with scale less than Cull Min Scale. Culled Places' " + \
+        "drivers are muted, and their attached objects are hidden in viewport and render"
+    bl_idname = "mega_mini.cull_enable"
+    bl_label = "Enable Culling"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        active_ob = context.active_object
+        if not is_mega_mini_rig(active_ob):
+            self.report({'ERROR'}, "Unable to enable Culling because Active Object is not a MegaMini Rig.")
+            return {'CANCELLED'}
+        enable_rig_cull(active_ob)
+        return {'FINISHED'}
+
+class MEGAMINI_CullDisable(bpy.types.Operator):
+    bl_description = "Stop culling Places of active MegaMini Rig, and show objects hidden by culling"
+    bl_idname = "mega_mini.cull_disable"
+    bl_label = "Disable Culling"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        active_ob = context.active_object
+        if not is_mega_mini_rig(active_ob):
+            self.report({'ERROR'}, "Unable to disable Culling because Active Object is not a MegaMini Rig.")
+            return {'CANCELLED'}
+        disable_rig_cull(active_ob)
+        return {'FINISHED'}
@@ -0,0 +1,216 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# MegaMini driver audit: Blender evaluates a driver expression without the Python interpreter only if the expression
+# is a 'simple expression', i.e. uses only numbers, variables, arithmetic / comparison / logic operators, conditional
+# expressions, and a small set of math functions (e.g. min, max, pow, sqrt). Other expressions need Python, which
+# is slower, and which does not work if auto-run of Python scripts is disabled.
+# Drivers of a MegaMini rig (and drivers of node groups that use the rig) are checked, and expressions that are not
+# simple are re-written in simple form where possible (e.g. "a ** b" is re-written as "pow(a, b)").
+
+import ast
+import math
+
+import bpy
+
+from .rig import is_mega_mini_rig
+
+# functions and constants available in Blender's simple expressions
+SIMPLE_EXPR_FUNCS = set(["abs", "fabs", "floor", "ceil", "trunc", "int", "sin", "cos", "tan", "asin", "acos",
+    "atan", "atan2", "exp", "log", "sqrt", "pow", "fmod", "min", "max", "radians", "degrees", "signum", "lerp",
+    "clamp", "smoothstep"])
+SIMPLE_EXPR_CONSTS = set(["pi", "True", "False"])
+
+SIMPLE_BIN_OPS = { ast.Add: "+", ast.Sub: "-", ast.Mult: "*", ast.Div: "/" }
+SIMPLE_UNARY_OPS = { ast.UAdd: "+", ast.USub: "-", ast.Not: "not " }
+SIMPLE_CMP_OPS = { ast.Eq: "==", ast.NotEq: "!=", ast.Lt: "<", ast.LtE: "<=", ast.Gt: ">", ast.GtE: ">=" }
+SIMPLE_BOOL_OPS = { ast.And: " and ", ast.Or: " or " }
+
+def get_constant_value(node):
+    # Python 3.8+ uses ast.Constant, earlier versions use ast.Num and ast.NameConstant
+    if isinstance(node, ast.Constant):
+        return node.value
+    return getattr(node, "n", getattr(node, "value", None))
+
+def is_constant_node(node):
+    return type(node).__name__ in ("Constant", "Num", "NameConstant")
+
+# convert expression syntax tree to string, if the tree uses only simple expression syntax,
+# returns None if the tree is not a simple expression
+def simple_expr_to_string(node):
+    if isinstance(node, ast.Expression):
+        return simple_expr_to_string(node.body)
+    if is_constant_node(node):
+        value = get_constant_value(node)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return str(value) if isinstance(value, bool) else None
+        # repr of a non-finite float (e.g. 1e400) is 'inf' or 'nan', which are not valid expression constants
+        if isinstance(value, float) and not math.isfinite(value):
+            return None
+        return repr(value)
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.BinOp) and type(node.op) in SIMPLE_BIN_OPS:
+        left = simple_expr_to_string(node.left)
+        right = simple_expr_to_string(node.right)
+        if left is None or right is None:
+            return None
+        return "(" + left + " " + SIMPLE_BIN_OPS[type(node.op)] + " " + right + ")"
+    if isinstance(node, ast.UnaryOp) and type(node.op) in SIMPLE_UNARY_OPS:
+        operand = simple_expr_to_string(node.operand)
+        if operand is None:
+            return None
+        return "(" + SIMPLE_UNARY_OPS[type(node.op)] + operand + ")"
+    if isinstance(node, ast.Compare) and all([ type(op) in SIMPLE_CMP_OPS for op in node.ops ]):
+        parts = [ simple_expr_to_string(node.left) ]
+        for op, comparator in zip(node.ops, node.comparators):
+            parts.append(SIMPLE_CMP_OPS[type(op)])
+            parts.append(simple_expr_to_string(comparator))
+        if None in parts:
+            return None
+        return "(" + " ".join(parts) + ")"
+    if isinstance(node, ast.BoolOp) and type(node.op) in SIMPLE_BOOL_OPS:
+        values = [ simple_expr_to_string(v) for v in node.values ]
+        if None in values:
+            return None
+        return "(" + SIMPLE_BOOL_OPS[type(node.op)].join(values) + ")"
+    if isinstance(node, ast.IfExp):
+        parts = [ simple_expr_to_string(node.body), simple_expr_to_string(node.test),
+                  simple_expr_to_string(node.orelse) ]
+        if None in parts:
+            return None
+        return "(" + parts[0] + " if " + parts[1] + " else " + parts[2] + ")"
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in SIMPLE_EXPR_FUNCS and \
+            len(node.keywords) == 0:
+        args = [ simple_expr_to_string(a) for a in node.args ]
+        if None in args:
+            return None
+        return node.func.id + "(" + ", ".join(args) + ")"
+    return None
+
+# re-write syntax tree nodes that have simple expression equivalents
+class SimpleExprTransformer(ast.NodeTransformer):
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        # "a ** b" -> "pow(a, b)"
+        if isinstance(node.op, ast.Pow):
+            return ast.copy_location(ast.Call(func=ast.Name(id="pow", ctx=ast.Load()), args=[node.left, node.right],
+                                              keywords=[]), node)
+        return node
+
+def is_simple_expression(expression):
+    try:
+        tree = ast.parse(expression, mode='eval')
+    except SyntaxError:
+        return False
+    return simple_expr_to_string(tree) != None
+
+# returns expression re-written as a simple expression, or None if this is not possible
+def rewrite_simple_expression(expression):
+    try:
+        tree = ast.parse(expression, mode='eval')
+    except SyntaxError:
+        return None
+    return simple_expr_to_string(SimpleExprTransformer().visit(tree))
+
+def is_driver_simple(driver):
+    if driver.type != 'SCRIPTED':
+        return True
+    # Blender v2.8+ reports if expression is simple
+    if hasattr(driver, "is_simple_expression"):
+        return driver.is_simple_expression
+    return is_simple_expression(driver.expression)
+
+# ID datablocks with MegaMini drivers of 'mega_mini_rig': the rig, and node groups with drivers that use the rig
+def get_rig_driver_ids(mega_mini_rig):
+    ids = [mega_mini_rig]
+    for node_group in bpy.data.node_groups:
+        if node_group.animation_data is None:
+            continue
+        for fc in node_group.animation_data.drivers:
+            if any([ t.id == mega_mini_rig for v in fc.driver.variables for t in v.targets ]):
+                ids.append(node_group)
+                break
+    return ids
+
+# returns (driver_count, list of (id_name, data_path, array_index, expression) of drivers that are not simple)
+def audit_rig_drivers(mega_mini_rig):
+    driver_count = 0
+    not_simple = []
+    for id_data in get_rig_driver_ids(mega_mini_rig):
+        if id_data.animation_data is None:
+            continue
+        for fc in id_data.animation_data.drivers:
+            driver_count += 1
+            if not is_driver_simple(fc.driver):
+                not_simple.append((id_data.name, fc.data_path, fc.array_index, fc.driver.expression))
+    return driver_count, not_simple
+
+# re-write expressions of drivers that are not simple, returns (fixed_count, unfixable_count)
+def fix_rig_drivers(mega_mini_rig):
+    fixed_count = 0
+    unfixable_count = 0
+    for id_data in get_rig_driver_ids(mega_mini_rig):
+        if id_data.animation_data is None:
+            continue
+        for fc in id_data.animation_data.drivers:
+            if is_driver_simple(fc.driver):
+                continue
+            new_expression = rewrite_simple_expression(fc.driver.expression)
+            if new_expression is None:
+                unfixable_count += 1
+                continue
+            fc.driver.expression = new_expression
+            fixed_count += 1
+    return fixed_count, unfixable_count
+
+class MEGAMINI_DriverAudit(bpy.types.Operator):
+    bl_description = "Check drivers of active MegaMini Rig, and report drivers with expressions that need " + \
+        "Python to evaluate (i.e. not 'simple expressions'). Details are printed to system console"
+    bl_idname = "mega_mini.driver_audit"
+    bl_label = "Audit Drivers"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        active_ob = context.active_object
+        if not is_mega_mini_rig(active_ob):
+            self.report({'ERROR'}, "Unable to audit drivers because Active Object is not a MegaMini Rig.")
+            return {'CANCELLED'}
+        driver_count, not_simple = audit_rig_drivers(active_ob)
+        for id_name, data_path, array_index, expression in not_simple:
+            print("MegaMini driver needs Python: " + id_name + " " + data_path + "[" + str(array_index) + "]: " +
+                  expression)
+        self.report({'INFO'}, str(driver_count) + " drivers checked, " + str(len(not_simple)) + " need Python.")
+        return {'FINISHED'}
+
+class MEGAMINI_DriverFix(bpy.types.Operator):
+    bl_description = "Re-write expressions of active MegaMini Rig's drivers as 'simple expressions', where " + \
+        "possible, so the drivers are evaluated without Python"
+    bl_idname = "mega_mini.driver_fix"
+    bl_label = "Fix Drivers"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        active_ob = context.active_object
+        if not is_mega_mini_rig(active_ob):
+            self.report({'ERROR'}, "Unable to fix drivers because Active Object is not a MegaMini Rig.")
+            return {'CANCELLED'}
+        fixed_count, unfixable_count = fix_rig_drivers(active_ob)
+        self.report({'INFO'}, str(fixed_count) + " drivers re-written, " + str(unfixable_count) +
+                    " drivers could not be re-written.")
+        return {'FINISHED'}
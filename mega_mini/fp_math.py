@@ -0,0 +1,222 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# MegaMini 'forced perspective' math, for many Places at once, using NumPy arrays.
+# This module does not import bpy (or any other MegaMini module), so it can be used outside of Blender, e.g. by
+# loading this file directly:
+#     sys.path.append("/path/to/mega_mini")
+#     import fp_math
+# Formulas are the same as the Place bone drivers (see add_bone_scl_drivers and add_bone_loc_drivers in attach.py):
+#     scale = max(fp_min_scale, bone_scl_mult / ( (1 + max(0, mega_mini_scale * proxy_dist - fp_min_dist)) ** fp_power ))
+#     location = (proxy_place_loc - proxy_observer_loc) * mega_mini_scale * scale
+# where proxy_dist is distance from ProxyPlaceFocus to ProxyObserver (ProxyPlaceFocus is usually at the same
+# location as ProxyPlace).
+
+import numpy as np
+
+# reference (non-vectorized) version of Place scale formula, one Place at a time
+def fp_scale_scalar(proxy_dist, mega_mini_scale, fp_power, fp_min_dist, fp_min_scale, bone_scl_mult=1.0):
+    return max(fp_min_scale, bone_scl_mult / ( (1 + max(0, mega_mini_scale * proxy_dist - fp_min_dist)) ** fp_power ))
+
+# reference (non-vectorized) version of Place location and scale formulas, one Place at a time,
+# returns (location, scale)
+def fp_place_loc_scale_scalar(proxy_place_loc, proxy_observer_loc, mega_mini_scale, fp_power, fp_min_dist,
+                              fp_min_scale, bone_scl_mult=1.0, proxy_dist=None):
+    offset = [proxy_place_loc[i] - proxy_observer_loc[i] for i in range(3)]
+    if proxy_dist is None:
+        proxy_dist = (offset[0]**2 + offset[1]**2 + offset[2]**2) ** 0.5
+    scale = fp_scale_scalar(proxy_dist, mega_mini_scale, fp_power, fp_min_dist, fp_min_scale, bone_scl_mult)
+    return tuple(offset[i] * mega_mini_scale * scale for i in range(3)), scale
+
+# Place scales for array of N distances (ProxyPlaceFocus to ProxyObserver, in proxy space),
+# bone_scl_mults may be a single value or an array of N values, returns array of N scales
+def fp_scales(proxy_dists, mega_mini_scale, fp_power, fp_min_dist, fp_min_scale, bone_scl_mults=1.0):
+    proxy_dists = np.asarray(proxy_dists, dtype=np.float64)
+    return np.maximum(fp_min_scale, np.asarray(bone_scl_mults, dtype=np.float64) /
+                      (1.0 + np.maximum(0.0, mega_mini_scale * proxy_dists - fp_min_dist)) ** fp_power)
+
+# Place locations and scales for N Places,
+#     proxy_place_locs: array of shape (N, 3), ProxyPlace locations
+#     proxy_observer_loc: array of shape (3,), ProxyObserver location
+#     bone_scl_mults: single value or array of N values, Place bone 'mega_mini_bone_scl_mult' values
+#     proxy_dists: optional array of N values, distances from ProxyPlaceFocus to ProxyObserver - if None then
+#         distances from ProxyPlace to ProxyObserver are used
+# returns (locations, scales) as arrays of shape (N, 3) and (N,)
+def fp_place_locs_scales(proxy_place_locs, proxy_observer_loc, mega_mini_scale, fp_power, fp_min_dist, fp_min_scale,
+                         bone_scl_mults=1.0, proxy_dists=None):
+    offsets = np.asarray(proxy_place_locs, dtype=np.float64).reshape(-1, 3) - \
+        np.asarray(proxy_observer_loc, dtype=np.float64).reshape(3)
+    if proxy_dists is None:
+        proxy_dists = np.sqrt(np.einsum('ij,ij->i', offsets, offsets))
+    scales = fp_scales(proxy_dists, mega_mini_scale, fp_power, fp_min_dist, fp_min_scale, bone_scl_mults)
+    return offsets * (mega_mini_scale * scales)[:, np.newaxis], scales
+
+# distance (ProxyPlaceFocus to ProxyObserver) beyond which Place scale is less than 'cull_min_scale', for all Places
+# with bone_scl_mult less than or equal to 'max_bone_scl_mult' - Place scale decreases as distance increases, so Places
+# farther away than this distance can be culled,
+# returns None if Places cannot be culled at any distance, or a negative value if all Places can be culled
+def fp_cull_dist(mega_mini_scale, fp_power, fp_min_dist, fp_min_scale, cull_min_scale, max_bone_scl_mult=1.0):
+    if fp_min_scale >= cull_min_scale or fp_power <= 0 or mega_mini_scale <= 0:
+        return None
+    if max_bone_scl_mult < cull_min_scale:
+        return -1.0
+    return ((max_bone_scl_mult / cull_min_scale) ** (1.0 / fp_power) - 1.0 + fp_min_dist) / mega_mini_scale
+
+# Forward and inverse mapping between proxy space, actual space, and displayed space, for N positions at once.
+# All positions are in MegaMini Rig (armature object) space:
+#     proxy space: ProxyField child bone space, e.g. ProxyPlace and ProxyObserver locations
+#     actual space: offset from Observer, equal to proxy offset (from ProxyObserver) times mega_mini_scale
+#     displayed space: Observer location plus actual offset times forced perspective scale, i.e. where Place is shown
+# Mapping assumes that ProxyPlaceFocus is at ProxyPlace location, so forced perspective distance is length of
+# actual offset.
+
+# actual offsets (shape (N, 3)) from proxy locations (shape (N, 3))
+def proxy_to_actual(proxy_locs, proxy_observer_loc, mega_mini_scale):
+    return (np.asarray(proxy_locs, dtype=np.float64).reshape(-1, 3) -
+            np.asarray(proxy_observer_loc, dtype=np.float64).reshape(3)) * mega_mini_scale
+
+# proxy locations (shape (N, 3)) from actual offsets (shape (N, 3))
+def actual_to_proxy(actual_offsets, proxy_observer_loc, mega_mini_scale):
+    return np.asarray(actual_offsets, dtype=np.float64).reshape(-1, 3) / mega_mini_scale + \
+        np.asarray(proxy_observer_loc, dtype=np.float64).reshape(3)
+
+# displayed locations and scales, from actual offsets (shape (N, 3)),
+# returns (locations, scales) as arrays of shape (N, 3) and (N,)
+def actual_to_displayed(actual_offsets, observer_loc, fp_power, fp_min_dist, fp_min_scale, bone_scl_mults=1.0):
+    actual_offsets = np.asarray(actual_offsets, dtype=np.float64).reshape(-1, 3)
+    actual_dists = np.sqrt(np.einsum('ij,ij->i', actual_offsets, actual_offsets))
+    # mega_mini_scale is already applied to actual offsets
+    scales = fp_scales(actual_dists, 1.0, fp_power, fp_min_dist, fp_min_scale, bone_scl_mults)
+    return np.asarray(observer_loc, dtype=np.float64).reshape(3) + actual_offsets * scales[:, np.newaxis], scales
+
+# forward mapping: displayed locations and scales, from proxy locations (shape (N, 3)),
+# returns (locations, scales) as arrays of shape (N, 3) and (N,)
+def proxy_to_displayed(proxy_locs, proxy_observer_loc, observer_loc, mega_mini_scale, fp_power, fp_min_dist,
+                       fp_min_scale, bone_scl_mults=1.0):
+    return actual_to_displayed(proxy_to_actual(proxy_locs, proxy_observer_loc, mega_mini_scale), observer_loc,
+                               fp_power, fp_min_dist, fp_min_scale, bone_scl_mults)
+
+# displayed distance, and derivative of displayed distance, for actual distances
+def displayed_dists_derivs(actual_dists, fp_power, fp_min_dist, fp_min_scale, bone_scl_mults):
+    base = 1.0 + np.maximum(0.0, actual_dists - fp_min_dist)
+    unclamped = bone_scl_mults / base ** fp_power
+    clamped = unclamped < fp_min_scale
+    scales = np.where(clamped, fp_min_scale, unclamped)
+    # derivative of scale is zero when scale is clamped, or when actual distance is less than min distance
+    scale_derivs = np.where(clamped | (actual_dists <= fp_min_dist), 0.0, -fp_power * unclamped / base)
+    return actual_dists * scales, scales + actual_dists * scale_derivs
+
+# inverse of displayed distance, solved by Newton's method with bisection fallback (vectorized), returns actual
+# distances - if displayed distance is not a one-to-one function of actual distance (e.g. fp_power > 1 and
+# fp_min_scale is zero), then one of the possible actual distances is returned, and NaN is returned where there is
+# no solution
+def displayed_to_actual_dists(displayed_dists, fp_power, fp_min_dist, fp_min_scale, bone_scl_mults=1.0,
+                              tolerance=1e-9, max_iterations=100):
+    displayed_dists = np.asarray(displayed_dists, dtype=np.float64).reshape(-1)
+    bone_scl_mults = np.broadcast_to(np.asarray(bone_scl_mults, dtype=np.float64), displayed_dists.shape)
+    # bracket solution between 'lo' (displayed distance <= target) and 'hi' (displayed distance >= target)
+    lo = np.zeros(displayed_dists.shape)
+    if fp_min_scale > 0:
+        # scale is at least fp_min_scale, so actual distance is at most displayed distance / fp_min_scale
+        hi = displayed_dists / fp_min_scale
+    else:
+        hi = np.maximum(displayed_dists, 1.0)
+        for _ in range(max_iterations):
+            under = displayed_dists_derivs(hi, fp_power, fp_min_dist, fp_min_scale, bone_scl_mults)[0] < \
+                displayed_dists
+            if not np.any(under):
+                break
+            hi = np.where(under, hi * 2.0, hi)
+    hi_disp = displayed_dists_derivs(hi, fp_power, fp_min_dist, fp_min_scale, bone_scl_mults)[0]
+    no_solution = hi_disp < displayed_dists * (1.0 - tolerance)
+    x = np.where(displayed_dists > 0, hi, 0.0)
+    for _ in range(max_iterations):
+        f, df = displayed_dists_derivs(x, fp_power, fp_min_dist, fp_min_scale, bone_scl_mults)
+        err = f - displayed_dists
+        if np.all(np.abs(err) <= tolerance * np.maximum(1.0, displayed_dists)):
+            break
+        lo = np.where(err < 0, x, lo)
+        hi = np.where(err > 0, x, hi)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton_x = x - err / df
+        # use bisection where Newton step leaves bracket
+        use_newton = (df > 0) & (newton_x > lo) & (newton_x < hi)
+        x = np.where(use_newton, newton_x, (lo + hi) * 0.5)
+    return np.where(no_solution, np.nan, x)
+
+# inverse mapping: proxy locations (shape (N, 3)) and actual offsets (shape (N, 3)) from displayed locations
+# (shape (N, 3)), returns (proxy_locations, actual_offsets) - see displayed_to_actual_dists
+def displayed_to_proxy(displayed_locs, observer_loc, proxy_observer_loc, mega_mini_scale, fp_power, fp_min_dist,
+                       fp_min_scale, bone_scl_mults=1.0, tolerance=1e-9, max_iterations=100):
+    displayed_offsets = np.asarray(displayed_locs, dtype=np.float64).reshape(-1, 3) - \
+        np.asarray(observer_loc, dtype=np.float64).reshape(3)
+    displayed_dists = np.sqrt(np.einsum('ij,ij->i', displayed_offsets, displayed_offsets))
+    actual_dists = displayed_to_actual_dists(displayed_dists, fp_power, fp_min_dist, fp_min_scale, bone_scl_mults,
+                                             tolerance, max_iterations)
+    # actual offset has same direction as displayed offset
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = np.where(displayed_dists > 0, actual_dists / displayed_dists, 0.0)
+    actual_offsets = displayed_offsets * ratios[:, np.newaxis]
+    return actual_to_proxy(actual_offsets, proxy_observer_loc, mega_mini_scale), actual_offsets
+
+# rotation matrices (shape (..., 3, 3)) from Euler XYZ rotations (shape (..., 3)), same as Blender's Euler XYZ,
+# i.e. R = Rz @ Ry @ Rx
+def euler_xyz_to_matrices(eulers):
+    eulers = np.asarray(eulers, dtype=np.float64)
+    cx, cy, cz = np.cos(eulers[..., 0]), np.cos(eulers[..., 1]), np.cos(eulers[..., 2])
+    sx, sy, sz = np.sin(eulers[..., 0]), np.sin(eulers[..., 1]), np.sin(eulers[..., 2])
+    mats = np.empty(eulers.shape[:-1] + (3, 3))
+    mats[..., 0, 0] = cy * cz
+    mats[..., 0, 1] = sx * sy * cz - cx * sz
+    mats[..., 0, 2] = cx * sy * cz + sx * sz
+    mats[..., 1, 0] = cy * sz
+    mats[..., 1, 1] = sx * sy * sz + cx * cz
+    mats[..., 1, 2] = cx * sy * sz - sx * cz
+    mats[..., 2, 0] = -sy
+    mats[..., 2, 1] = sx * cy
+    mats[..., 2, 2] = cx * cy
+    return mats
+
+# rotation matrices (shape (..., 3, 3)) from quaternions (shape (..., 4), W X Y Z order, normalized here)
+def quat_to_matrices(quats):
+    quats = np.asarray(quats, dtype=np.float64)
+    quats = quats / np.linalg.norm(quats, axis=-1, keepdims=True)
+    w, x, y, z = quats[..., 0], quats[..., 1], quats[..., 2], quats[..., 3]
+    mats = np.empty(quats.shape[:-1] + (3, 3))
+    mats[..., 0, 0] = 1 - 2 * (y * y + z * z)
+    mats[..., 0, 1] = 2 * (x * y - w * z)
+    mats[..., 0, 2] = 2 * (x * z + w * y)
+    mats[..., 1, 0] = 2 * (x * y + w * z)
+    mats[..., 1, 1] = 1 - 2 * (x * x + z * z)
+    mats[..., 1, 2] = 2 * (y * z - w * x)
+    mats[..., 2, 0] = 2 * (x * z - w * y)
+    mats[..., 2, 1] = 2 * (y * z + w * x)
+    mats[..., 2, 2] = 1 - 2 * (x * x + y * y)
+    return mats
+
+# Euler XYZ rotations (shape (..., 3)) from rotation matrices (shape (..., 3, 3))
+def matrices_to_euler_xyz(mats):
+    mats = np.asarray(mats, dtype=np.float64)
+    cy = np.hypot(mats[..., 0, 0], mats[..., 1, 0])
+    not_gimbal = cy > 1e-6
+    eulers = np.empty(mats.shape[:-2] + (3,))
+    eulers[..., 0] = np.where(not_gimbal, np.arctan2(mats[..., 2, 1], mats[..., 2, 2]),
+                              np.arctan2(-mats[..., 1, 2], mats[..., 1, 1]))
+    eulers[..., 1] = np.arctan2(-mats[..., 2, 0], cy)
+    eulers[..., 2] = np.where(not_gimbal, np.arctan2(mats[..., 1, 0], mats[..., 0, 0]), 0.0)
+    return eulers
@@ -19,7 +19,13 @@
 import bpy
 
 from .rig import (OBJ_PROP_FP_MIN_DIST, OBJ_PROP_FP_POWER, OBJ_PROP_FP_MIN_SCALE, OBJ_PROP_BONE_SCL_MULT,
-    MEGA_MINI_CUSTOM_NODE_GROUP_NAME, is_mega_mini_rig, get_parent_mega_mini_rig)
+    MEGA_MINI_CUSTOM_NODE_GROUP_NAME, MEGA_MINI_FUSED_NODE_GROUP_NAME,
+    MEGA_MINI_PER_POINT_NODE_GROUP_NAME, is_mega_mini_rig, get_parent_mega_mini_rig)
+
+RIG_PARAMS_NODE_GROUP_PREFIX = "MegaMiniRigParams:"
+PLACE_PARAMS_NODE_GROUP_PREFIX = "MegaMiniPlaceParams:"
+NODE_GROUP_PROP_RIG = "mega_mini_rig"
+NODE_GROUP_PROP_PLACE = "mega_mini_place"
 
 def create_mega_mini_custom_geo_node_group(node_group_name):
     # initialize variables
@@ -280,7 +286,363 @@ def create_mega_mini_custom_geo_node_group(node_group_name):
 
     return new_node_group
 
-def add_mega_mini_to_geo_node_group(existing_group_name, clear_node_tree, mega_mini_rig, mega_mini_rig_bone, attached_obj):
+# add node to tree, with name and location, and optional label and operation
+def add_geo_node(tree_nodes, new_nodes, node_type, name, location, label=None, operation=None):
+    node = tree_nodes.new(type=node_type)
+    node.name = name
+    if label != None:
+        node.label = label
+    node.location = location
+    if operation != None:
+        node.operation = operation
+    new_nodes[name] = node
+    return node
+
+# 'fused' variant of MegaMini custom geometry node group, with the same inputs and outputs, and the same result, as
+# the standard variant (see create_mega_mini_custom_geo_node_group).
+# Object and Place transforms are composed into linear maps (three basis vectors and an offset) that are computed
+# once per evaluation, so that each vertex needs only Multiply Add nodes, instead of Vector Rotate nodes, to do and
+# undo the Object and Place transforms. The min dist and min scale selections are done with Maximum nodes.
+# per_point: if True then instances are scaled, and point cloud point radii are multiplied, by the per point forced
+# perspective scale (see create_mega_mini_per_point_geo_node_group)
+def create_mega_mini_fused_geo_node_group(node_group_name, per_point=False):
+    # initialize variables
+    new_nodes = {}
+    new_node_group = bpy.data.node_groups.new(name=node_group_name, type='GeometryNodeTree')
+    new_node_group.inputs.new(type='NodeSocketGeometry', name="Geometry")
+    new_node_group.inputs.new(type='NodeSocketFloat', name="MegaMini FP Power")
+    new_node_group.inputs.new(type='NodeSocketFloat', name="MegaMini FP Min Dist")
+    new_node_group.inputs.new(type='NodeSocketFloat', name="MegaMini FP Min Scale")
+    new_node_group.inputs.new(type='NodeSocketFloat', name="Place Scale Mult")
+    new_node_group.inputs.new(type='NodeSocketVector', name="Place Loc")
+    new_node_group.inputs.new(type='NodeSocketVectorEuler', name="Place Rot")
+    new_node_group.inputs.new(type='NodeSocketVector', name="Place Scale")
+    new_node_group.inputs.new(type='NodeSocketVector', name="Object Loc")
+    new_node_group.inputs.new(type='NodeSocketVectorEuler', name="Object Rot")
+    new_node_group.inputs.new(type='NodeSocketVector', name="Object Scale")
+    new_node_group.outputs.new(type='NodeSocketGeometry', name="Geometry")
+    tree_nodes = new_node_group.nodes
+    # delete old nodes before adding new nodes
+    tree_nodes.clear()
+    tree_links = new_node_group.links
+
+    group_input = add_geo_node(tree_nodes, new_nodes, "NodeGroupInput", "Group Input", (-2200, -300))
+    in_fp_power = group_input.outputs[1]
+    in_fp_min_dist = group_input.outputs[2]
+    in_fp_min_scale = group_input.outputs[3]
+    in_place_scale_mult = group_input.outputs[4]
+    in_place_loc = group_input.outputs[5]
+    in_place_rot = group_input.outputs[6]
+    in_place_scale = group_input.outputs[7]
+    in_obj_loc = group_input.outputs[8]
+    in_obj_rot = group_input.outputs[9]
+    in_obj_scale = group_input.outputs[10]
+
+    # uniform values, computed once per evaluation
+    # 'do transform' basis vectors, i.e. X, Y, Z axis vectors with Object transform and Place transform applied:
+    #     Rotate(Rotate(axis, Object Rot) * Object Scale, Place Rot)
+    do_axis_outputs = []
+    for index, axis in enumerate([(1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0)]):
+        y = -700 - 150 * index
+        node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeVectorRotate", "Do Axis Obj Rot."+str(index),
+                            (-1900, y))
+        node.rotation_type = 'EULER_XYZ'
+        node.inputs[0].default_value = axis
+        tree_links.new(in_obj_rot, node.inputs[4])
+        node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeVectorMath", "Do Axis Obj Scale."+str(index),
+                            (-1700, y), operation="MULTIPLY")
+        tree_links.new(new_nodes["Do Axis Obj Rot."+str(index)].outputs[0], node.inputs[0])
+        tree_links.new(in_obj_scale, node.inputs[1])
+        node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeVectorRotate", "Do Axis Place Rot."+str(index),
+                            (-1500, y))
+        node.rotation_type = 'EULER_XYZ'
+        tree_links.new(new_nodes["Do Axis Obj Scale."+str(index)].outputs[0], node.inputs[0])
+        tree_links.new(in_place_rot, node.inputs[4])
+        do_axis_outputs.append(node.outputs[0])
+    # 'do transform' offset: Rotate(Object Loc, Place Rot) + Place Loc / Place Scale
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeVectorMath", "Place Loc Div Scale", (-1900, -1200),
+                        operation="DIVIDE")
+    tree_links.new(in_place_loc, node.inputs[0])
+    tree_links.new(in_place_scale, node.inputs[1])
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeVectorRotate", "Do Offset Place Rot", (-1700, -1050))
+    node.rotation_type = 'EULER_XYZ'
+    tree_links.new(in_obj_loc, node.inputs[0])
+    tree_links.new(in_place_rot, node.inputs[4])
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeVectorMath", "Do Offset", (-1500, -1150),
+                        operation="ADD")
+    tree_links.new(new_nodes["Do Offset Place Rot"].outputs[0], node.inputs[0])
+    tree_links.new(new_nodes["Place Loc Div Scale"].outputs[0], node.inputs[1])
+
+    # 'undo transform' basis vectors, i.e. X, Y, Z axis vectors with Place transform and Object transform undone,
+    # and multiplied by Place Scale Mult:
+    #     Rotate_inverse(Rotate_inverse(axis / Place Scale, Place Rot), Object Rot) / Object Scale * Place Scale Mult
+    undo_axis_outputs = []
+    for index, axis in enumerate([(1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0)]):
+        y = -1350 - 150 * index
+        node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeVectorMath", "Undo Axis Place Scale."+str(index),
+                            (-1900, y), operation="DIVIDE")
+        node.inputs[0].default_value = axis
+        tree_links.new(in_place_scale, node.inputs[1])
+        node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeVectorRotate", "Undo Axis Place Rot."+str(index),
+                            (-1700, y))
+        node.rotation_type = 'EULER_XYZ'
+        node.invert = True
+        tree_links.new(new_nodes["Undo Axis Place Scale."+str(index)].outputs[0], node.inputs[0])
+        tree_links.new(in_place_rot, node.inputs[4])
+        node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeVectorRotate", "Undo Axis Obj Rot."+str(index),
+                            (-1500, y))
+        node.rotation_type = 'EULER_XYZ'
+        node.invert = True
+        tree_links.new(new_nodes["Undo Axis Place Rot."+str(index)].outputs[0], node.inputs[0])
+        tree_links.new(in_obj_rot, node.inputs[4])
+        node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeVectorMath", "Undo Axis Obj Scale."+str(index),
+                            (-1300, y), operation="DIVIDE")
+        tree_links.new(new_nodes["Undo Axis Obj Rot."+str(index)].outputs[0], node.inputs[0])
+        tree_links.new(in_obj_scale, node.inputs[1])
+        node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeVectorMath", "Undo Axis Scale Mult."+str(index),
+                            (-1100, y), operation="SCALE")
+        tree_links.new(new_nodes["Undo Axis Obj Scale."+str(index)].outputs[0], node.inputs[0])
+        tree_links.new(in_place_scale_mult, node.inputs[3])
+        undo_axis_outputs.append(node.outputs[0])
+    # 'undo transform' offset: -Rotate_inverse(Rotate_inverse(Place Loc / Place Scale, Place Rot) + Object Loc,
+    #     Object Rot) / Object Scale
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeVectorRotate", "Undo Offset Place Rot", (-1700, -1850))
+    node.rotation_type = 'EULER_XYZ'
+    node.invert = True
+    tree_links.new(new_nodes["Place Loc Div Scale"].outputs[0], node.inputs[0])
+    tree_links.new(in_place_rot, node.inputs[4])
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeVectorMath", "Undo Offset Obj Loc", (-1500, -1850),
+                        operation="ADD")
+    tree_links.new(new_nodes["Undo Offset Place Rot"].outputs[0], node.inputs[0])
+    tree_links.new(in_obj_loc, node.inputs[1])
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeVectorRotate", "Undo Offset Obj Rot", (-1300, -1850))
+    node.rotation_type = 'EULER_XYZ'
+    node.invert = True
+    tree_links.new(new_nodes["Undo Offset Obj Loc"].outputs[0], node.inputs[0])
+    tree_links.new(in_obj_rot, node.inputs[4])
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeVectorMath", "Undo Offset Obj Scale", (-1100, -1850),
+                        operation="DIVIDE")
+    tree_links.new(new_nodes["Undo Offset Obj Rot"].outputs[0], node.inputs[0])
+    tree_links.new(in_obj_scale, node.inputs[1])
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeVectorMath", "Undo Offset", (-900, -1850),
+                        operation="SCALE")
+    node.inputs[3].default_value = -1.0
+    tree_links.new(new_nodes["Undo Offset Obj Scale"].outputs[0], node.inputs[0])
+
+    # forced perspective uniform values: (FP Min Dist - 1), and -FP Power
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeMath", "FP Min Dist Minus One", (-700, -300),
+                        operation="SUBTRACT")
+    node.inputs[1].default_value = 1.0
+    tree_links.new(in_fp_min_dist, node.inputs[0])
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeMath", "FP Negative Power", (-500, -300),
+                        operation="MULTIPLY")
+    node.inputs[1].default_value = -1.0
+    tree_links.new(in_fp_power, node.inputs[0])
+
+    # per vertex values
+    node = add_geo_node(tree_nodes, new_nodes, "GeometryNodeInputPosition", "Position", (-2200, 100))
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeSeparateXYZ", "Separate Position", (-2000, 100))
+    tree_links.new(new_nodes["Position"].outputs[0], node.inputs[0])
+    # do Object transform and Place transform
+    prev_output = new_nodes["Do Offset"].outputs[0]
+    for index in range(3):
+        node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeVectorMath", "Do Transform."+str(index),
+                            (-1100 + 200 * index, 100), operation="MULTIPLY_ADD")
+        if index == 2:
+            node.label = "Do Object and Place Transform"
+        tree_links.new(do_axis_outputs[index], node.inputs[0])
+        tree_links.new(new_nodes["Separate Position"].outputs[index], node.inputs[1])
+        tree_links.new(prev_output, node.inputs[2])
+        prev_output = node.outputs[0]
+    # forced perspective scale:
+    #     max(FP Min Scale, max(1, length - (FP Min Dist - 1)) ** -FP Power)
+    # which is the same as:
+    #     max(FP Min Scale, (1 + max(0, length - FP Min Dist)) ** -FP Power)
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeVectorMath", "Length", (-400, 0), operation="LENGTH")
+    tree_links.new(new_nodes["Do Transform.2"].outputs[0], node.inputs[0])
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeMath", "Apply Min Dist", (-200, 0), operation="SUBTRACT")
+    tree_links.new(new_nodes["Length"].outputs[1], node.inputs[0])
+    tree_links.new(new_nodes["FP Min Dist Minus One"].outputs[0], node.inputs[1])
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeMath", "Min Dist Max", (0, 0), operation="MAXIMUM")
+    node.inputs[1].default_value = 1.0
+    tree_links.new(new_nodes["Apply Min Dist"].outputs[0], node.inputs[0])
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeMath", "FP Power", (200, 0), operation="POWER")
+    tree_links.new(new_nodes["Min Dist Max"].outputs[0], node.inputs[0])
+    tree_links.new(new_nodes["FP Negative Power"].outputs[0], node.inputs[1])
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeMath", "Apply Min Scale", (400, 0), operation="MAXIMUM")
+    tree_links.new(new_nodes["FP Power"].outputs[0], node.inputs[0])
+    tree_links.new(in_fp_min_scale, node.inputs[1])
+    # undo Place transform and Object transform, with forced perspective scale applied
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeSeparateXYZ", "Separate Transformed", (0, 200))
+    tree_links.new(new_nodes["Do Transform.2"].outputs[0], node.inputs[0])
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeVectorMath", "Undo Transform.0", (200, 250),
+                        operation="SCALE")
+    tree_links.new(undo_axis_outputs[0], node.inputs[0])
+    tree_links.new(new_nodes["Separate Transformed"].outputs[0], node.inputs[3])
+    for index in range(1, 3):
+        node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeVectorMath", "Undo Transform."+str(index),
+                            (200 + 200 * index, 250), operation="MULTIPLY_ADD")
+        tree_links.new(undo_axis_outputs[index], node.inputs[0])
+        tree_links.new(new_nodes["Separate Transformed"].outputs[index], node.inputs[1])
+        tree_links.new(new_nodes["Undo Transform."+str(index-1)].outputs[0], node.inputs[2])
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeVectorMath", "Do Forced Perspective Transform", (800, 100),
+                        label="Do Forced Perspective Transform", operation="MULTIPLY_ADD")
+    tree_links.new(new_nodes["Undo Transform.2"].outputs[0], node.inputs[0])
+    tree_links.new(new_nodes["Apply Min Scale"].outputs[0], node.inputs[1])
+    tree_links.new(new_nodes["Undo Offset"].outputs[0], node.inputs[2])
+
+    geometry_output = group_input.outputs[0]
+    if per_point:
+        # forced perspective scale relative to Place scale, because Place scale is applied by the object's parent
+        node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeMath", "Point Scale", (600, -250),
+                            operation="MULTIPLY")
+        tree_links.new(new_nodes["Apply Min Scale"].outputs[0], node.inputs[0])
+        tree_links.new(in_place_scale_mult, node.inputs[1])
+        node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeVectorMath", "Point Scale Div Place Scale", (800, -250),
+                            operation="DIVIDE")
+        tree_links.new(new_nodes["Point Scale"].outputs[0], node.inputs[0])
+        tree_links.new(in_place_scale, node.inputs[1])
+        # scale and radius are set before position, so the scale fields are evaluated with the original positions
+        node = add_geo_node(tree_nodes, new_nodes, "GeometryNodeScaleInstances", "Scale Instances", (1000, -250))
+        tree_links.new(geometry_output, node.inputs[0])
+        tree_links.new(new_nodes["Point Scale Div Place Scale"].outputs[0], node.inputs[2])
+        node = add_geo_node(tree_nodes, new_nodes, "GeometryNodeInputRadius", "Radius", (1000, -450))
+        # vector to float conversion is average of X, Y, Z (Place scale is uniform)
+        node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeMath", "Apply Point Scale Radius", (1200, -450),
+                            operation="MULTIPLY")
+        tree_links.new(new_nodes["Radius"].outputs[0], node.inputs[0])
+        tree_links.new(new_nodes["Point Scale Div Place Scale"].outputs[0], node.inputs[1])
+        node = add_geo_node(tree_nodes, new_nodes, "GeometryNodeSetPointRadius", "Set Point Radius", (1400, -250))
+        tree_links.new(new_nodes["Scale Instances"].outputs[0], node.inputs[0])
+        tree_links.new(new_nodes["Apply Point Scale Radius"].outputs[0], node.inputs[2])
+        geometry_output = node.outputs[0]
+
+    node = add_geo_node(tree_nodes, new_nodes, "GeometryNodeSetPosition", "Set Position", (1600, 0))
+    tree_links.new(geometry_output, node.inputs[0])
+    tree_links.new(new_nodes["Do Forced Perspective Transform"].outputs[0], node.inputs[2])
+    node = add_geo_node(tree_nodes, new_nodes, "NodeGroupOutput", "Group Output", (1800, 0))
+    tree_links.new(new_nodes["Set Position"].outputs[0], node.inputs[0])
+
+    return new_node_group
+
+# 'per point' variant of MegaMini custom geometry node group, for very large single objects, e.g. point clouds of
+# asteroid belts, or instances of star fields: same as the 'fused' variant (forced perspective scale is computed
+# from each point's own distance to ProxyObserver), and instances and point radii are also scaled by each point's
+# forced perspective scale, so one object can replace many individually attached objects
+def create_mega_mini_per_point_geo_node_group(node_group_name):
+    return create_mega_mini_fused_geo_node_group(node_group_name, per_point=True)
+
+# add driver to a node output's default value, to copy a single property value, e.g. custom property of rig
+def add_node_output_prop_driver(node, target_id, data_path):
+    drv = node.outputs[0].driver_add('default_value').driver
+    v = drv.variables.new()
+    v.type = 'SINGLE_PROP'
+    v.name                 = "var"
+    v.targets[0].id        = target_id
+    v.targets[0].data_path = data_path
+    drv.expression = v.name
+
+# add drivers to a Vector node's X, Y, Z values, to copy transform values of object/bone, e.g.
+# transform_types = ('LOC_X', 'LOC_Y', 'LOC_Z')
+def add_vector_node_transform_drivers(node, target_id, bone_target, transform_types, transform_space):
+    for index, transform_type in enumerate(transform_types):
+        drv = node.driver_add('vector', index).driver
+        v = drv.variables.new()
+        v.type = 'TRANSFORMS'
+        v.name = "var"
+        v.targets[0].id = target_id
+        if bone_target != None:
+            v.targets[0].bone_target = bone_target
+        v.targets[0].transform_type = transform_type
+        v.targets[0].transform_space = transform_space
+        drv.expression = v.name
+
+# get node group of the MegaMini rig parameters (FP Power, FP Min Dist, FP Min Scale), created if needed - one node
+# group per rig, so drivers for rig parameters are created only once per rig
+def get_mega_mini_rig_params_node_group(mega_mini_rig):
+    group_name = RIG_PARAMS_NODE_GROUP_PREFIX + mega_mini_rig.name
+    node_group = bpy.data.node_groups.get(group_name)
+    if node_group != None and node_group.get(NODE_GROUP_PROP_RIG) == mega_mini_rig:
+        return node_group
+
+    node_group = bpy.data.node_groups.new(name=group_name, type='GeometryNodeTree')
+    node_group[NODE_GROUP_PROP_RIG] = mega_mini_rig
+    node_group.outputs.new(type='NodeSocketFloat', name="MegaMini FP Power")
+    node_group.outputs.new(type='NodeSocketFloat', name="MegaMini FP Min Dist")
+    node_group.outputs.new(type='NodeSocketFloat', name="MegaMini FP Min Scale")
+    tree_nodes = node_group.nodes
+    tree_nodes.clear()
+    tree_links = node_group.links
+
+    node_output = tree_nodes.new(type="NodeGroupOutput")
+    node_output.location = (200, 0)
+    for index, (label, prop_name, default_value) in enumerate([("MegaMini FP Power", OBJ_PROP_FP_POWER, 0.5),
+                                                               ("MegaMini FP Min Dist", OBJ_PROP_FP_MIN_DIST, 0.0),
+                                                               ("MegaMini FP Min Scale", OBJ_PROP_FP_MIN_SCALE, 0.0)]):
+        node = tree_nodes.new(type="ShaderNodeValue")
+        node.label = label
+        node.location = (0, -90 * index)
+        node.outputs[0].default_value = default_value
+        add_node_output_prop_driver(node, mega_mini_rig, "[\""+prop_name+"\"]")
+        tree_links.new(node.outputs[0], node_output.inputs[index])
+    return node_group
+
+# get node group of the MegaMini Place parameters (Place Scale Mult, and Place location, rotation, scale in
+# Transform space and World space), created if needed - one node group per Place, so drivers for Place parameters are
+# created only once per Place, instead of once per object
+def get_mega_mini_place_params_node_group(mega_mini_rig, place_bname):
+    group_name = PLACE_PARAMS_NODE_GROUP_PREFIX + mega_mini_rig.name + ":" + place_bname
+    node_group = bpy.data.node_groups.get(group_name)
+    if node_group != None and node_group.get(NODE_GROUP_PROP_RIG) == mega_mini_rig and \
+            node_group.get(NODE_GROUP_PROP_PLACE) == place_bname:
+        return node_group
+
+    node_group = bpy.data.node_groups.new(name=group_name, type='GeometryNodeTree')
+    node_group[NODE_GROUP_PROP_RIG] = mega_mini_rig
+    node_group[NODE_GROUP_PROP_PLACE] = place_bname
+    node_group.outputs.new(type='NodeSocketFloat', name="Place Scale Mult")
+    node_group.outputs.new(type='NodeSocketVector', name="Place Loc")
+    node_group.outputs.new(type='NodeSocketVectorEuler', name="Place Rot")
+    node_group.outputs.new(type='NodeSocketVector', name="Place Scale")
+    node_group.outputs.new(type='NodeSocketVector', name="Place World Loc")
+    node_group.outputs.new(type='NodeSocketVectorEuler', name="Place World Rot")
+    node_group.outputs.new(type='NodeSocketVector', name="Place World Scale")
+    tree_nodes = node_group.nodes
+    tree_nodes.clear()
+    tree_links = node_group.links
+
+    node_output = tree_nodes.new(type="NodeGroupOutput")
+    node_output.location = (200, 0)
+
+    node = tree_nodes.new(type="ShaderNodeValue")
+    node.label = "Place Scale Mult"
+    node.location = (0, 0)
+    node.outputs[0].default_value = 1.0
+    add_node_output_prop_driver(node, mega_mini_rig,
+                                "pose.bones[\""+place_bname+"\"][\""+OBJ_PROP_BONE_SCL_MULT+"\"]")
+    tree_links.new(node.outputs[0], node_output.inputs[0])
+
+    for index, (label, transform_types, transform_space) in enumerate([
+            ("Place Location", ('LOC_X', 'LOC_Y', 'LOC_Z'), 'TRANSFORM_SPACE'),
+            ("Place Rotation", ('ROT_X', 'ROT_Y', 'ROT_Z'), 'TRANSFORM_SPACE'),
+            ("Place Scale", ('SCALE_X', 'SCALE_Y', 'SCALE_Z'), 'TRANSFORM_SPACE'),
+            ("Place World Loc", ('LOC_X', 'LOC_Y', 'LOC_Z'), 'WORLD_SPACE'),
+            ("Place World Rot", ('ROT_X', 'ROT_Y', 'ROT_Z'), 'WORLD_SPACE'),
+            ("Place World Scale", ('SCALE_X', 'SCALE_Y', 'SCALE_Z'), 'WORLD_SPACE')]):
+        node = tree_nodes.new(type="FunctionNodeInputVector")
+        node.label = label
+        node.location = (0, -90 - 125 * index)
+        if transform_types[0] == 'SCALE_X':
+            node.vector = (1, 1, 1)
+        add_vector_node_transform_drivers(node, mega_mini_rig, place_bname, transform_types, transform_space)
+        tree_links.new(node.outputs[0], node_output.inputs[index+1])
+    return node_group
+
+# use_object_info: if True then Object world transform is read by Self Object and Object Info nodes (Blender 3.4+),
+# otherwise Object world transform is copied to Vector nodes with drivers
+# mega_mini_group_name: name of MegaMini custom node group to use, see GEO_NODES_VARIANT_GROUPS
+def add_mega_mini_to_geo_node_group(existing_group_name, clear_node_tree, mega_mini_rig, mega_mini_rig_bone, attached_obj,
+                                    use_object_info=False, mega_mini_group_name=MEGA_MINI_CUSTOM_NODE_GROUP_NAME):
     existing_node_group = bpy.data.node_groups.get(existing_group_name)
     tree_nodes = existing_node_group.nodes
     # if needed, delete old nodes (clear tree) before adding new nodes
@@ -294,432 +656,69 @@ def add_mega_mini_to_geo_node_group(existing_group_name, clear_node_tree, mega_m
     node.location = (-260, 280)
     new_nodes["Group Input"] = node
 
-    node = tree_nodes.new(type="ShaderNodeValue")
-    node.name = "Value"
-    node.label = "MegaMini FP Power"
+    # rig parameters are shared by all objects attached to the rig, by way of a shared node group
+    node = tree_nodes.new(type="GeometryNodeGroup")
+    node.name = "MegaMiniRigParams"
+    node.label = "MegaMini Rig Params"
+    node.node_tree = get_mega_mini_rig_params_node_group(mega_mini_rig)
     node.location = (-260, 200)
-    node.outputs[0].default_value = 0.5
-    # add driver to get MegaMini FP Power
-    drv_mm_fp_power = node.outputs[0].driver_add('default_value').driver
-    v_mm_fp_power = drv_mm_fp_power.variables.new()
-    v_mm_fp_power.type = 'SINGLE_PROP'
-    v_mm_fp_power.name                 = "var"
-    v_mm_fp_power.targets[0].id        = mega_mini_rig
-    v_mm_fp_power.targets[0].data_path = "[\""+OBJ_PROP_FP_POWER+"\"]"
-    drv_mm_fp_power.expression = v_mm_fp_power.name
-    # finish
-    new_nodes["Value"] = node
-
-    node = tree_nodes.new(type="ShaderNodeValue")
-    node.name = "Value.001"
-    node.label = "MegaMini FP Min Dist"
-    node.location = (-260, 110)
-    node.outputs[0].default_value = 0.0
-    # add driver to get MegaMini FP Min Dist
-    drv_mm_fp_min_dist = node.outputs[0].driver_add('default_value').driver
-    v_mm_fp_min_dist = drv_mm_fp_min_dist.variables.new()
-    v_mm_fp_min_dist.type = 'SINGLE_PROP'
-    v_mm_fp_min_dist.name                 = "var"
-    v_mm_fp_min_dist.targets[0].id        = mega_mini_rig
-    v_mm_fp_min_dist.targets[0].data_path = "[\""+OBJ_PROP_FP_MIN_DIST+"\"]"
-    drv_mm_fp_min_dist.expression = v_mm_fp_min_dist.name
-    # finish
-    new_nodes["Value.001"] = node
+    new_nodes["MegaMiniRigParams"] = node
 
-    node = tree_nodes.new(type="ShaderNodeValue")
-    node.name = "Value.002"
-    node.label = "MegaMini FP Min Scale"
-    node.location = (-260, 20)
-    node.outputs[0].default_value = 0.0
-    # add driver to get MegaMini FP Min Dist
-    drv_mm_fp_min_scale = node.outputs[0].driver_add('default_value').driver
-    v_mm_fp_min_scale = drv_mm_fp_min_scale.variables.new()
-    v_mm_fp_min_scale.type = 'SINGLE_PROP'
-    v_mm_fp_min_scale.name                 = "var"
-    v_mm_fp_min_scale.targets[0].id        = mega_mini_rig
-    v_mm_fp_min_scale.targets[0].data_path = "[\""+OBJ_PROP_FP_MIN_SCALE+"\"]"
-    drv_mm_fp_min_scale.expression = v_mm_fp_min_scale.name
-    # finish
-    new_nodes["Value.002"] = node
-
-    node = tree_nodes.new(type="ShaderNodeValue")
-    node.name = "Value.003"
-    node.label = "Place Scale Mult"
-    node.location = (-260, -70)
-    node.outputs[0].default_value = 1.0
-    # add driver to get Place Scale Mult from MegaMini rig
-    drv_mm_place_scl_mult = node.outputs[0].driver_add('default_value').driver
-    v_mm_place_scl_mult = drv_mm_place_scl_mult.variables.new()
-    v_mm_place_scl_mult.type = 'SINGLE_PROP'
-    v_mm_place_scl_mult.name                 = "var"
-    v_mm_place_scl_mult.targets[0].id        = mega_mini_rig
-    v_mm_place_scl_mult.targets[0].data_path = "pose.bones[\""+mega_mini_rig_bone+"\"][\""+OBJ_PROP_BONE_SCL_MULT+"\"]"
-    drv_mm_place_scl_mult.expression = v_mm_place_scl_mult.name
-    # finish
-    new_nodes["Value.003"] = node
-
-    node = tree_nodes.new(type="FunctionNodeInputVector")
-    node.name = "Vector"
-    node.label = "Place Location"
-    node.location = (-260, -155)
-    # add drivers to get Place location from MegaMini rig, in Transform space coordinates
-    # Place location X
-    drv_place_loc_x = node.driver_add('vector', 0).driver
-    v_place_loc_x = drv_place_loc_x.variables.new()
-    v_place_loc_x.type = 'TRANSFORMS'
-    v_place_loc_x.name = "var"
-    v_place_loc_x.targets[0].id = mega_mini_rig
-    v_place_loc_x.targets[0].bone_target = mega_mini_rig_bone
-    v_place_loc_x.targets[0].transform_type = 'LOC_X'
-    v_place_loc_x.targets[0].transform_space = 'TRANSFORM_SPACE'
-    v_place_loc_x.targets[0].data_path = "location.x"
-    drv_place_loc_x.expression = v_place_loc_x.name
-    # Place location Y
-    drv_place_loc_y = node.driver_add('vector', 1).driver
-    v_place_loc_y = drv_place_loc_y.variables.new()
-    v_place_loc_y.type = 'TRANSFORMS'
-    v_place_loc_y.name = "var"
-    v_place_loc_y.targets[0].id = mega_mini_rig
-    v_place_loc_y.targets[0].bone_target = mega_mini_rig_bone
-    v_place_loc_y.targets[0].transform_type = 'LOC_Y'
-    v_place_loc_y.targets[0].transform_space = 'TRANSFORM_SPACE'
-    v_place_loc_y.targets[0].data_path = "location.y"
-    drv_place_loc_y.expression = v_place_loc_y.name
-    # Place location Z
-    drv_place_loc_z = node.driver_add('vector', 2).driver
-    v_place_loc_z = drv_place_loc_z.variables.new()
-    v_place_loc_z.type = 'TRANSFORMS'
-    v_place_loc_z.name = "var"
-    v_place_loc_z.targets[0].id = mega_mini_rig
-    v_place_loc_z.targets[0].bone_target = mega_mini_rig_bone
-    v_place_loc_z.targets[0].transform_type = 'LOC_Z'
-    v_place_loc_z.targets[0].transform_space = 'TRANSFORM_SPACE'
-    v_place_loc_z.targets[0].data_path = "location.z"
-    drv_place_loc_z.expression = v_place_loc_z.name
-    # finished adding drivers for Place location, in Transform space coordinates
-    new_nodes["Vector"] = node
-
-    node = tree_nodes.new(type="FunctionNodeInputVector")
-    node.name = "Vector.001"
-    node.label = "Place Rotation"
-    node.location = (-260, -280)
-    # add drivers to get Place rotation from MegaMini rig, in Transform space coordinates
-    # Place rotation X
-    drv_place_rot_x = node.driver_add('vector', 0).driver
-    v_place_rot_x = drv_place_rot_x.variables.new()
-    v_place_rot_x.type = 'TRANSFORMS'
-    v_place_rot_x.name = "var"
-    v_place_rot_x.targets[0].id = mega_mini_rig
-    v_place_rot_x.targets[0].bone_target = mega_mini_rig_bone
-    v_place_rot_x.targets[0].transform_type = 'ROT_X'
-    v_place_rot_x.targets[0].transform_space = 'TRANSFORM_SPACE'
-    v_place_rot_x.targets[0].data_path = "rotation.x"
-    drv_place_rot_x.expression = v_place_rot_x.name
-    # Place rotation Y
-    drv_place_rot_y = node.driver_add('vector', 1).driver
-    v_place_rot_y = drv_place_rot_y.variables.new()
-    v_place_rot_y.type = 'TRANSFORMS'
-    v_place_rot_y.name = "var"
-    v_place_rot_y.targets[0].id = mega_mini_rig
-    v_place_rot_y.targets[0].bone_target = mega_mini_rig_bone
-    v_place_rot_y.targets[0].transform_type = 'ROT_Y'
-    v_place_rot_y.targets[0].transform_space = 'TRANSFORM_SPACE'
-    v_place_rot_y.targets[0].data_path = "rotation.y"
-    drv_place_rot_y.expression = v_place_rot_y.name
-    # Place rotation Z
-    drv_place_rot_z = node.driver_add('vector', 2).driver
-    v_place_rot_z = drv_place_rot_z.variables.new()
-    v_place_rot_z.type = 'TRANSFORMS'
-    v_place_rot_z.name = "var"
-    v_place_rot_z.targets[0].id = mega_mini_rig
-    v_place_rot_z.targets[0].bone_target = mega_mini_rig_bone
-    v_place_rot_z.targets[0].transform_type = 'ROT_Z'
-    v_place_rot_z.targets[0].transform_space = 'TRANSFORM_SPACE'
-    v_place_rot_z.targets[0].data_path = "rotation.z"
-    drv_place_rot_z.expression = v_place_rot_z.name
-    # finished adding drivers for Place rotation, in Transform space coordinates
-    new_nodes["Vector.001"] = node
-
-    node = tree_nodes.new(type="FunctionNodeInputVector")
-    node.name = "Vector.002"
-    node.label = "Place Scale"
-    node.vector = (1, 1, 1)
-    node.location = (-260, -405)
-    # add drivers to get Place scale from MegaMini rig, in Transform space coordinates
-    # Place scale X
-    drv_place_scale_x = node.driver_add('vector', 0).driver
-    v_place_scale_x = drv_place_scale_x.variables.new()
-    v_place_scale_x.type = 'TRANSFORMS'
-    v_place_scale_x.name = "var"
-    v_place_scale_x.targets[0].id = mega_mini_rig
-    v_place_scale_x.targets[0].bone_target = mega_mini_rig_bone
-    v_place_scale_x.targets[0].transform_type = 'SCALE_X'
-    v_place_scale_x.targets[0].transform_space = 'TRANSFORM_SPACE'
-    v_place_scale_x.targets[0].data_path = "scale.x"
-    drv_place_scale_x.expression = v_place_scale_x.name
-    # Place scale Y
-    drv_place_scale_y = node.driver_add('vector', 1).driver
-    v_place_scale_y = drv_place_scale_y.variables.new()
-    v_place_scale_y.type = 'TRANSFORMS'
-    v_place_scale_y.name = "var"
-    v_place_scale_y.targets[0].id = mega_mini_rig
-    v_place_scale_y.targets[0].bone_target = mega_mini_rig_bone
-    v_place_scale_y.targets[0].transform_type = 'SCALE_Y'
-    v_place_scale_y.targets[0].transform_space = 'TRANSFORM_SPACE'
-    v_place_scale_y.targets[0].data_path = "scale.y"
-    drv_place_scale_y.expression = v_place_scale_y.name
-    # Place scale Z
-    drv_place_scale_z = node.driver_add('vector', 2).driver
-    v_place_scale_z = drv_place_scale_z.variables.new()
-    v_place_scale_z.type = 'TRANSFORMS'
-    v_place_scale_z.name = "var"
-    v_place_scale_z.targets[0].id = mega_mini_rig
-    v_place_scale_z.targets[0].bone_target = mega_mini_rig_bone
-    v_place_scale_z.targets[0].transform_type = 'SCALE_Z'
-    v_place_scale_z.targets[0].transform_space = 'TRANSFORM_SPACE'
-    v_place_scale_z.targets[0].data_path = "scale.z"
-    drv_place_scale_z.expression = v_place_scale_z.name
-    # finished adding drivers for Place scale, in Transform space coordinates
-    new_nodes["Vector.002"] = node
-
-    node = tree_nodes.new(type="FunctionNodeInputVector")
-    node.name = "Vector.003"
-    node.label = "Object World Loc"
-    node.location = (-745, -535)
-    # add drivers to get Object location, in World coordinates
-    # Object location X
-    drv_attached_obj_loc_x = node.driver_add('vector', 0).driver
-    v_attached_obj_loc_x = drv_attached_obj_loc_x.variables.new()
-    v_attached_obj_loc_x.type = 'TRANSFORMS'
-    v_attached_obj_loc_x.name = "var"
-    v_attached_obj_loc_x.targets[0].id = attached_obj
-    v_attached_obj_loc_x.targets[0].transform_type = 'LOC_X'
-    v_attached_obj_loc_x.targets[0].transform_space = 'WORLD_SPACE'
-    v_attached_obj_loc_x.targets[0].data_path = "location.x"
-    drv_attached_obj_loc_x.expression = v_attached_obj_loc_x.name
-    # Object location Y
-    drv_attached_obj_loc_y = node.driver_add('vector', 1).driver
-    v_attached_obj_loc_y = drv_attached_obj_loc_y.variables.new()
-    v_attached_obj_loc_y.type = 'TRANSFORMS'
-    v_attached_obj_loc_y.name = "var"
-    v_attached_obj_loc_y.targets[0].id = attached_obj
-    v_attached_obj_loc_y.targets[0].transform_type = 'LOC_Y'
-    v_attached_obj_loc_y.targets[0].transform_space = 'WORLD_SPACE'
-    v_attached_obj_loc_y.targets[0].data_path = "location.y"
-    drv_attached_obj_loc_y.expression = v_attached_obj_loc_y.name
-    # Object location Z
-    drv_attached_obj_loc_z = node.driver_add('vector', 2).driver
-    v_attached_obj_loc_z = drv_attached_obj_loc_z.variables.new()
-    v_attached_obj_loc_z.type = 'TRANSFORMS'
-    v_attached_obj_loc_z.name = "var"
-    v_attached_obj_loc_z.targets[0].id = attached_obj
-    v_attached_obj_loc_z.targets[0].transform_type = 'LOC_Z'
-    v_attached_obj_loc_z.targets[0].transform_space = 'WORLD_SPACE'
-    v_attached_obj_loc_z.targets[0].data_path = "location.z"
-    drv_attached_obj_loc_z.expression = v_attached_obj_loc_z.name
-    # finished adding drivers for Object location
-    new_nodes["Vector.003"] = node
-
-    node = tree_nodes.new(type="FunctionNodeInputVector")
-    node.name = "Vector.004"
-    node.label = "Object World Rot"
-    node.location = (-745, -665)
-    # add drivers to get Object rotation, in World coordinates
-    # Object rotation Euler X
-    drv_attached_obj_rot_x = node.driver_add('vector', 0).driver
-    v_attached_obj_rot_x = drv_attached_obj_rot_x.variables.new()
-    v_attached_obj_rot_x.type = 'TRANSFORMS'
-    v_attached_obj_rot_x.name = "var"
-    v_attached_obj_rot_x.targets[0].id = attached_obj
-    v_attached_obj_rot_x.targets[0].transform_type = 'ROT_X'
-    v_attached_obj_rot_x.targets[0].transform_space = 'WORLD_SPACE'
-    v_attached_obj_rot_x.targets[0].data_path = "rotation.x"
-    drv_attached_obj_rot_x.expression = v_attached_obj_rot_x.name
-    # Object rotation Euler Y
-    drv_attached_obj_rot_y = node.driver_add('vector', 1).driver
-    v_attached_obj_rot_y = drv_attached_obj_rot_y.variables.new()
-    v_attached_obj_rot_y.type = 'TRANSFORMS'
-    v_attached_obj_rot_y.name = "var"
-    v_attached_obj_rot_y.targets[0].id = attached_obj
-    v_attached_obj_rot_y.targets[0].transform_type = 'ROT_Y'
-    v_attached_obj_rot_y.targets[0].transform_space = 'WORLD_SPACE'
-    v_attached_obj_rot_y.targets[0].data_path = "rotation.y"
-    drv_attached_obj_rot_y.expression = v_attached_obj_rot_y.name
-    # Object rotation Euler Z
-    drv_attached_obj_rot_z = node.driver_add('vector', 2).driver
-    v_attached_obj_rot_z = drv_attached_obj_rot_z.variables.new()
-    v_attached_obj_rot_z.type = 'TRANSFORMS'
-    v_attached_obj_rot_z.name = "var"
-    v_attached_obj_rot_z.targets[0].id = attached_obj
-    v_attached_obj_rot_z.targets[0].transform_type = 'ROT_Z'
-    v_attached_obj_rot_z.targets[0].transform_space = 'WORLD_SPACE'
-    v_attached_obj_rot_z.targets[0].data_path = "rotation.z"
-    drv_attached_obj_rot_z.expression = v_attached_obj_rot_z.name
-    # finished adding drivers for Object rotation
-    new_nodes["Vector.004"] = node
-
-    node = tree_nodes.new(type="FunctionNodeInputVector")
-    node.name = "Vector.005"
-    node.label = "Object World Scale"
-    node.vector = (1, 1, 1)
-    node.location = (-745, -790)
-    # add drivers to get Object scale, in World coordinates
-    # Object scale X
-    drv_attached_obj_scl_x = node.driver_add('vector', 0).driver
-    v_attached_obj_scl_x = drv_attached_obj_scl_x.variables.new()
-    v_attached_obj_scl_x.type = 'TRANSFORMS'
-    v_attached_obj_scl_x.name = "var"
-    v_attached_obj_scl_x.targets[0].id = attached_obj
-    v_attached_obj_scl_x.targets[0].transform_type = 'SCALE_X'
-    v_attached_obj_scl_x.targets[0].transform_space = 'WORLD_SPACE'
-    v_attached_obj_scl_x.targets[0].data_path = "scale.x"
-    drv_attached_obj_scl_x.expression = v_attached_obj_scl_x.name
-    # Object scale Y
-    drv_attached_obj_scl_y = node.driver_add('vector', 1).driver
-    v_attached_obj_scl_y = drv_attached_obj_scl_y.variables.new()
-    v_attached_obj_scl_y.type = 'TRANSFORMS'
-    v_attached_obj_scl_y.name = "var"
-    v_attached_obj_scl_y.targets[0].id = attached_obj
-    v_attached_obj_scl_y.targets[0].transform_type = 'SCALE_Y'
-    v_attached_obj_scl_y.targets[0].transform_space = 'WORLD_SPACE'
-    v_attached_obj_scl_y.targets[0].data_path = "scale.y"
-    drv_attached_obj_scl_y.expression = v_attached_obj_scl_y.name
-    # Object scale Z
-    drv_attached_obj_scl_z = node.driver_add('vector', 2).driver
-    v_attached_obj_scl_z = drv_attached_obj_scl_z.variables.new()
-    v_attached_obj_scl_z.type = 'TRANSFORMS'
-    v_attached_obj_scl_z.name = "var"
-    v_attached_obj_scl_z.targets[0].id = attached_obj
-    v_attached_obj_scl_z.targets[0].transform_type = 'SCALE_Z'
-    v_attached_obj_scl_z.targets[0].transform_space = 'WORLD_SPACE'
-    v_attached_obj_scl_z.targets[0].data_path = "scale.z"
-    drv_attached_obj_scl_z.expression = v_attached_obj_scl_z.name
-    # finished adding drivers for Object scale
-    new_nodes["Vector.005"] = node
-
-    node = tree_nodes.new(type="FunctionNodeInputVector")
-    node.name = "Vector.006"
-    node.label = "Place World Loc"
-    node.location = (-745, -915)
-    # add drivers to get Place location from MegaMini rig, in World space coordinates
-    # Place location X
-    drv_place_world_loc_x = node.driver_add('vector', 0).driver
-    v_place_world_loc_x = drv_place_world_loc_x.variables.new()
-    v_place_world_loc_x.type = 'TRANSFORMS'
-    v_place_world_loc_x.name = "var"
-    v_place_world_loc_x.targets[0].id = mega_mini_rig
-    v_place_world_loc_x.targets[0].bone_target = mega_mini_rig_bone
-    v_place_world_loc_x.targets[0].transform_type = 'LOC_X'
-    v_place_world_loc_x.targets[0].transform_space = 'WORLD_SPACE'
-    v_place_world_loc_x.targets[0].data_path = "location.x"
-    drv_place_world_loc_x.expression = v_place_world_loc_x.name
-    # Place location Y
-    drv_place_world_loc_y = node.driver_add('vector', 1).driver
-    v_place_world_loc_y = drv_place_world_loc_y.variables.new()
-    v_place_world_loc_y.type = 'TRANSFORMS'
-    v_place_world_loc_y.name = "var"
-    v_place_world_loc_y.targets[0].id = mega_mini_rig
-    v_place_world_loc_y.targets[0].bone_target = mega_mini_rig_bone
-    v_place_world_loc_y.targets[0].transform_type = 'LOC_Y'
-    v_place_world_loc_y.targets[0].transform_space = 'WORLD_SPACE'
-    v_place_world_loc_y.targets[0].data_path = "location.y"
-    drv_place_world_loc_y.expression = v_place_world_loc_y.name
-    # Place location Z
-    drv_place_world_loc_z = node.driver_add('vector', 2).driver
-    v_place_world_loc_z = drv_place_world_loc_z.variables.new()
-    v_place_world_loc_z.type = 'TRANSFORMS'
-    v_place_world_loc_z.name = "var"
-    v_place_world_loc_z.targets[0].id = mega_mini_rig
-    v_place_world_loc_z.targets[0].bone_target = mega_mini_rig_bone
-    v_place_world_loc_z.targets[0].transform_type = 'LOC_Z'
-    v_place_world_loc_z.targets[0].transform_space = 'WORLD_SPACE'
-    v_place_world_loc_z.targets[0].data_path = "location.z"
-    drv_place_world_loc_z.expression = v_place_world_loc_z.name
-    # finished adding drivers for Place location, in World coordinates
-    new_nodes["Vector.006"] = node
-
-    node = tree_nodes.new(type="FunctionNodeInputVector")
-    node.name = "Vector.007"
-    node.label = "Place World Rot"
-    node.location = (-745, -1035)
-    # add drivers to get Place rotation from MegaMini rig, in Transform space coordinates
-    # Place rotation X
-    drv_place_world_rot_x = node.driver_add('vector', 0).driver
-    v_place_world_rot_x = drv_place_world_rot_x.variables.new()
-    v_place_world_rot_x.type = 'TRANSFORMS'
-    v_place_world_rot_x.name = "var"
-    v_place_world_rot_x.targets[0].id = mega_mini_rig
-    v_place_world_rot_x.targets[0].bone_target = mega_mini_rig_bone
-    v_place_world_rot_x.targets[0].transform_type = 'ROT_X'
-    v_place_world_rot_x.targets[0].transform_space = 'WORLD_SPACE'
-    v_place_world_rot_x.targets[0].data_path = "rotation.x"
-    drv_place_world_rot_x.expression = v_place_world_rot_x.name
-    # Place rotation Y
-    drv_place_world_rot_y = node.driver_add('vector', 1).driver
-    v_place_world_rot_y = drv_place_world_rot_y.variables.new()
-    v_place_world_rot_y.type = 'TRANSFORMS'
-    v_place_world_rot_y.name = "var"
-    v_place_world_rot_y.targets[0].id = mega_mini_rig
-    v_place_world_rot_y.targets[0].bone_target = mega_mini_rig_bone
-    v_place_world_rot_y.targets[0].transform_type = 'ROT_Y'
-    v_place_world_rot_y.targets[0].transform_space = 'WORLD_SPACE'
-    v_place_world_rot_y.targets[0].data_path = "rotation.y"
-    drv_place_world_rot_y.expression = v_place_world_rot_y.name
-    # Place rotation Z
-    drv_place_world_rot_z = node.driver_add('vector', 2).driver
-    v_place_world_rot_z = drv_place_world_rot_z.variables.new()
-    v_place_world_rot_z.type = 'TRANSFORMS'
-    v_place_world_rot_z.name = "var"
-    v_place_world_rot_z.targets[0].id = mega_mini_rig
-    v_place_world_rot_z.targets[0].bone_target = mega_mini_rig_bone
-    v_place_world_rot_z.targets[0].transform_type = 'ROT_Z'
-    v_place_world_rot_z.targets[0].transform_space = 'WORLD_SPACE'
-    v_place_world_rot_z.targets[0].data_path = "rotation.z"
-    drv_place_world_rot_z.expression = v_place_world_rot_z.name
-    # finished adding drivers for Place rotation
-    new_nodes["Vector.007"] = node
-
-    node = tree_nodes.new(type="FunctionNodeInputVector")
-    node.name = "Vector.008"
-    node.label = "Place World Scale"
-    node.vector = (1, 1, 1)
-    node.location = (-745, -1165)
-    # add drivers to get Place scale from MegaMini rig, in Transform space coordinates
-    # Place scale X
-    drv_place_world_scale_x = node.driver_add('vector', 0).driver
-    v_place_world_scale_x = drv_place_world_scale_x.variables.new()
-    v_place_world_scale_x.type = 'TRANSFORMS'
-    v_place_world_scale_x.name = "var"
-    v_place_world_scale_x.targets[0].id = mega_mini_rig
-    v_place_world_scale_x.targets[0].bone_target = mega_mini_rig_bone
-    v_place_world_scale_x.targets[0].transform_type = 'SCALE_X'
-    v_place_world_scale_x.targets[0].transform_space = 'WORLD_SPACE'
-    v_place_world_scale_x.targets[0].data_path = "scale.x"
-    drv_place_world_scale_x.expression = v_place_world_scale_x.name
-    # Place scale Y
-    drv_place_world_scale_y = node.driver_add('vector', 1).driver
-    v_place_world_scale_y = drv_place_world_scale_y.variables.new()
-    v_place_world_scale_y.type = 'TRANSFORMS'
-    v_place_world_scale_y.name = "var"
-    v_place_world_scale_y.targets[0].id = mega_mini_rig
-    v_place_world_scale_y.targets[0].bone_target = mega_mini_rig_bone
-    v_place_world_scale_y.targets[0].transform_type = 'SCALE_Y'
-    v_place_world_scale_y.targets[0].transform_space = 'WORLD_SPACE'
-    v_place_world_scale_y.targets[0].data_path = "scale.y"
-    drv_place_world_scale_y.expression = v_place_world_scale_y.name
-    # Place scale Z
-    drv_place_world_scale_z = node.driver_add('vector', 2).driver
-    v_place_world_scale_z = drv_place_world_scale_z.variables.new()
-    v_place_world_scale_z.type = 'TRANSFORMS'
-    v_place_world_scale_z.name = "var"
-    v_place_world_scale_z.targets[0].id = mega_mini_rig
-    v_place_world_scale_z.targets[0].bone_target = mega_mini_rig_bone
-    v_place_world_scale_z.targets[0].transform_type = 'SCALE_Z'
-    v_place_world_scale_z.targets[0].transform_space = 'WORLD_SPACE'
-    v_place_world_scale_z.targets[0].data_path = "scale.z"
-    drv_place_world_scale_z.expression = v_place_world_scale_z.name
-    # finished adding drivers for Place scale, in World space coordinates
-    new_nodes["Vector.008"] = node
+    # Place parameters are shared by all objects attached to the Place, by way of a shared node group
+    node = tree_nodes.new(type="GeometryNodeGroup")
+    node.name = "MegaMiniPlaceParams"
+    node.label = "MegaMini Place Params"
+    node.node_tree = get_mega_mini_place_params_node_group(mega_mini_rig, mega_mini_rig_bone)
+    node.location = (-745, -200)
+    new_nodes["MegaMiniPlaceParams"] = node
+
+    if use_object_info:
+        # read Object transforms natively, with Self Object and Object Info nodes, instead of with drivers
+        node = tree_nodes.new(type="GeometryNodeSelfObject")
+        node.name = "Self Object"
+        node.location = (-915, -600)
+        new_nodes["Self Object"] = node
+
+        node = tree_nodes.new(type="GeometryNodeObjectInfo")
+        node.name = "Object Info"
+        node.label = "Object World Transform"
+        node.location = (-745, -600)
+        # 'ORIGINAL' transform space gives Object transform in World coordinates
+        node.transform_space = 'ORIGINAL'
+        new_nodes["Object Info"] = node
+
+        obj_world_loc_output = new_nodes["Object Info"].outputs["Location"]
+        obj_world_rot_output = new_nodes["Object Info"].outputs["Rotation"]
+        obj_world_scl_output = new_nodes["Object Info"].outputs["Scale"]
+    else:
+        node = tree_nodes.new(type="FunctionNodeInputVector")
+        node.name = "Vector.003"
+        node.label = "Object World Loc"
+        node.location = (-745, -535)
+        # add drivers to get Object location, in World coordinates
+        add_vector_node_transform_drivers(node, attached_obj, None, ('LOC_X', 'LOC_Y', 'LOC_Z'), 'WORLD_SPACE')
+        new_nodes["Vector.003"] = node
+
+        node = tree_nodes.new(type="FunctionNodeInputVector")
+        node.name = "Vector.004"
+        node.label = "Object World Rot"
+        node.location = (-745, -665)
+        # add drivers to get Object rotation, in World coordinates
+        add_vector_node_transform_drivers(node, attached_obj, None, ('ROT_X', 'ROT_Y', 'ROT_Z'), 'WORLD_SPACE')
+        new_nodes["Vector.004"] = node
+
+        node = tree_nodes.new(type="FunctionNodeInputVector")
+        node.name = "Vector.005"
+        node.label = "Object World Scale"
+        node.vector = (1, 1, 1)
+        node.location = (-745, -790)
+        # add drivers to get Object scale, in World coordinates
+        add_vector_node_transform_drivers(node, attached_obj, None, ('SCALE_X', 'SCALE_Y', 'SCALE_Z'), 'WORLD_SPACE')
+        new_nodes["Vector.005"] = node
+
+        obj_world_loc_output = new_nodes["Vector.003"].outputs[0]
+        obj_world_rot_output = new_nodes["Vector.004"].outputs[0]
+        obj_world_scl_output = new_nodes["Vector.005"].outputs[0]
 
     node = tree_nodes.new(type="ShaderNodeVectorMath")
     node.name = "Vector Math.002"
@@ -755,7 +754,7 @@ def add_mega_mini_to_geo_node_group(existing_group_name, clear_node_tree, mega_m
     node = tree_nodes.new(type="GeometryNodeGroup")
     node.name = "MegaMiniGeoNodeGroup"
     node.label = "MegaMini Geo"
-    node.node_tree = bpy.data.node_groups.get(MEGA_MINI_CUSTOM_NODE_GROUP_NAME)
+    node.node_tree = bpy.data.node_groups.get(mega_mini_group_name)
     node.location = (0, 0)
     new_nodes["MegaMiniGeoNodeGroup"] = node
 
@@ -767,55 +766,77 @@ def add_mega_mini_to_geo_node_group(existing_group_name, clear_node_tree, mega_m
     # links between nodes
     tree_links = existing_node_group.links
     tree_links.new(new_nodes["Group Input"].outputs[0], new_nodes["MegaMiniGeoNodeGroup"].inputs[0])
-    tree_links.new(new_nodes["Value"].outputs[0], new_nodes["MegaMiniGeoNodeGroup"].inputs[1])
-    tree_links.new(new_nodes["Value.001"].outputs[0], new_nodes["MegaMiniGeoNodeGroup"].inputs[2])
-    tree_links.new(new_nodes["Value.002"].outputs[0], new_nodes["MegaMiniGeoNodeGroup"].inputs[3])
-    tree_links.new(new_nodes["Value.003"].outputs[0], new_nodes["MegaMiniGeoNodeGroup"].inputs[4])
-    tree_links.new(new_nodes["Vector"].outputs[0], new_nodes["MegaMiniGeoNodeGroup"].inputs[5])
-    tree_links.new(new_nodes["Vector.001"].outputs[0], new_nodes["MegaMiniGeoNodeGroup"].inputs[6])
-    tree_links.new(new_nodes["Vector.002"].outputs[0], new_nodes["MegaMiniGeoNodeGroup"].inputs[7])
+    tree_links.new(new_nodes["MegaMiniRigParams"].outputs[0], new_nodes["MegaMiniGeoNodeGroup"].inputs[1])
+    tree_links.new(new_nodes["MegaMiniRigParams"].outputs[1], new_nodes["MegaMiniGeoNodeGroup"].inputs[2])
+    tree_links.new(new_nodes["MegaMiniRigParams"].outputs[2], new_nodes["MegaMiniGeoNodeGroup"].inputs[3])
+    tree_links.new(new_nodes["MegaMiniPlaceParams"].outputs[0], new_nodes["MegaMiniGeoNodeGroup"].inputs[4])
+    tree_links.new(new_nodes["MegaMiniPlaceParams"].outputs[1], new_nodes["MegaMiniGeoNodeGroup"].inputs[5])
+    tree_links.new(new_nodes["MegaMiniPlaceParams"].outputs[2], new_nodes["MegaMiniGeoNodeGroup"].inputs[6])
+    tree_links.new(new_nodes["MegaMiniPlaceParams"].outputs[3], new_nodes["MegaMiniGeoNodeGroup"].inputs[7])
     tree_links.new(new_nodes["Vector Math.001"].outputs[0], new_nodes["MegaMiniGeoNodeGroup"].inputs[8])
     tree_links.new(new_nodes["Vector Math.002"].outputs[0], new_nodes["MegaMiniGeoNodeGroup"].inputs[9])
     tree_links.new(new_nodes["Vector Math.003"].outputs[0], new_nodes["MegaMiniGeoNodeGroup"].inputs[10])
     tree_links.new(new_nodes["MegaMiniGeoNodeGroup"].outputs[0], new_nodes["Group Output"].inputs[0])
-    tree_links.new(new_nodes["Vector.003"].outputs[0], new_nodes["Vector Math"].inputs[0])
-    tree_links.new(new_nodes["Vector.006"].outputs[0], new_nodes["Vector Math"].inputs[1])
+    if use_object_info:
+        tree_links.new(new_nodes["Self Object"].outputs[0], new_nodes["Object Info"].inputs[0])
+    tree_links.new(obj_world_loc_output, new_nodes["Vector Math"].inputs[0])
+    tree_links.new(new_nodes["MegaMiniPlaceParams"].outputs[4], new_nodes["Vector Math"].inputs[1])
     tree_links.new(new_nodes["Vector Math"].outputs[0], new_nodes["Vector Rotate"].inputs[0])
-    tree_links.new(new_nodes["Vector.007"].outputs[0], new_nodes["Vector Rotate"].inputs[4])
+    tree_links.new(new_nodes["MegaMiniPlaceParams"].outputs[5], new_nodes["Vector Rotate"].inputs[4])
     tree_links.new(new_nodes["Vector Rotate"].outputs[0], new_nodes["Vector Math.001"].inputs[0])
-    tree_links.new(new_nodes["Vector.008"].outputs[0], new_nodes["Vector Math.001"].inputs[1])
-    tree_links.new(new_nodes["Vector.004"].outputs[0], new_nodes["Vector Math.002"].inputs[0])
-    tree_links.new(new_nodes["Vector.007"].outputs[0], new_nodes["Vector Math.002"].inputs[1])
-    tree_links.new(new_nodes["Vector.005"].outputs[0], new_nodes["Vector Math.003"].inputs[0])
-    tree_links.new(new_nodes["Vector.008"].outputs[0], new_nodes["Vector Math.003"].inputs[1])
+    tree_links.new(new_nodes["MegaMiniPlaceParams"].outputs[6], new_nodes["Vector Math.001"].inputs[1])
+    tree_links.new(obj_world_rot_output, new_nodes["Vector Math.002"].inputs[0])
+    tree_links.new(new_nodes["MegaMiniPlaceParams"].outputs[5], new_nodes["Vector Math.002"].inputs[1])
+    tree_links.new(obj_world_scl_output, new_nodes["Vector Math.003"].inputs[0])
+    tree_links.new(new_nodes["MegaMiniPlaceParams"].outputs[6], new_nodes["Vector Math.003"].inputs[1])
+
+# MegaMini custom node group variants, { variant: (node group name, create function) }
+GEO_NODES_VARIANT_GROUPS = {
+    'STANDARD': (MEGA_MINI_CUSTOM_NODE_GROUP_NAME, create_mega_mini_custom_geo_node_group),
+    'FUSED': (MEGA_MINI_FUSED_NODE_GROUP_NAME, create_mega_mini_fused_geo_node_group),
+    'PER_POINT': (MEGA_MINI_PER_POINT_NODE_GROUP_NAME, create_mega_mini_per_point_geo_node_group),
+}
+
+# object types that MegaMini geometry nodes can be added to, per variant - Per Point variant is for point clouds
+# (e.g. asteroid belt, starfield), hair curves, and meshes with instances from earlier geometry nodes modifiers, because
+# its Set Point Radius / Scale Instances nodes do nothing to plain mesh faces
+GEO_NODES_VARIANT_OB_TYPES = {
+    'STANDARD': ('MESH',),
+    'FUSED': ('MESH',),
+    'PER_POINT': ('MESH', 'POINTCLOUD', 'CURVES'),
+}
 
 def add_mega_mini_nodes_to_node_group(existing_group_name, override_create, clear_node_tree, mega_mini_rig,
-                                      mega_mini_rig_bone, attached_obj):
+                                      mega_mini_rig_bone, attached_obj, use_object_info=False, variant='STANDARD'):
+    mega_mini_group_name, create_func = GEO_NODES_VARIANT_GROUPS[variant]
     # check if custom node group already exists, and create/override if necessary
-    node_group = bpy.data.node_groups.get(MEGA_MINI_CUSTOM_NODE_GROUP_NAME)
+    node_group = bpy.data.node_groups.get(mega_mini_group_name)
     if node_group is None or override_create:
         # create the custom node group
-        new_node_group = create_mega_mini_custom_geo_node_group(MEGA_MINI_CUSTOM_NODE_GROUP_NAME)
+        new_node_group = create_func(mega_mini_group_name)
         # if override create is enabled, then ensure new group name will be "first", meaning:
         #     group name does not have suffix like '.001', '.002', etc.
         if override_create:
-            new_node_group.name = MEGA_MINI_CUSTOM_NODE_GROUP_NAME
+            new_node_group.name = mega_mini_group_name
 
-    add_mega_mini_to_geo_node_group(existing_group_name, clear_node_tree, mega_mini_rig, mega_mini_rig_bone, attached_obj)
+    add_mega_mini_to_geo_node_group(existing_group_name, clear_node_tree, mega_mini_rig, mega_mini_rig_bone, attached_obj,
+                                    use_object_info, mega_mini_group_name)
 
-def add_mega_mini_geo_nodes_to_object(ob, override_create, alt_group_name, mega_mini_rig, mega_mini_rig_bone):
+def add_mega_mini_geo_nodes_to_object(ob, override_create, alt_group_name, mega_mini_rig, mega_mini_rig_bone,
+                                      use_object_info=False, variant='STANDARD'):
     geo_nodes_mod = ob.modifiers.new(name="MegaMini.GeometryNodes", type='NODES')
     # use alternate group, if needed and if available
     if alt_group_name != None:
         if bpy.data.node_groups.get(alt_group_name) is None:
             return  # TODO return error / throw exception
         # create nodes, but don't clear node tree before creating new nodes
-        add_mega_mini_nodes_to_node_group(alt_group_name, override_create, False, mega_mini_rig, mega_mini_rig_bone, ob)
+        add_mega_mini_nodes_to_node_group(alt_group_name, override_create, False, mega_mini_rig, mega_mini_rig_bone, ob,
+                                          use_object_info, variant)
         geo_nodes_mod.node_group = bpy.data.node_groups.get(alt_group_name)
         return  # success, return
     # create nodes, and clear node tree before creating new nodes
     add_mega_mini_nodes_to_node_group(geo_nodes_mod.node_group.name, override_create, True, mega_mini_rig,
-                                      mega_mini_rig_bone, ob)
+                                      mega_mini_rig_bone, ob, use_object_info, variant)
 
 class MEGAMINI_AddGeoNodes(bpy.types.Operator):
     bl_description = "Add Geometry Nodes to selected object(s). Object(s) must already be attached to MegaMini Rig "+\
@@ -826,9 +847,14 @@ class MEGAMINI_AddGeoNodes(bpy.types.Operator):
 
     def execute(self, context):
         scn = context.scene
+        # Self Object node is available in Blender 3.4 and later
+        use_object_info = scn.MegaMini_GeoNodesUseObjectInfo and bpy.app.version >= (3,4,0)
+        if scn.MegaMini_GeoNodesUseObjectInfo and not use_object_info:
+            self.report({'WARNING'}, "Object Info mode requires Blender 3.4 or later, drivers used instead.")
+        ob_types = GEO_NODES_VARIANT_OB_TYPES[scn.MegaMini_GeoNodesGroupVariant]
         for ob in context.selected_objects:
-            # skip non-mesh objects
-            if ob.type != 'MESH':
+            # skip objects of types not supported by variant
+            if ob.type not in ob_types:
                 continue
             # skip objects that are not parented to a MegaMini Rig
             mm_rig, mm_rig_bone = get_parent_mega_mini_rig(ob)
@@ -841,5 +867,5 @@ class MEGAMINI_AddGeoNodes(bpy.types.Operator):
                     return {'CANCELLED'}
                 alt_group_name = scn.MegaMini_GeoNodesCreateAltGroup.name
             add_mega_mini_geo_nodes_to_object(ob, scn.MegaMini_GeoNodesOverrideCreate, alt_group_name, mm_rig,
-                                              mm_rig_bone)
+                                              mm_rig_bone, use_object_info, scn.MegaMini_GeoNodesGroupVariant)
         return {'FINISHED'}
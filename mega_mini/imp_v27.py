@@ -28,6 +28,23 @@ def get_cursor_location(context):
 def select_object(ob, s):
     ob.select = s == True
 
+def link_object_to_scene(context, ob):
+    context.scene.objects.link(ob)
+
+def set_active_object(context, ob):
+    context.scene.objects.active = ob
+
+# evaluate changed objects (e.g. matrix_world of a new object)
+def update_view_layer(context):
+    context.scene.update()
+
+# switch object mode of 'ob' with a context override, so this works without a 3D View (e.g. 'blender -b' scripts),
+# and without 'ob' needing to be the active object
+def set_object_mode(context, ob, mode):
+    if ob.mode == mode:
+        return
+    bpy.ops.object.mode_set({'active_object': ob, 'object': ob}, mode=mode)
+
 def create_mesh_obj_from_pydata(verts=[], faces=[], edges=[], obj_name=None, mesh_name=None):
     if obj_name is None:
         obj_name = "Object"
@@ -28,6 +28,28 @@ def get_cursor_location(context):
 def select_object(ob, s):
     ob.select_set(s == True)
 
+def link_object_to_scene(context, ob):
+    context.view_layer.active_layer_collection.collection.objects.link(ob)
+
+def set_active_object(context, ob):
+    context.view_layer.objects.active = ob
+
+# evaluate changed objects (e.g. matrix_world of a new object)
+def update_view_layer(context):
+    context.view_layer.update()
+
+# switch object mode of 'ob' with a context override, so this works without a 3D View (e.g. 'blender -b' scripts),
+# and without 'ob' needing to be the active object
+def set_object_mode(context, ob, mode):
+    if ob.mode == mode:
+        return
+    # Blender v3.2+
+    if hasattr(context, "temp_override"):
+        with context.temp_override(active_object=ob, object=ob):
+            bpy.ops.object.mode_set(mode=mode)
+    else:
+        bpy.ops.object.mode_set({'active_object': ob, 'object': ob}, mode=mode)
+
 def create_mesh_obj_from_pydata(verts=[], faces=[], edges=[], obj_name=None, mesh_name=None,
                                 collection_name="Collection"):
     if obj_name is None:
@@ -39,6 +61,5 @@ def create_mesh_obj_from_pydata(verts=[], faces=[], edges=[], obj_name=None, mes
     obj = bpy.data.objects.new(obj_name, mesh)
     col = bpy.data.collections.get(collection_name)
     col.objects.link(obj)
-    bpy.context.view_layer.objects.active = obj
     mesh.from_pydata(verts, edges, faces)
     return obj
@@ -0,0 +1,322 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# Instance attach mode: instead of creating a Place-ProxyPlace-ProxyPlaceFocus bone set (with 13 drivers) for each
+# attached object, the ProxyPlace locations of many objects are stored as vertices of one 'point' mesh object, and
+# a geometry nodes modifier applies the forced perspective formulas (see fp_math.py) to all points at once,
+# with the attached objects shown by Instance on Points. Each point has attributes for its Place bone scale multiplier
+# ('mega_mini_bone_scl_mult'), instance index, and instance rotation and scale.
+
+import bpy
+import numpy as np
+
+from .rig import (OBSERVER_BNAME, OBSERVER_BONETAIL, PROXY_FIELD_BNAME, PROXY_OBSERVER_BNAME, OBJ_PROP_SCALE,
+    OBJ_PROP_BONE_SCL_MULT,
+    create_mega_mini_armature, is_mega_mini_rig, clear_rig_index)
+from .geo_nodes import (add_geo_node, add_node_output_prop_driver, add_vector_node_transform_drivers,
+    get_mega_mini_rig_params_node_group)
+
+if bpy.app.version < (2,80,0):
+    from .imp_v27 import (get_cursor_location, link_object_to_scene)
+else:
+    from .imp_v28 import (get_cursor_location, link_object_to_scene)
+
+INSTANCES_OBJ_BASENAME = "MegaMiniInstances"
+INSTANCES_NODE_GROUP_PREFIX = "MegaMiniInstances:"
+INSTANCES_SOURCE_COLLECTION_PREFIX = "MegaMiniInstanceSources:"
+ATTR_INSTANCE_INDEX = "mega_mini_instance_index"
+ATTR_INSTANCE_ROT = "mega_mini_instance_rot"
+ATTR_INSTANCE_SCALE = "mega_mini_instance_scale"
+
+# output socket of a Named Attribute node, for the node's data type - Blender before v4.0 has one output socket per
+# data type, with only one socket enabled
+def get_named_attribute_output(node):
+    for output in node.outputs:
+        if output.enabled:
+            return output
+    return node.outputs[0]
+
+def add_named_attribute_node(tree_nodes, new_nodes, name, location, attr_name, data_type):
+    node = add_geo_node(tree_nodes, new_nodes, "GeometryNodeInputNamedAttribute", name, location)
+    node.data_type = data_type
+    node.inputs[0].default_value = attr_name
+    return node
+
+# create instances node group, which does forced perspective transform of points (ProxyPlace locations, in
+# ProxyField space), and instances objects from 'source_obs' on the points - instance index of a point is index of
+# object in 'source_obs'
+def create_instances_node_group(mega_mini_rig, source_obs, node_group_name):
+    new_nodes = {}
+    new_node_group = bpy.data.node_groups.new(name=node_group_name, type='GeometryNodeTree')
+    new_node_group.inputs.new(type='NodeSocketGeometry', name="Geometry")
+    new_node_group.outputs.new(type='NodeSocketGeometry', name="Geometry")
+    tree_nodes = new_node_group.nodes
+    tree_nodes.clear()
+    tree_links = new_node_group.links
+
+    group_input = add_geo_node(tree_nodes, new_nodes, "NodeGroupInput", "Group Input", (-1600, 300))
+
+    # rig parameters, shared with geometry nodes of objects attached to the rig
+    node = add_geo_node(tree_nodes, new_nodes, "GeometryNodeGroup", "MegaMiniRigParams", (-1600, -300),
+                        label="MegaMini Rig Params")
+    node.node_tree = get_mega_mini_rig_params_node_group(mega_mini_rig)
+    in_fp_power = node.outputs[0]
+    in_fp_min_dist = node.outputs[1]
+    in_fp_min_scale = node.outputs[2]
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeValue", "MegaMini Scale", (-1600, -100))
+    node.outputs[0].default_value = mega_mini_rig[OBJ_PROP_SCALE]
+    add_node_output_prop_driver(node, mega_mini_rig, "[\""+OBJ_PROP_SCALE+"\"]")
+    in_mega_mini_scale = node.outputs[0]
+    node = add_geo_node(tree_nodes, new_nodes, "FunctionNodeInputVector", "ProxyObserver Loc", (-1600, 100))
+    add_vector_node_transform_drivers(node, mega_mini_rig, PROXY_OBSERVER_BNAME, ('LOC_X', 'LOC_Y', 'LOC_Z'),
+                                      'LOCAL_SPACE')
+    # Place bone scale driver uses World space distance, so Proxy offset is scaled by ProxyField World scale (rotation
+    # does not change distance)
+    node = add_geo_node(tree_nodes, new_nodes, "FunctionNodeInputVector", "ProxyField World Scale", (-1600, -500))
+    node.vector = (1, 1, 1)
+    add_vector_node_transform_drivers(node, mega_mini_rig, PROXY_FIELD_BNAME, ('SCALE_X', 'SCALE_Y', 'SCALE_Z'),
+                                      'WORLD_SPACE')
+
+    # per point forced perspective scale (same as Place bone scale driver):
+    #     max(FP Min Scale, bone_scl_mult / ( (1 + max(0, mega_mini_scale * proxy_dist - FP Min Dist)) ** FP Power ))
+    node = add_geo_node(tree_nodes, new_nodes, "GeometryNodeInputPosition", "Position", (-1600, 0))
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeVectorMath", "Proxy Offset", (-1400, 0),
+                        operation="SUBTRACT")
+    tree_links.new(new_nodes["Position"].outputs[0], node.inputs[0])
+    tree_links.new(new_nodes["ProxyObserver Loc"].outputs[0], node.inputs[1])
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeVectorMath", "World Proxy Offset", (-1400, -200),
+                        operation="MULTIPLY")
+    tree_links.new(new_nodes["Proxy Offset"].outputs[0], node.inputs[0])
+    tree_links.new(new_nodes["ProxyField World Scale"].outputs[0], node.inputs[1])
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeVectorMath", "Proxy Dist", (-1200, -100),
+                        operation="LENGTH")
+    tree_links.new(new_nodes["World Proxy Offset"].outputs[0], node.inputs[0])
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeMath", "Scaled Dist", (-1000, -100), operation="MULTIPLY")
+    tree_links.new(new_nodes["Proxy Dist"].outputs[1], node.inputs[0])
+    tree_links.new(in_mega_mini_scale, node.inputs[1])
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeMath", "Apply Min Dist", (-800, -100), operation="SUBTRACT")
+    tree_links.new(new_nodes["Scaled Dist"].outputs[0], node.inputs[0])
+    tree_links.new(in_fp_min_dist, node.inputs[1])
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeMath", "Min Dist Max", (-600, -100), operation="MAXIMUM")
+    node.inputs[1].default_value = 0.0
+    tree_links.new(new_nodes["Apply Min Dist"].outputs[0], node.inputs[0])
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeMath", "Add One", (-400, -100), operation="ADD")
+    node.inputs[1].default_value = 1.0
+    tree_links.new(new_nodes["Min Dist Max"].outputs[0], node.inputs[0])
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeMath", "FP Power", (-200, -100), operation="POWER")
+    tree_links.new(new_nodes["Add One"].outputs[0], node.inputs[0])
+    tree_links.new(in_fp_power, node.inputs[1])
+    node = add_named_attribute_node(tree_nodes, new_nodes, "Bone Scale Mult", (-200, -300), OBJ_PROP_BONE_SCL_MULT,
+                                    'FLOAT')
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeMath", "Apply Bone Scale Mult", (0, -100),
+                        operation="DIVIDE")
+    tree_links.new(get_named_attribute_output(new_nodes["Bone Scale Mult"]), node.inputs[0])
+    tree_links.new(new_nodes["FP Power"].outputs[0], node.inputs[1])
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeMath", "Apply Min Scale", (200, -100), operation="MAXIMUM")
+    tree_links.new(new_nodes["Apply Bone Scale Mult"].outputs[0], node.inputs[0])
+    tree_links.new(in_fp_min_scale, node.inputs[1])
+
+    # instance objects on points, with instance scale multiplied by forced perspective scale - fields are evaluated
+    # with original (proxy) point positions, because Instance on Points is before Set Position
+    node = add_named_attribute_node(tree_nodes, new_nodes, "Instance Index", (200, 200), ATTR_INSTANCE_INDEX, 'INT')
+    node = add_named_attribute_node(tree_nodes, new_nodes, "Instance Rot", (200, 100), ATTR_INSTANCE_ROT,
+                                    'FLOAT_VECTOR')
+    node = add_named_attribute_node(tree_nodes, new_nodes, "Instance Scale", (200, -300), ATTR_INSTANCE_SCALE,
+                                    'FLOAT_VECTOR')
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeVectorMath", "Apply FP Instance Scale", (400, -200),
+                        operation="SCALE")
+    tree_links.new(get_named_attribute_output(new_nodes["Instance Scale"]), node.inputs[0])
+    tree_links.new(new_nodes["Apply Min Scale"].outputs[0], node.inputs[3])
+    # one Instance on Points per source object, selecting points with instance index of the object, so instance
+    # indexes do not depend on order of collection children or of multi-input links
+    node = add_geo_node(tree_nodes, new_nodes, "GeometryNodeJoinGeometry", "Join Instances", (1000, 300))
+    for index, source_ob in enumerate(source_obs):
+        y = 500 + 250 * index
+        node = add_geo_node(tree_nodes, new_nodes, "GeometryNodeObjectInfo", "Object Info." + str(index), (400, y))
+        # 'ORIGINAL' transform space does not apply source object's transform, i.e. instance is at origin
+        node.transform_space = 'ORIGINAL'
+        node.inputs[0].default_value = source_ob
+        node.inputs["As Instance"].default_value = True
+        node = add_geo_node(tree_nodes, new_nodes, "FunctionNodeCompare", "Select Index." + str(index),
+                            (600, y - 150), operation='EQUAL')
+        node.data_type = 'INT'
+        tree_links.new(get_named_attribute_output(new_nodes["Instance Index"]), node.inputs[2])
+        node.inputs[3].default_value = index
+        node = add_geo_node(tree_nodes, new_nodes, "GeometryNodeInstanceOnPoints", "Instance on Points." + str(index),
+                            (800, y))
+        tree_links.new(group_input.outputs[0], node.inputs[0])
+        tree_links.new(new_nodes["Select Index." + str(index)].outputs[0], node.inputs[1])
+        tree_links.new(new_nodes["Object Info." + str(index)].outputs["Geometry"], node.inputs[2])
+        tree_links.new(get_named_attribute_output(new_nodes["Instance Rot"]), node.inputs[5])
+        tree_links.new(new_nodes["Apply FP Instance Scale"].outputs[0], node.inputs[6])
+        tree_links.new(node.outputs[0], new_nodes["Join Instances"].inputs[0])
+
+    # forced perspective location (same as Place bone location driver):
+    #     (proxy_place_loc - proxy_observer_loc) * mega_mini_scale * scale
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeMath", "Location Scale", (400, 0), operation="MULTIPLY")
+    tree_links.new(new_nodes["Apply Min Scale"].outputs[0], node.inputs[0])
+    tree_links.new(in_mega_mini_scale, node.inputs[1])
+    node = add_geo_node(tree_nodes, new_nodes, "ShaderNodeVectorMath", "Forced Perspective Location", (600, 0),
+                        operation="SCALE")
+    tree_links.new(new_nodes["Proxy Offset"].outputs[0], node.inputs[0])
+    tree_links.new(new_nodes["Location Scale"].outputs[0], node.inputs[3])
+    node = add_geo_node(tree_nodes, new_nodes, "GeometryNodeSetPosition", "Set Position", (1200, 300))
+    tree_links.new(new_nodes["Join Instances"].outputs[0], node.inputs[0])
+    tree_links.new(new_nodes["Forced Perspective Location"].outputs[0], node.inputs[2])
+    node = add_geo_node(tree_nodes, new_nodes, "NodeGroupOutput", "Group Output", (1400, 300))
+    tree_links.new(new_nodes["Set Position"].outputs[0], node.inputs[0])
+
+    return new_node_group
+
+# set point mesh vertices and attributes, from arrays
+#     proxy_locs: shape (N, 3), ProxyPlace locations
+#     instance_indexes: shape (N,), index of instanced object in list of source objects
+#     instance_rots: shape (N, 3), instance Euler rotations
+#     instance_scales: shape (N, 3), instance scales
+#     bone_scl_mults: shape (N,), Place scale multipliers
+def set_instances_mesh_points(mesh, proxy_locs, instance_indexes, instance_rots, instance_scales, bone_scl_mults):
+    point_count = len(proxy_locs)
+    mesh.vertices.add(point_count)
+    mesh.vertices.foreach_set("co", np.asarray(proxy_locs, dtype=np.float32).reshape(-1))
+    for attr_name, attr_type, attr_value_name, values in [
+            (OBJ_PROP_BONE_SCL_MULT, 'FLOAT', "value", np.asarray(bone_scl_mults, dtype=np.float32)),
+            (ATTR_INSTANCE_INDEX, 'INT', "value", np.asarray(instance_indexes, dtype=np.int32)),
+            (ATTR_INSTANCE_ROT, 'FLOAT_VECTOR', "vector", np.asarray(instance_rots, dtype=np.float32).reshape(-1)),
+            (ATTR_INSTANCE_SCALE, 'FLOAT_VECTOR', "vector",
+             np.asarray(instance_scales, dtype=np.float32).reshape(-1))]:
+        attr = mesh.attributes.get(attr_name)
+        if attr is None:
+            attr = mesh.attributes.new(name=attr_name, type=attr_type, domain='POINT')
+        attr.data.foreach_set(attr_value_name, values)
+    mesh.update()
+
+# create point mesh object parented to MegaMini rig's Observer bone (same parent as Place bones), with points and
+# attributes from arrays (see set_instances_mesh_points)
+def create_instances_object(context, mega_mini_rig, proxy_locs, instance_indexes, instance_rots, instance_scales,
+                            bone_scl_mults):
+    mesh = bpy.data.meshes.new(INSTANCES_OBJ_BASENAME)
+    set_instances_mesh_points(mesh, proxy_locs, instance_indexes, instance_rots, instance_scales, bone_scl_mults)
+    instances_ob = bpy.data.objects.new(INSTANCES_OBJ_BASENAME, mesh)
+    link_object_to_scene(context, instances_ob)
+    # parent to Observer bone, with offset to undo translation due to bone length
+    instances_ob.parent = mega_mini_rig
+    instances_ob.parent_type = 'BONE'
+    instances_ob.parent_bone = OBSERVER_BNAME
+    instances_ob.matrix_parent_inverse.identity()
+    instances_ob.matrix_parent_inverse[1][3] = -OBSERVER_BONETAIL[1]
+    return instances_ob
+
+# instances objects of MegaMini rig, found by instances node group of geometry nodes modifier
+def get_rig_instances_obs(mega_mini_rig):
+    instances_obs = []
+    for ob in mega_mini_rig.children:
+        if ob.type != 'MESH':
+            continue
+        for mod in ob.modifiers:
+            if mod.type == 'NODES' and mod.node_group != None and \
+                    mod.node_group.name.startswith(INSTANCES_NODE_GROUP_PREFIX):
+                instances_obs.append(ob)
+                break
+    return instances_obs
+
+def add_instances_modifier(instances_ob, node_group):
+    geo_nodes_mod = instances_ob.modifiers.new(name="MegaMini.Instances", type='NODES')
+    geo_nodes_mod.node_group = node_group
+    return geo_nodes_mod
+
+# create instances object with one point per object in 'attach_obs', and move 'attach_obs' to a new (hidden)
+# instance source collection
+def create_mega_mini_instances(context, mega_mini_rig, attach_obs):
+    mega_mini_scale = mega_mini_rig[OBJ_PROP_SCALE]
+    cursor_loc = get_cursor_location(context)
+    # instance index is index of object in 'attach_obs', see create_instances_node_group
+    proxy_locs = []
+    instance_indexes = []
+    instance_rots = []
+    instance_scales = []
+    for index, ob in enumerate(attach_obs):
+        loc, rot, scale = ob.matrix_world.decompose()
+        proxy_locs.append((loc - cursor_loc) / mega_mini_scale)
+        instance_indexes.append(index)
+        instance_rots.append(rot.to_euler('XYZ'))
+        instance_scales.append(scale)
+
+    instances_ob = create_instances_object(context, mega_mini_rig, proxy_locs, instance_indexes, instance_rots,
+                                           instance_scales, np.ones(len(attach_obs)))
+
+    # move attached objects to source collection, hidden because objects are shown by instances
+    source_collection = bpy.data.collections.new(INSTANCES_SOURCE_COLLECTION_PREFIX + instances_ob.name)
+    source_collection.hide_render = True
+    source_collection.hide_viewport = True
+    context.scene.collection.children.link(source_collection)
+    for ob in attach_obs:
+        for coll in list(ob.users_collection):
+            coll.objects.unlink(ob)
+        source_collection.objects.link(ob)
+
+    add_instances_modifier(instances_ob, create_instances_node_group(mega_mini_rig, attach_obs,
+                                                                     INSTANCES_NODE_GROUP_PREFIX + instances_ob.name))
+    clear_rig_index()
+    return instances_ob
+
+class MEGAMINI_AttachInstances(bpy.types.Operator):
+    bl_description = "Attach selected objects to active MegaMini Rig as instances on points of one new object, " + \
+        "instead of creating bones for each object. Select Rig last. Selected objects are moved to a hidden " + \
+        "collection, and shown as instances. Use this to attach many thousands of objects. Requires Blender 3.2+"
+    bl_idname = "mega_mini.attach_instances"
+    bl_label = "Instances"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        if bpy.app.version < (3,2,0):
+            self.report({'ERROR'}, "Unable to attach instances because Blender 3.2 or later is required.")
+            return {'CANCELLED'}
+        active_ob = context.active_object
+        # get list of objects, a separate copy of context's list - because context's list may change
+        selected_obs = [ob for ob in context.selected_objects]
+        # error checks
+        if not is_mega_mini_rig(active_ob):
+            # create a rig if needed
+            if context.scene.MegaMini_AttachPreCreateRig:
+                mega_mini_scale = context.scene.MegaMini_NewObserverScale
+                mega_mini_fp_power = context.scene.MegaMini_NewObserverFP_Power
+                mega_mini_fp_min_dist = context.scene.MegaMini_NewObserverFP_MinDist
+                mega_mini_fp_min_scale = context.scene.MegaMini_NewObserverFP_MinScale
+                if mega_mini_scale <= 0:
+                    self.report({'ERROR'}, "Cannot PreCreate MegaMini Rig, error is Observer scale. Must be greater than zero.")
+                    return {'CANCELLED'}
+                create_mega_mini_armature(context, mega_mini_scale, mega_mini_fp_power, mega_mini_fp_min_dist,
+                                          mega_mini_fp_min_scale)
+                # new active object
+                active_ob = context.active_object
+            else:
+                self.report({'ERROR'}, "Unable to attach object(s) because Active Object is not a MegaMini Rig.")
+                return {'CANCELLED'}
+        attach_obs = []
+        for ob in selected_obs:
+            if ob == active_ob:
+                continue
+            # do not attach objects that have a parent, if 'no re-parent' option is enabled
+            if ob.parent != None and context.scene.MegaMini_AttachNoReParent:
+                continue
+            attach_obs.append(ob)
+        if len(attach_obs) < 1:
+            self.report({'ERROR'}, "Unable to attach object(s) to MegaMini Rig because no object(s) selected")
+            return {'CANCELLED'}
+        create_mega_mini_instances(context, active_ob, attach_obs)
+        return {'FINISHED'}
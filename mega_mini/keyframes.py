@@ -0,0 +1,162 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# MegaMini keyframe utilities: read, transform, and write the keyframes of many F-Curves as contiguous NumPy arrays,
+# with foreach_get/foreach_set, instead of one keyframe at a time. F-Curves are given as a list, and keyframe data of
+# all F-Curves in the list is concatenated in list order:
+#     values: array of shape (total_keyframe_count, 2), i.e. (frame, value) pairs
+#     counts: array of shape (fcurve_count,), number of keyframes of each F-Curve (zero if F-Curve is None)
+# Bone F-Curve lists are in order [bone0 index0, bone0 index1, bone0 index2, bone1 index0, ...].
+
+import bpy
+import numpy as np
+
+KEYFRAME_ATTRS = ("co", "handle_left", "handle_right")
+
+def get_pose_bone_data_path(bname, prop_path):
+    return "pose.bones[\"" + bname + "\"]" + prop_path
+
+def get_armature_action(armature, create=False):
+    if armature.animation_data is None:
+        if not create:
+            return None
+        armature.animation_data_create()
+    action = armature.animation_data.action
+    if action is None and create:
+        action = bpy.data.actions.new(name=armature.name+"Action")
+        armature.animation_data.action = action
+    return action
+
+# F-Curves of pose bone property, for each bone in 'bnames' and each index of property, missing F-Curves are None
+# unless 'create' is True, existing F-Curves are removed and re-created if 'replace' is True,
+# new F-Curves are in 'action_group', or in group named by bone if 'action_group' is None
+def get_bone_fcurves(armature, bnames, prop_path="location", array_len=3, create=False, replace=False,
+                     action_group=None):
+    action = get_armature_action(armature, create or replace)
+    if action is None:
+        return [ None ] * (len(bnames) * array_len)
+    fcurves = []
+    for bname in bnames:
+        data_path = get_pose_bone_data_path(bname, "." + prop_path)
+        for index in range(array_len):
+            fc = action.fcurves.find(data_path, index=index)
+            if fc != None and replace:
+                action.fcurves.remove(fc)
+                fc = None
+            if fc is None and (create or replace):
+                fc = action.fcurves.new(data_path, index=index,
+                                        action_group=bname if action_group is None else action_group)
+            fcurves.append(fc)
+    return fcurves
+
+def get_fcurves_keyframe_counts(fcurves):
+    return np.array([ 0 if fc is None else len(fc.keyframe_points) for fc in fcurves ], dtype=np.int64)
+
+# returns (values, counts), see top of file
+def read_fcurves_keyframes(fcurves, attr_name="co", counts=None):
+    if counts is None:
+        counts = get_fcurves_keyframe_counts(fcurves)
+    values = np.empty(int(counts.sum()) * 2, dtype=np.float32)
+    start = 0
+    for fc, count in zip(fcurves, counts.tolist()):
+        if count > 0:
+            # slice of contiguous array is contiguous, so foreach_get can write to it directly
+            fc.keyframe_points.foreach_get(attr_name, values[start:start+count*2])
+        start += count * 2
+    return values.reshape(-1, 2), counts
+
+# write values to existing keyframes, 'counts' must be same as current keyframe counts of F-Curves
+def write_fcurves_keyframes(fcurves, counts, values, attr_name="co"):
+    values = np.ascontiguousarray(values, dtype=np.float32).reshape(-1)
+    start = 0
+    for fc, count in zip(fcurves, counts.tolist()):
+        if count > 0:
+            fc.keyframe_points.foreach_set(attr_name, values[start:start+count*2])
+        start += count * 2
+
+# re-calculate handles, and sort keyframes, after keyframes are changed
+def update_fcurves(fcurves):
+    for fc in fcurves:
+        if fc != None:
+            fc.update()
+
+# transform all keyframes (and handles) of F-Curves at once:
+#     frame = frame * frame_factor + frame_offset
+#     value = value * value_factor + value_offset
+# 'value_factor' and 'value_offset' may be arrays with one value per F-Curve
+def transform_fcurves_keyframes(fcurves, value_factor=1.0, value_offset=0.0, frame_factor=1.0, frame_offset=0.0):
+    counts = get_fcurves_keyframe_counts(fcurves)
+    if counts.sum() == 0:
+        return
+    # per F-Curve factors and offsets are repeated for each keyframe of F-Curve
+    if np.ndim(value_factor) > 0:
+        value_factor = np.repeat(np.asarray(value_factor, dtype=np.float64), counts)
+    if np.ndim(value_offset) > 0:
+        value_offset = np.repeat(np.asarray(value_offset, dtype=np.float64), counts)
+    for attr_name in KEYFRAME_ATTRS:
+        values, _ = read_fcurves_keyframes(fcurves, attr_name, counts)
+        values[:, 0] = values[:, 0] * frame_factor + frame_offset
+        values[:, 1] = values[:, 1] * value_factor + value_offset
+        write_fcurves_keyframes(fcurves, counts, values, attr_name)
+    update_fcurves(fcurves)
+
+# insert keyframes in F-Curves (no None values) at 'frames' (shape (K,)), with 'values' (shape (fcurve_count, K)),
+# keyframes already at one of 'frames' get the new value, other keyframes are not changed
+def insert_fcurves_keyframes(fcurves, frames, values):
+    frames = np.asarray(frames, dtype=np.float32).reshape(-1)
+    values = np.asarray(values, dtype=np.float32).reshape(len(fcurves), len(frames))
+    new_cos = np.empty((len(frames), 2), dtype=np.float32)
+    new_cos[:, 0] = frames
+    for fc, fc_values in zip(fcurves, values):
+        new_cos[:, 1] = fc_values
+        count = len(fc.keyframe_points)
+        if count == 0:
+            fc.keyframe_points.add(len(frames))
+            fc.keyframe_points.foreach_set("co", new_cos.reshape(-1))
+            continue
+        old_cos = np.empty(count * 2, dtype=np.float32)
+        fc.keyframe_points.foreach_get("co", old_cos)
+        old_cos = old_cos.reshape(-1, 2)
+        # keyframes are sorted by frame, so existing keyframes at new frames can be found by binary search
+        indexes = np.minimum(np.searchsorted(old_cos[:, 0], frames), count - 1)
+        existing = old_cos[indexes, 0] == frames
+        existing_indexes = indexes[existing]
+        # handles of existing keyframes are moved with their keyframes, so keyframe shapes are kept
+        deltas = fc_values[existing] - old_cos[existing_indexes, 1]
+        for attr_name in ("handle_left", "handle_right"):
+            handles = np.empty(count * 2, dtype=np.float32)
+            fc.keyframe_points.foreach_get(attr_name, handles)
+            handles = handles.reshape(-1, 2)
+            handles[existing_indexes, 1] += deltas
+            fc.keyframe_points.foreach_set(attr_name, handles.reshape(-1))
+        old_cos[existing_indexes, 1] = fc_values[existing]
+        added_cos = new_cos[~existing]
+        fc.keyframe_points.add(len(added_cos))
+        fc.keyframe_points.foreach_set("co", np.concatenate((old_cos, added_cos)).reshape(-1))
+    # sort new keyframes, and calculate handles
+    update_fcurves(fcurves)
+
+# insert location keyframes of bones at 'frames' (shape (K,)), 'locs' has shape (len(bnames), K, 3), or shape
+# (len(bnames), 3) if only one frame
+def insert_bone_location_keyframes(armature, bnames, frames, locs):
+    if len(bnames) == 0:
+        return
+    frames = np.asarray(frames, dtype=np.float32).reshape(-1)
+    locs = np.asarray(locs, dtype=np.float32).reshape(len(bnames), len(frames), 3)
+    fcurves = get_bone_fcurves(armature, bnames, create=True)
+    insert_fcurves_keyframes(fcurves, frames, locs.transpose(0, 2, 1).reshape(-1, len(frames)))
@@ -0,0 +1,211 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# MegaMini Level Of Detail (LOD): objects attached to a MegaMini rig can have several LOD levels, each with a mesh,
+# and optional material and subdivision surface levels. The active LOD level is chosen by the current scale of the
+# object's Place bone, which decreases as distance from Observer increases, so far away Places can use low detail
+# meshes. LOD levels are stored in the object's 'mega_mini_lod_levels' custom property, as a group of groups:
+#     { "0": { "min_scale": float, "mesh": Mesh, "material": Material or None, "subsurf_levels": int }, ... }
+# The level with the greatest "min_scale" less than or equal to the Place scale is used, or the level with the
+# smallest "min_scale" if Place scale is less than all "min_scale" values.
+# The object's original mesh, first material slot (link and material), and Subdivision Surface levels are recorded
+# in the 'mega_mini_lod_base' custom property when the first level is added. They are the implicit base level: a
+# level without a material or subsurf levels uses the base values, and clearing levels restores the base values.
+
+import bpy
+from bpy.app.handlers import persistent
+
+from .rig import (OBJ_PROP_LOD_LEVELS, OBJ_PROP_LOD_BASE, get_parent_mega_mini_rig)
+
+# names of objects with LOD levels, so handlers do not need to search all objects every frame
+lod_ob_names = set()
+# prevent the depsgraph handler from running LOD switching again because of changes made by LOD switching
+lod_running = False
+
+def get_lod_levels(ob):
+    levels = ob.get(OBJ_PROP_LOD_LEVELS)
+    if levels is None:
+        return []
+    return sorted([ levels[key] for key in levels.keys() ], key=lambda level: level["min_scale"])
+
+# record object's current mesh, first material slot, and Subdivision Surface levels as base level
+def record_lod_base(ob):
+    base = { "mesh": ob.data, "subsurf_levels": {} }
+    if len(ob.material_slots) > 0:
+        slot = ob.material_slots[0]
+        base["material_link"] = slot.link
+        if slot.material != None:
+            base["material"] = slot.material
+    for mod in ob.modifiers:
+        if mod.type == 'SUBSURF':
+            base["subsurf_levels"][mod.name] = [ mod.levels, mod.render_levels ]
+    ob[OBJ_PROP_LOD_BASE] = base
+
+def add_lod_level(ob, mesh, min_scale, material=None, subsurf_levels=-1):
+    if ob.get(OBJ_PROP_LOD_LEVELS) is None:
+        ob[OBJ_PROP_LOD_LEVELS] = {}
+    if ob.get(OBJ_PROP_LOD_BASE) is None:
+        record_lod_base(ob)
+    levels = ob[OBJ_PROP_LOD_LEVELS]
+    level = { "min_scale": min_scale, "mesh": mesh, "subsurf_levels": subsurf_levels }
+    if material != None:
+        level["material"] = material
+    levels[str(len(levels.keys()))] = level
+    lod_ob_names.add(ob.name)
+
+def clear_lod_levels(ob):
+    if ob.get(OBJ_PROP_LOD_LEVELS) != None:
+        del ob[OBJ_PROP_LOD_LEVELS]
+    # restore base level
+    if ob.get(OBJ_PROP_LOD_BASE) != None:
+        apply_lod_level(ob, {})
+        del ob[OBJ_PROP_LOD_BASE]
+    lod_ob_names.discard(ob.name)
+
+def get_lod_level_for_scale(levels, place_scale):
+    if len(levels) == 0:
+        return None
+    # levels are sorted by min_scale
+    for level in reversed(levels):
+        if place_scale >= level["min_scale"]:
+            return level
+    return levels[0]
+
+def get_place_scale(ob):
+    mega_mini_rig, place_bname = get_parent_mega_mini_rig(ob)
+    if mega_mini_rig is None or place_bname is None:
+        return None
+    pb_place = mega_mini_rig.pose.bones.get(place_bname)
+    if pb_place is None:
+        return None
+    return pb_place.scale[0]
+
+def set_material_slot(slot, link, material):
+    # object linked material is cleared before link is changed to data, so LOD material is not kept by object
+    if link != 'OBJECT' and slot.link == 'OBJECT' and slot.material != None:
+        slot.material = None
+    if slot.link != link:
+        slot.link = link
+    if link == 'OBJECT' and slot.material != material:
+        slot.material = material
+
+def set_subsurf_levels(mod, levels, render_levels):
+    if mod.levels != levels:
+        mod.levels = levels
+    if mod.render_levels != render_levels:
+        mod.render_levels = render_levels
+
+# values not given by 'level' are restored from base level
+def apply_lod_level(ob, level):
+    base = ob.get(OBJ_PROP_LOD_BASE, {})
+    mesh = level.get("mesh")
+    if mesh is None:
+        mesh = base.get("mesh")
+    # only write changed values, to prevent unnecessary depsgraph updates
+    if mesh != None and ob.data != mesh:
+        ob.data = mesh
+    if len(ob.material_slots) > 0:
+        material = level.get("material")
+        if material != None:
+            set_material_slot(ob.material_slots[0], 'OBJECT', material)
+        elif "material_link" in base:
+            set_material_slot(ob.material_slots[0], base["material_link"], base.get("material"))
+    subsurf_levels = level.get("subsurf_levels", -1)
+    base_subsurf_levels = base.get("subsurf_levels", {})
+    for mod in ob.modifiers:
+        if mod.type != 'SUBSURF':
+            continue
+        if subsurf_levels >= 0:
+            set_subsurf_levels(mod, subsurf_levels, subsurf_levels)
+        elif mod.name in base_subsurf_levels:
+            set_subsurf_levels(mod, base_subsurf_levels[mod.name][0], base_subsurf_levels[mod.name][1])
+
+def update_object_lod(ob):
+    place_scale = get_place_scale(ob)
+    if place_scale is None:
+        return
+    level = get_lod_level_for_scale(get_lod_levels(ob), place_scale)
+    if level != None:
+        apply_lod_level(ob, level)
+
+def update_all_lods():
+    global lod_running
+    if lod_running:
+        return
+    lod_running = True
+    try:
+        for ob_name in list(lod_ob_names):
+            ob = bpy.data.objects.get(ob_name)
+            # forget about objects that were deleted, renamed, or had LOD levels cleared
+            if ob is None or ob.get(OBJ_PROP_LOD_LEVELS) is None:
+                lod_ob_names.discard(ob_name)
+                continue
+            update_object_lod(ob)
+    finally:
+        lod_running = False
+
+@persistent
+def lod_frame_change_post(scene, *args):
+    update_all_lods()
+
+@persistent
+def lod_depsgraph_update_post(scene, *args):
+    update_all_lods()
+
+@persistent
+def lod_load_post(*args):
+    lod_ob_names.clear()
+    for ob in bpy.data.objects:
+        if ob.get(OBJ_PROP_LOD_LEVELS) != None:
+            lod_ob_names.add(ob.name)
+
+class MEGAMINI_LodAddLevel(bpy.types.Operator):
+    bl_description = "Add active object's current mesh (and active material, if 'Use Material' is enabled) as a " + \
+        "LOD level, used when object's Place scale is greater than or equal to LOD Min Scale"
+    bl_idname = "mega_mini.lod_add_level"
+    bl_label = "Add LOD Level"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        scn = context.scene
+        active_ob = context.active_object
+        if active_ob is None or active_ob.type != 'MESH':
+            self.report({'ERROR'}, "Unable to add LOD level because Active Object is not a mesh object.")
+            return {'CANCELLED'}
+        mega_mini_rig, _ = get_parent_mega_mini_rig(active_ob)
+        if mega_mini_rig is None:
+            self.report({'ERROR'}, "Unable to add LOD level because Active Object is not attached to a MegaMini " +
+                        "Rig.")
+            return {'CANCELLED'}
+        material = active_ob.active_material if scn.MegaMini_LodUseMaterial else None
+        add_lod_level(active_ob, active_ob.data, scn.MegaMini_LodMinScale, material, scn.MegaMini_LodSubsurfLevels)
+        return {'FINISHED'}
+
+class MEGAMINI_LodClearLevels(bpy.types.Operator):
+    bl_description = "Remove all LOD levels from active object. Object's current mesh is not changed"
+    bl_idname = "mega_mini.lod_clear_levels"
+    bl_label = "Clear LOD Levels"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        active_ob = context.active_object
+        if active_ob is None:
+            self.report({'ERROR'}, "Unable to clear LOD levels because there is no Active Object.")
+            return {'CANCELLED'}
+        clear_lod_levels(active_ob)
+        return {'FINISHED'}
@@ -0,0 +1,108 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# MegaMini trajectory math, for many bodies at once, using NumPy arrays: positions from Keplerian orbital elements,
+# and from uniformly sampled ephemeris tables. Positions are relative to each body's center body, and are in actual
+# space (see fp_math.py).
+# This module does not import bpy (or any other MegaMini module), so it can be used outside of Blender, e.g. by
+# loading this file directly:
+#     sys.path.append("/path/to/mega_mini")
+#     import orbit_math
+
+import numpy as np
+
+# eccentric anomalies for mean anomalies 'mean_anoms' and eccentricities 'eccs' (elliptical orbits, 0 <= e < 1), by
+# solving Kepler's equation M = E - e * sin(E) with Newton's method
+def kepler_eccentric_anomalies(mean_anoms, eccs, tolerance=1e-12, max_iterations=50):
+    mean_anoms = np.mod(np.asarray(mean_anoms, dtype=np.float64), 2.0 * np.pi)
+    eccs = np.asarray(eccs, dtype=np.float64)
+    # starting value that converges for all eccentricities less than one
+    ecc_anoms = np.where(eccs < 0.8, mean_anoms, np.pi)
+    for _ in range(max_iterations):
+        delta = (ecc_anoms - eccs * np.sin(ecc_anoms) - mean_anoms) / (1.0 - eccs * np.cos(ecc_anoms))
+        ecc_anoms = ecc_anoms - delta
+        if np.all(np.abs(delta) <= tolerance):
+            break
+    return ecc_anoms
+
+# positions (shape (N, 3)) of N bodies at time 't', from Keplerian orbital elements (each an array of N values):
+#     semi_major_axes, eccentricities, inclinations, ascending_nodes (longitude of ascending node),
+#     arg_periapses (argument of periapsis), mean_anomalies (mean anomaly at epoch), epochs, periods
+# angles are in radians, and 't', epochs, and periods are in the same time units (e.g. frames)
+def kepler_positions(semi_major_axes, eccentricities, inclinations, ascending_nodes, arg_periapses, mean_anomalies,
+                     epochs, periods, t):
+    a = np.asarray(semi_major_axes, dtype=np.float64)
+    e = np.asarray(eccentricities, dtype=np.float64)
+    mean_anoms = np.asarray(mean_anomalies, dtype=np.float64) + \
+        2.0 * np.pi * (t - np.asarray(epochs, dtype=np.float64)) / np.asarray(periods, dtype=np.float64)
+    ecc_anoms = kepler_eccentric_anomalies(mean_anoms, e)
+    # position in orbital plane, periapsis on +X axis
+    x = a * (np.cos(ecc_anoms) - e)
+    y = a * np.sqrt(1.0 - e * e) * np.sin(ecc_anoms)
+    # rotate from orbital plane: Rz(ascending_node) @ Rx(inclination) @ Rz(arg_periapsis)
+    cos_node, sin_node = np.cos(ascending_nodes), np.sin(ascending_nodes)
+    cos_inc, sin_inc = np.cos(inclinations), np.sin(inclinations)
+    cos_peri, sin_peri = np.cos(arg_periapses), np.sin(arg_periapses)
+    xp = x * cos_peri - y * sin_peri
+    yp = x * sin_peri + y * cos_peri
+    positions = np.empty(a.shape + (3,))
+    positions[..., 0] = xp * cos_node - yp * cos_inc * sin_node
+    positions[..., 1] = xp * sin_node + yp * cos_inc * cos_node
+    positions[..., 2] = yp * sin_inc
+    return positions
+
+# positions (shape (N, 3)) of N bodies at time 't', from uniformly sampled ephemeris tables, packed in one array:
+#     sample_positions: shape (total_sample_count, 3), samples of all tables, in table order
+#     offsets: shape (N,), index of first sample of each table in sample_positions
+#     counts: shape (N,), number of samples in each table (at least one)
+#     start_times, time_steps: shape (N,), time of first sample, and time between samples, of each table
+# positions are linearly interpolated between samples, and clamped to first / last sample outside of table time range
+def ephemeris_positions(sample_positions, offsets, counts, start_times, time_steps, t):
+    offsets = np.asarray(offsets, dtype=np.int64)
+    counts = np.asarray(counts, dtype=np.int64)
+    sample_times = np.clip((t - np.asarray(start_times, dtype=np.float64)) / np.asarray(time_steps, dtype=np.float64),
+                           0.0, counts - 1)
+    indexes = np.minimum(np.floor(sample_times).astype(np.int64), np.maximum(counts - 2, 0))
+    fracs = (sample_times - indexes)[:, np.newaxis]
+    next_indexes = np.minimum(indexes + 1, counts - 1)
+    sample_positions = np.asarray(sample_positions, dtype=np.float64)
+    return sample_positions[offsets + indexes] * (1.0 - fracs) + sample_positions[offsets + next_indexes] * fracs
+
+# depth of each body in center body hierarchy (zero if no center body), from center indexes (shape (N,), index of
+# center body, or -1 if no center body), raises ValueError if a center body loop is found
+def center_depths(center_indexes):
+    center_indexes = np.asarray(center_indexes, dtype=np.int64)
+    depths = np.zeros(len(center_indexes), dtype=np.int64)
+    current = center_indexes.copy()
+    for _ in range(len(center_indexes)):
+        has_center = current >= 0
+        if not np.any(has_center):
+            return depths
+        depths += has_center
+        current = np.where(has_center, center_indexes[np.maximum(current, 0)], -1)
+    raise ValueError("Center body loop found")
+
+# absolute positions from positions relative to center bodies (shape (N, 3)), center indexes and depths (shape (N,))
+def resolve_center_positions(rel_positions, center_indexes, depths):
+    positions = np.array(rel_positions, dtype=np.float64)
+    center_indexes = np.asarray(center_indexes, dtype=np.int64)
+    # bodies at each depth are resolved after their center bodies (at lower depth)
+    for depth in range(1, int(depths.max()) + 1 if len(depths) > 0 else 0):
+        mask = depths == depth
+        positions[mask] += positions[center_indexes[mask]]
+    return positions
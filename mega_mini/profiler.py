@@ -0,0 +1,189 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# MegaMini rig stats and evaluation profiler, shown in Active Rig panel:
+#     - stats: Place count, driver count, attached object count, and geometry nodes modifier count of rig
+#     - scene evaluation time, measured by depsgraph / frame change pre and post handlers
+#     - geometry nodes modifier time of rig, as sum of modifier execution times of objects attached to rig
+#     - driver time of rig, measured by evaluating scene with and without the rig's drivers muted
+# Stats are updated by operator (or when profiling is enabled), not in panel draw, because finding attached objects
+# requires checking all objects.
+
+import time
+
+import bpy
+from bpy.app.handlers import persistent
+
+from .rig import (is_mega_mini_rig, get_parent_mega_mini_rig, get_mega_mini_rig_places)
+from .driver_audit import get_rig_driver_ids
+
+# smoothing factor for running average of times
+PROFILE_AVERAGE_FACTOR = 0.1
+
+# stats and times per rig, { rig_name: dict }
+rig_profile_data = {}
+# scene evaluation time, in seconds
+scene_eval_time = { "start": None, "last": 0.0, "average": 0.0 }
+
+def get_rig_attached_obs(mega_mini_rig):
+    return [ ob for ob in bpy.data.objects if ob != mega_mini_rig and get_parent_mega_mini_rig(ob)[0] == mega_mini_rig ]
+
+def get_rig_driver_count(mega_mini_rig):
+    return sum([ len(id_data.animation_data.drivers) for id_data in get_rig_driver_ids(mega_mini_rig)
+                 if id_data.animation_data != None ])
+
+def update_rig_stats(mega_mini_rig):
+    attached_obs = get_rig_attached_obs(mega_mini_rig)
+    data = rig_profile_data.setdefault(mega_mini_rig.name, { "mod_time": 0.0, "driver_time": None })
+    data["place_count"] = len(get_mega_mini_rig_places(mega_mini_rig))
+    data["driver_count"] = get_rig_driver_count(mega_mini_rig)
+    data["object_names"] = [ ob.name for ob in attached_obs ]
+    data["geo_mod_count"] = sum([ len([ m for m in ob.modifiers if m.type == 'NODES' ]) for ob in attached_obs ])
+    return data
+
+def get_rig_profile_data(mega_mini_rig):
+    return rig_profile_data.get(mega_mini_rig.name)
+
+# sum of geometry nodes modifier execution times (Blender v3.0+) of objects attached to rig
+def get_rig_modifier_time(data):
+    mod_time = 0.0
+    for ob_name in data.get("object_names", []):
+        ob = bpy.data.objects.get(ob_name)
+        if ob is None:
+            continue
+        for mod in ob.modifiers:
+            if mod.type == 'NODES':
+                mod_time += getattr(mod, "execution_time", 0.0)
+    return mod_time
+
+def update_average(old_value, new_value):
+    if old_value is None:
+        return new_value
+    return old_value + (new_value - old_value) * PROFILE_AVERAGE_FACTOR
+
+def profile_eval_start():
+    scene_eval_time["start"] = time.perf_counter()
+
+def profile_eval_end():
+    if scene_eval_time["start"] is None:
+        return
+    elapsed = time.perf_counter() - scene_eval_time["start"]
+    scene_eval_time["start"] = None
+    scene_eval_time["last"] = elapsed
+    scene_eval_time["average"] = update_average(scene_eval_time["average"], elapsed)
+    for rig_name, data in rig_profile_data.items():
+        data["mod_time"] = update_average(data.get("mod_time"), get_rig_modifier_time(data))
+
+def is_profiling(scene):
+    return scene != None and getattr(scene, "MegaMini_ProfileEnable", False)
+
+@persistent
+def profile_pre_handler(scene, *args):
+    if is_profiling(scene):
+        profile_eval_start()
+
+@persistent
+def profile_post_handler(scene, *args):
+    if is_profiling(scene):
+        profile_eval_end()
+
+@persistent
+def profile_load_post(*args):
+    rig_profile_data.clear()
+    scene_eval_time.update({ "start": None, "last": 0.0, "average": 0.0 })
+
+# time to evaluate scene at current frame, averaged over 'repeat_count' evaluations
+def time_scene_evaluation(scene, repeat_count):
+    start = time.perf_counter()
+    for _ in range(repeat_count):
+        scene.frame_set(scene.frame_current)
+    return (time.perf_counter() - start) / repeat_count
+
+# measure time used by rig's drivers, by evaluating the scene with and without the rig's (un-muted) drivers muted
+def measure_rig_driver_time(scene, mega_mini_rig, repeat_count=5):
+    fcurves = []
+    for id_data in get_rig_driver_ids(mega_mini_rig):
+        if id_data.animation_data != None:
+            fcurves.extend([ fc for fc in id_data.animation_data.drivers if not fc.mute ])
+    time_with_drivers = time_scene_evaluation(scene, repeat_count)
+    for fc in fcurves:
+        fc.mute = True
+    try:
+        time_without_drivers = time_scene_evaluation(scene, repeat_count)
+    finally:
+        for fc in fcurves:
+            fc.mute = False
+    scene.frame_set(scene.frame_current)
+    return max(0.0, time_with_drivers - time_without_drivers)
+
+def format_ms(seconds):
+    if seconds is None:
+        return "-"
+    return "%.2f ms" % (seconds * 1000.0)
+
+# draw stats and profile times of rig in panel layout
+def draw_rig_profile(layout, scene, mega_mini_rig):
+    box = layout.box()
+    box.label(text="Stats")
+    data = get_rig_profile_data(mega_mini_rig)
+    if data != None:
+        box.label(text="Places: " + str(data["place_count"]))
+        box.label(text="Drivers: " + str(data["driver_count"]))
+        box.label(text="Attached Objects: " + str(len(data["object_names"])))
+        box.label(text="Geo Nodes Modifiers: " + str(data["geo_mod_count"]))
+    box.operator("mega_mini.update_rig_stats")
+    box = layout.box()
+    box.label(text="Profile")
+    box.prop(scene, "MegaMini_ProfileEnable")
+    if is_profiling(scene):
+        box.label(text="Scene Eval: " + format_ms(scene_eval_time["average"]))
+        if data != None:
+            box.label(text="Rig Geo Nodes: " + format_ms(data.get("mod_time")))
+    if data != None:
+        box.label(text="Rig Drivers: " + format_ms(data.get("driver_time")))
+    box.operator("mega_mini.measure_rig_driver_time")
+
+class MEGAMINI_UpdateRigStats(bpy.types.Operator):
+    bl_description = "Count Places, drivers, attached objects, and geometry nodes modifiers of active MegaMini Rig"
+    bl_idname = "mega_mini.update_rig_stats"
+    bl_label = "Update Stats"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        active_ob = context.active_object
+        if not is_mega_mini_rig(active_ob):
+            self.report({'ERROR'}, "Unable to update stats because Active Object is not a MegaMini Rig.")
+            return {'CANCELLED'}
+        update_rig_stats(active_ob)
+        return {'FINISHED'}
+
+class MEGAMINI_MeasureRigDriverTime(bpy.types.Operator):
+    bl_description = "Measure time used by drivers of active MegaMini Rig, by evaluating current frame with and " + \
+        "without the rig's drivers muted"
+    bl_idname = "mega_mini.measure_rig_driver_time"
+    bl_label = "Measure Driver Time"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        active_ob = context.active_object
+        if not is_mega_mini_rig(active_ob):
+            self.report({'ERROR'}, "Unable to measure driver time because Active Object is not a MegaMini Rig.")
+            return {'CANCELLED'}
+        data = update_rig_stats(active_ob)
+        data["driver_time"] = measure_rig_driver_time(context.scene, active_ob)
+        return {'FINISHED'}
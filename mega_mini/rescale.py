@@ -0,0 +1,107 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# Rescale an existing MegaMini rig: change the rig's mega_mini_scale without changing actual locations, by multiplying
+# all Proxy space locations (ProxyPlace, ProxyPlaceFocus, and ProxyObserver pose bone locations, and their location
+# keyframes, and point locations of instances objects, see instances.py) by old_scale / new_scale. Keyframes of all F-Curves are changed at once (see keyframes.py), so animated
+# rigs do not need to be re-attached. Places with a stored actual location (see actual_loc.py) are then
+# re-derived from the actual location, in double precision.
+
+import bpy
+import numpy as np
+
+from .rig import (PROXY_OBSERVER_BNAME, OBJ_PROP_SCALE, OBJ_PROP_BAKED, OBJ_PROP_ACTUAL_LOC_SCALE,
+    is_mega_mini_rig, get_mega_mini_rig_places)
+from .actual_loc import update_proxy_locs_from_actual
+from .keyframes import (get_bone_fcurves, transform_fcurves_keyframes)
+from .instances import get_rig_instances_obs
+
+# names of bones with locations in Proxy space
+def get_proxy_space_bnames(mega_mini_rig):
+    bnames = set([PROXY_OBSERVER_BNAME])
+    for _, proxy_place_bname, proxy_place_focus_bname in get_mega_mini_rig_places(mega_mini_rig):
+        bnames.add(proxy_place_bname)
+        bnames.add(proxy_place_focus_bname)
+    return bnames
+
+# returns number of F-Curves scaled
+def scale_bone_location_fcurves(armature, bnames, factor):
+    fcurves = [ fc for fc in get_bone_fcurves(armature, sorted(bnames)) if fc != None ]
+    transform_fcurves_keyframes(fcurves, value_factor=factor)
+    return len(fcurves)
+
+def scale_pose_bone_locations(armature, bnames, factor):
+    pose_bones = armature.pose.bones
+    locs = np.empty(len(pose_bones) * 3, dtype=np.float32)
+    pose_bones.foreach_get("location", locs)
+    locs = locs.reshape(-1, 3)
+    mask = np.array([ pb.name in bnames for pb in pose_bones ], dtype=bool)
+    locs[mask] *= factor
+    pose_bones.foreach_set("location", locs.reshape(-1))
+
+# instances objects store ProxyPlace locations as point locations, returns number of points scaled
+def scale_instances_points(mega_mini_rig, factor):
+    point_count = 0
+    meshes = set([ ob.data for ob in get_rig_instances_obs(mega_mini_rig) ])
+    for mesh in meshes:
+        cos = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", cos)
+        mesh.vertices.foreach_set("co", cos * factor)
+        mesh.update()
+        point_count += len(mesh.vertices)
+    return point_count
+
+# returns (number of F-Curves scaled, number of instance points scaled)
+def rescale_mega_mini_rig(mega_mini_rig, new_scale):
+    old_scale = mega_mini_rig[OBJ_PROP_SCALE]
+    factor = old_scale / new_scale
+    bnames = get_proxy_space_bnames(mega_mini_rig)
+    scale_pose_bone_locations(mega_mini_rig, bnames, factor)
+    fcurve_count = scale_bone_location_fcurves(mega_mini_rig, bnames, factor)
+    point_count = scale_instances_points(mega_mini_rig, factor)
+    mega_mini_rig[OBJ_PROP_SCALE] = new_scale
+    # ProxyPlace locations with stored actual location are derived in double precision
+    if mega_mini_rig.get(OBJ_PROP_ACTUAL_LOC_SCALE) != None:
+        update_proxy_locs_from_actual(mega_mini_rig)
+    mega_mini_rig.update_tag()
+    return fcurve_count, point_count
+
+class MEGAMINI_RescaleRig(bpy.types.Operator):
+    bl_description = "Change mega_mini_scale of active MegaMini Rig to New Scale, without changing actual " + \
+        "locations of Places. ProxyPlace, ProxyPlaceFocus, and ProxyObserver locations and location keyframes " + \
+        "are multiplied by old scale / new scale, and so are point locations of Instances objects"
+    bl_idname = "mega_mini.rescale_rig"
+    bl_label = "Rescale Rig"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        active_ob = context.active_object
+        new_scale = context.scene.MegaMini_RescaleNewScale
+        if not is_mega_mini_rig(active_ob):
+            self.report({'ERROR'}, "Unable to rescale because Active Object is not a MegaMini Rig.")
+            return {'CANCELLED'}
+        if new_scale <= 0:
+            self.report({'ERROR'}, "Unable to rescale because New Scale is not greater than zero.")
+            return {'CANCELLED'}
+        if active_ob.get(OBJ_PROP_BAKED, False):
+            self.report({'ERROR'}, "Unable to rescale because MegaMini Rig is baked, unbake rig first.")
+            return {'CANCELLED'}
+        fcurve_count, point_count = rescale_mega_mini_rig(active_ob, new_scale)
+        self.report({'INFO'}, "Rescaled MegaMini Rig, with " + str(fcurve_count) + " location F-Curves and " +
+                    str(point_count) + " instance points")
+        return {'FINISHED'}
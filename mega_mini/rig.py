@@ -17,14 +17,17 @@
 # ##### END GPL LICENSE BLOCK #####
 
 import bpy
+from bpy.app.handlers import persistent
 import math
 import mathutils
 from rna_prop_ui import rna_idprop_ui_prop_get
 
 if bpy.app.version < (2,80,0):
-    from .imp_v27 import (create_mesh_obj_from_pydata, get_cursor_location)
+    from .imp_v27 import (create_mesh_obj_from_pydata, get_cursor_location, select_object, link_object_to_scene,
+        set_active_object, set_object_mode)
 else:
-    from .imp_v28 import (create_mesh_obj_from_pydata, get_cursor_location)
+    from .imp_v28 import (create_mesh_obj_from_pydata, get_cursor_location, select_object, link_object_to_scene,
+        set_active_object, set_object_mode)
 
 RIG_BASENAME = "MegaMini"
 PROXY_FIELD_BNAME = "ProxyField"
@@ -39,6 +42,17 @@ OBJ_PROP_FP_POWER = "mega_mini_fp_power"
 OBJ_PROP_FP_MIN_DIST = "mega_mini_fp_min_dist"
 OBJ_PROP_FP_MIN_SCALE = "mega_mini_fp_min_scale"
 OBJ_PROP_BONE_SCL_MULT = "mega_mini_bone_scl_mult"
+OBJ_PROP_USE_SOLVER = "mega_mini_use_solver"
+OBJ_PROP_USE_CULL = "mega_mini_use_cull"
+OBJ_PROP_CULL_MIN_SCALE = "mega_mini_cull_min_scale"
+OBJ_PROP_CULLED = "mega_mini_culled"
+OBJ_PROP_LOD_LEVELS = "mega_mini_lod_levels"
+OBJ_PROP_LOD_BASE = "mega_mini_lod_base"
+OBJ_PROP_BAKED = "mega_mini_baked"
+OBJ_PROP_ACTUAL_LOC = "mega_mini_actual_loc"
+OBJ_PROP_ACTUAL_LOC_SCALE = "mega_mini_actual_loc_scale"
+OBJ_PROP_TRAJECTORY = "mega_mini_trajectory"
+OBJ_PROP_USE_TRAJECTORY = "mega_mini_use_trajectory"
 
 PROXY_FIELD_BONEHEAD = (0, 0, 0)
 PROXY_FIELD_BONETAIL = (0, 6.854101911, 0)
@@ -60,6 +74,8 @@ PROXY_PLACE_FOCUS_BONELAYERS = PROXY_PLACE_BONELAYERS
 OBSERVER_BONELAYERS = [(x==17) for x in range(32)]
 PLACE_BONELAYERS = [(x==18) for x in range(32)]
 
+PLACE_DRIVER_DATA_PATHS = ("].location", "].rotation_euler", "].scale")
+
 RIG_BONEVIS_LAYERS = [(x in [0, 1, 2, 17, 18]) for x in range(32)]
 
 WIDGET_TRIANGLE_OBJNAME = "WGT_Tri"
@@ -76,28 +92,169 @@ PINCH_QUAD_WIDGET_NAME = "WidgetPinchQuad"
 CIRCLE_WIDGET_NAME = "WidgetCircle"
 CARDIOD_WIDGET_NAME = "WidgetCardiod"
 
+WIDGET_COLLECTION_NAME = "MegaMiniWidgets"
+LEGACY_WIDGET_COLLECTION_NAME = "MegaMiniHidden"
+OBJ_PROP_WIDGET = "mega_mini_widget"
+OBJ_PROP_WIDGETS = "mega_mini_widgets"
+
 WIDGET_CIRCLE_VERT_COUNT = 32
 WIDGET_CARDIOD_VERT_COUNT = 32
 
 MEGA_MINI_CUSTOM_NODE_GROUP_NAME = "MegaMiniGeoNodeGroup"
+MEGA_MINI_FUSED_NODE_GROUP_NAME = "MegaMiniFusedGeoNodeGroup"
+MEGA_MINI_PER_POINT_NODE_GROUP_NAME = "MegaMiniPerPointGeoNodeGroup"
+
+# caches of MegaMini rig membership, keyed by object name, with object pointer to detect replaced objects
+# { object_name: (object_pointer, armature_pointer, is_mega_mini_rig) }, re-checked when object's armature is
+# replaced, and removed when armature is updated (see rig_index_depsgraph_update_post)
+rig_check_index = {}
+# { object_name: (object_pointer, parent_pointer, parent_bone, mega_mini_rig_name, place_bname) }, rig name is None
+# if object is not attached, cleared when parent of a cached object changes (see rig_index_depsgraph_update_post)
+rig_parent_index = {}
+
+def clear_rig_index():
+    rig_check_index.clear()
+    rig_parent_index.clear()
 
 # check if 'ob' is a MegaMini Rig and return False if 'ob' is not a MegaMini Rig, otherwise return True
 def is_mega_mini_rig(ob):
-    if ob is None or not hasattr(ob, 'type') or ob.type != 'ARMATURE' or \
-            ob.data.bones.get(PROXY_OBSERVER_BNAME) is None or ob.data.bones.get(PROXY_FIELD_BNAME) is None:
+    if ob is None or not hasattr(ob, 'type') or ob.type != 'ARMATURE':
         return False
-    return True
+    ob_pointer = ob.as_pointer()
+    arm_pointer = ob.data.as_pointer()
+    cached = rig_check_index.get(ob.name)
+    if cached != None and cached[0] == ob_pointer and cached[1] == arm_pointer:
+        return cached[2]
+    is_rig = ob.data.bones.get(PROXY_OBSERVER_BNAME) != None and ob.data.bones.get(PROXY_FIELD_BNAME) != None
+    rig_check_index[ob.name] = (ob_pointer, arm_pointer, is_rig)
+    return is_rig
+
+# rigs are tracked by name, so handlers do not need to search all objects every frame - if a tracked rig is missing
+# (e.g. renamed or deleted) then all objects are searched, so renamed rigs are tracked by their new names,
+# returns list of tracked rigs, and set of names that are no longer tracked (so cached data of those names can be
+# removed)
+def get_tracked_rigs(rig_names, is_tracked_rig):
+    rigs = [ bpy.data.objects.get(name) for name in rig_names ]
+    if all([ is_tracked_rig(ob) for ob in rigs ]):
+        return rigs, set()
+    found_names = set([ ob.name for ob in bpy.data.objects if is_tracked_rig(ob) ])
+    lost_names = rig_names - found_names
+    rig_names.clear()
+    rig_names.update(found_names)
+    return [ bpy.data.objects[name] for name in found_names ], lost_names
+
+def get_parent_pointer(ob):
+    return 0 if ob.parent is None else ob.parent.as_pointer()
 
 # if a MegaMini Rig is found in the parent-hierarchy of ob, then return the rig and the associated 'Place' bone,
 # otherwise return None
 def get_parent_mega_mini_rig(ob):
-    if ob.parent is None:
-        return None, None
-    if is_mega_mini_rig(ob.parent):
-        # return MegaMiniRig, MegaMiniRigPlaceBoneName
-        return ob.parent, ob.parent_bone
-    # recursively search parent(s) for MegaMini Rig
-    return get_parent_mega_mini_rig(ob.parent)
+    # all objects in the parent chain, up to the rig, have the same result - so remember result for all of them
+    chain = []
+    mega_mini_rig, place_bname = None, None
+    while ob.parent != None:
+        cached = rig_parent_index.get(ob.name)
+        if cached != None and cached[0] == ob.as_pointer():
+            if cached[3] is None:
+                break
+            cached_rig = bpy.data.objects.get(cached[3])
+            if cached_rig != None:
+                mega_mini_rig, place_bname = cached_rig, cached[4]
+                break
+        chain.append(ob)
+        if is_mega_mini_rig(ob.parent):
+            # MegaMiniRig, MegaMiniRigPlaceBoneName
+            mega_mini_rig, place_bname = ob.parent, ob.parent_bone
+            break
+        # search parent(s) for MegaMini Rig
+        ob = ob.parent
+    rig_name = None if mega_mini_rig is None else mega_mini_rig.name
+    for c in chain:
+        rig_parent_index[c.name] = (c.as_pointer(), get_parent_pointer(c), c.parent_bone, rig_name, place_bname)
+    return mega_mini_rig, place_bname
+
+# bones may have been added, removed, or renamed in updated armatures, so rig checks of objects using those
+# armatures are removed - parenting changes are transform updates of the child object, so only objects with updated
+# transforms are checked, and cached parent results are cleared only if a cached object's parent or parent bone
+# changed
+@persistent
+def rig_index_depsgraph_update_post(scene, depsgraph=None):
+    if depsgraph is None:
+        clear_rig_index()
+        return
+    updated_arm_pointers = set()
+    clear_parent_index = False
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.Armature):
+            updated_arm_pointers.add(update.id.original.as_pointer())
+            continue
+        if clear_parent_index or not update.is_updated_transform or not isinstance(update.id, bpy.types.Object):
+            continue
+        ob = update.id.original
+        cached = rig_parent_index.get(ob.name)
+        if cached is None:
+            continue
+        if cached[0] != ob.as_pointer() or cached[1] != get_parent_pointer(ob) or cached[2] != ob.parent_bone:
+            clear_parent_index = True
+    if len(updated_arm_pointers) > 0:
+        for ob_name in [ name for name, cached in rig_check_index.items() if cached[1] in updated_arm_pointers ]:
+            del rig_check_index[ob_name]
+    if clear_parent_index:
+        rig_parent_index.clear()
+
+@persistent
+def rig_index_clear_handler(*args):
+    clear_rig_index()
+
+# get name of pose bone from a driver/fcurve data path like 'pose.bones["Place.001"].scale', or None if data path is
+# not a pose bone data path
+def get_data_path_bone_name(data_path):
+    if not data_path.startswith("pose.bones[\""):
+        return None
+    end = data_path.find("\"]", 12)
+    if end == -1:
+        return None
+    return data_path[12:end]
+
+def set_place_drivers_mute(mega_mini_rig, place_bnames, mute):
+    if mega_mini_rig.animation_data is None or len(place_bnames) == 0:
+        return
+    for fc in mega_mini_rig.animation_data.drivers:
+        if not fc.data_path.endswith(PLACE_DRIVER_DATA_PATHS):
+            continue
+        if get_data_path_bone_name(fc.data_path) in place_bnames and fc.mute != mute:
+            fc.mute = mute
+
+# return list of (place_bname, proxy_place_bname, proxy_place_focus_bname) for all Places of MegaMini rig, found by
+# way of the Place bone drivers - so the list is correct even if the user renamed the bones
+def get_mega_mini_rig_places(mega_mini_rig):
+    if mega_mini_rig.animation_data is None:
+        return []
+    proxy_place_bnames = {}
+    proxy_place_focus_bnames = {}
+    for fc in mega_mini_rig.animation_data.drivers:
+        if fc.array_index != 0:
+            continue
+        bname = get_data_path_bone_name(fc.data_path)
+        if bname is None:
+            continue
+        # rotation X driver reads rotation of ProxyPlace bone
+        if fc.data_path.endswith("].rotation_euler"):
+            for v in fc.driver.variables:
+                if v.type == 'TRANSFORMS' and v.targets[0].transform_type == 'ROT_X':
+                    proxy_place_bnames[bname] = v.targets[0].bone_target
+        # scale X driver reads distance from ProxyPlaceFocus bone to ProxyObserver bone
+        elif fc.data_path.endswith("].scale"):
+            for v in fc.driver.variables:
+                if v.type == 'LOC_DIFF':
+                    proxy_place_focus_bnames[bname] = v.targets[0].bone_target
+    places = []
+    for place_bname, proxy_place_bname in proxy_place_bnames.items():
+        proxy_place_focus_bname = proxy_place_focus_bnames.get(place_bname)
+        if proxy_place_focus_bname is None:
+            continue
+        places.append((place_bname, proxy_place_bname, proxy_place_focus_bname))
+    return places
 
 def get_collection_by_name(root_collection, collection_name):
     if root_collection.name == collection_name:
@@ -182,55 +339,151 @@ def create_widget_cardiod(collection_name=None):
         return create_mesh_obj_from_pydata(verts, edges=edges, obj_name=WIDGET_CARDIOD_OBJNAME,
                                            collection_name=collection_name)
 
+WIDGET_CREATE_FUNCS = {
+    TRI_WIDGET_NAME: create_widget_triangle,
+    TRI_PINCH_WIDGET_NAME: create_widget_pinch_triangle,
+    QUAD_WIDGET_NAME: create_widget_square,
+    PINCH_QUAD_WIDGET_NAME: create_widget_pinch_square,
+    CIRCLE_WIDGET_NAME: create_widget_circle,
+    CARDIOD_WIDGET_NAME: create_widget_cardiod,
+}
+WIDGET_OBJNAMES = {
+    WIDGET_TRIANGLE_OBJNAME: TRI_WIDGET_NAME,
+    WIDGET_PINCH_TRIANGLE_OBJNAME: TRI_PINCH_WIDGET_NAME,
+    WIDGET_QUAD_OBJNAME: QUAD_WIDGET_NAME,
+    WIDGET_PINCH_QUAD_OBJNAME: PINCH_QUAD_WIDGET_NAME,
+    WIDGET_CIRCLE_OBJNAME: CIRCLE_WIDGET_NAME,
+    WIDGET_CARDIOD_OBJNAME: CARDIOD_WIDGET_NAME,
+}
+
+# get widget name (e.g. TRI_WIDGET_NAME) of a widget object, by way of widget custom property, or by way of object
+# name - exact match of name without numeric suffix, e.g. "WGT_Quad.003" is a WIDGET_QUAD_OBJNAME object,
+# returns None if object is not a widget
+def get_widget_name_of_obj(ob):
+    widget_name = ob.get(OBJ_PROP_WIDGET)
+    if widget_name in WIDGET_CREATE_FUNCS:
+        return widget_name
+    base_name, _, suffix = ob.name.partition(".")
+    if suffix != "" and not suffix.isdigit():
+        return None
+    return WIDGET_OBJNAMES.get(base_name)
+
+def get_widget_collection(context):
+    widget_collection = bpy.data.collections.get(WIDGET_COLLECTION_NAME)
+    if widget_collection is None:
+        widget_collection = bpy.data.collections.new(WIDGET_COLLECTION_NAME)
+        widget_collection.hide_render = True
+        # link new collection to scene's main collection
+        context.scene.collection.children.link(widget_collection)
+        collection_hide_in_viewport(context, widget_collection.name)
+    return widget_collection
+
+# widgets are shared by all MegaMini rigs in the file, so each widget shape is created only once per file - missing
+# widgets are created as needed
 def create_mege_mini_widgets(context):
+    widget_ob_dict = {}
     # if v2.7 or earlier
     if bpy.app.version < (2,80,0):
-        tri_obj = create_widget_triangle()
-        tri_pinch_obj = create_widget_pinch_triangle()
-        quad_obj = create_widget_square()
-        pinch_quad_obj = create_widget_pinch_square()
-        circle_obj = create_widget_circle()
-        cardiod_obj = create_widget_cardiod()
-
-        # widgets are only in final layer
-        tri_obj.layers[19] = True
-        tri_pinch_obj.layers[19] = True
-        quad_obj.layers[19] = True
-        pinch_quad_obj.layers[19] = True
-        circle_obj.layers[19] = True
-        cardiod_obj.layers[19] = True
-        for i in range(19):
-            tri_obj.layers[i] = False
-            tri_pinch_obj.layers[i] = False
-            quad_obj.layers[i] = False
-            pinch_quad_obj.layers[i] = False
-            circle_obj.layers[i] = False
-            cardiod_obj.layers[i] = False
+        widget_obs = [ob for ob in bpy.data.objects if ob.get(OBJ_PROP_WIDGET) != None]
     # else v2.8 or later
     else:
-        new_collection = bpy.data.collections.new("MegaMiniHidden")
-        new_collection.hide_render = True
-        # link new collection to currently active collection
-        context.view_layer.active_layer_collection.collection.children.link(new_collection)
-        collection_hide_in_viewport(context, new_collection.name)
-
-        # widgets are in MegaMiniHidden collection
-        tri_obj = create_widget_triangle(collection_name=new_collection.name)
-        tri_pinch_obj = create_widget_pinch_triangle(collection_name=new_collection.name)
-        quad_obj = create_widget_square(collection_name=new_collection.name)
-        pinch_quad_obj = create_widget_pinch_square(collection_name=new_collection.name)
-        circle_obj = create_widget_circle(collection_name=new_collection.name)
-        cardiod_obj = create_widget_cardiod(collection_name=new_collection.name)
-
-    widget_ob_dict = { TRI_WIDGET_NAME : tri_obj,
-                      TRI_PINCH_WIDGET_NAME : tri_pinch_obj,
-                      QUAD_WIDGET_NAME : quad_obj,
-                      PINCH_QUAD_WIDGET_NAME : pinch_quad_obj,
-                      CIRCLE_WIDGET_NAME: circle_obj,
-                      CARDIOD_WIDGET_NAME: cardiod_obj,
-                     }
+        widget_collection = get_widget_collection(context)
+        widget_obs = widget_collection.objects
+    for ob in widget_obs:
+        widget_name = ob.get(OBJ_PROP_WIDGET)
+        if widget_name in WIDGET_CREATE_FUNCS and widget_name not in widget_ob_dict:
+            widget_ob_dict[widget_name] = ob
+
+    for widget_name, create_func in WIDGET_CREATE_FUNCS.items():
+        if widget_name in widget_ob_dict:
+            continue
+        # if v2.7 or earlier
+        if bpy.app.version < (2,80,0):
+            ob = create_func()
+            # widgets are only in final layer
+            ob.layers[19] = True
+            for i in range(19):
+                ob.layers[i] = False
+        # else v2.8 or later, widgets are in MegaMiniWidgets collection
+        else:
+            ob = create_func(collection_name=widget_collection.name)
+        ob[OBJ_PROP_WIDGET] = widget_name
+        widget_ob_dict[widget_name] = ob
     return widget_ob_dict
 
+# linked (library) and library override rigs cannot be changed, so widget references are not written to them
+def is_rig_local(mega_mini_rig):
+    return mega_mini_rig.library is None and getattr(mega_mini_rig, "override_library", None) is None
+
+# store direct references to widget objects in rig's custom property, so widgets can be found without searching
+def set_rig_widget_objs(mega_mini_rig, widget_objs):
+    mega_mini_rig[OBJ_PROP_WIDGETS] = dict(widget_objs)
+
+def get_widget_objs_from_rig(context, mega_mini_rig):
+    rig_widgets = mega_mini_rig.get(OBJ_PROP_WIDGETS)
+    if rig_widgets != None:
+        widget_objs = { widget_name: ob for widget_name, ob in rig_widgets.items() if ob != None }
+        if len(widget_objs) == len(WIDGET_CREATE_FUNCS):
+            return widget_objs
+    else:
+        widget_objs = {}
+    # rigs created by older versions of MegaMini have their own widgets, parented to rig (and to first widget)
+    for ob in mega_mini_rig.children:
+        for w in [ob] + list(ob.children):
+            widget_name = get_widget_name_of_obj(w)
+            if widget_name != None and widget_name not in widget_objs:
+                widget_objs[widget_name] = w
+    # use shared widgets for any widgets not found
+    if len(widget_objs) < len(WIDGET_CREATE_FUNCS):
+        for widget_name, ob in create_mege_mini_widgets(context).items():
+            if widget_name not in widget_objs:
+                widget_objs[widget_name] = ob
+    # rigs created by older versions of MegaMini do not have widget references, so references are added the first
+    # time widgets are needed
+    if is_rig_local(mega_mini_rig):
+        set_rig_widget_objs(mega_mini_rig, widget_objs)
+    return widget_objs
+
+# re-map custom shapes of all MegaMini rigs' bones to the shared widgets, and delete the duplicate widgets (e.g. one
+# set of widgets per rig, from older versions of MegaMini),
+# returns number of deleted widget objects
+def dedup_mega_mini_widgets(context):
+    widget_ob_dict = create_mege_mini_widgets(context)
+    shared_widget_obs = set(widget_ob_dict.values())
+    dup_widget_obs = set()
+    for ob in bpy.data.objects:
+        if not is_mega_mini_rig(ob) or not is_rig_local(ob):
+            continue
+        set_rig_widget_objs(ob, widget_ob_dict)
+        for pb in ob.pose.bones:
+            if pb.custom_shape is None or pb.custom_shape in shared_widget_obs:
+                continue
+            widget_name = get_widget_name_of_obj(pb.custom_shape)
+            if widget_name is None:
+                continue
+            dup_widget_obs.add(pb.custom_shape)
+            pb.custom_shape = widget_ob_dict[widget_name]
+        # older versions parented widgets to rig, and to first widget
+        for child in ob.children:
+            if child not in shared_widget_obs and get_widget_name_of_obj(child) != None:
+                dup_widget_obs.add(child)
+                for grandchild in child.children:
+                    if grandchild not in shared_widget_obs and get_widget_name_of_obj(grandchild) != None:
+                        dup_widget_obs.add(grandchild)
+
+    dup_meshes = set([ob.data for ob in dup_widget_obs if ob.data != None])
+    for ob in dup_widget_obs:
+        bpy.data.objects.remove(ob, do_unlink=True)
+    for mesh in dup_meshes:
+        if mesh.users == 0:
+            bpy.data.meshes.remove(mesh)
+    # remove empty widget collections from older versions
+    if bpy.app.version >= (2,80,0):
+        for coll in [ c for c in bpy.data.collections if c.name.startswith(LEGACY_WIDGET_COLLECTION_NAME) ]:
+            if len(coll.objects) == 0 and len(coll.children) == 0:
+                bpy.data.collections.remove(coll)
+    return len(dup_widget_obs)
+
 def add_bconst_scl_influence_driver(mega_mini_rig, proxy_obs_bconst):
     drv_copy_loc = proxy_obs_bconst.driver_add('influence').driver
 
@@ -248,15 +501,25 @@ def add_bconst_scl_influence_driver(mega_mini_rig, proxy_obs_bconst):
 #     - 'ProxyField' is a Scaled Remote Controller for an Actual World of objects
 def create_mega_mini_armature(context, mega_mini_scale, mega_mini_fp_power, mega_mini_fp_min_dist,
                               mega_mini_fp_min_scale):
-    widget_objs = create_mege_mini_widgets(context)
-
     old_3dview_mode = context.mode
+    old_active_ob = context.active_object
+    # previous active object must be in Object mode before new rig can become active object and enter Edit mode
+    if old_active_ob is not None:
+        set_object_mode(context, old_active_ob, 'OBJECT')
+
+    widget_objs = create_mege_mini_widgets(context)
 
-    # create MegaMini mega_mini_rig and enter EDIT mode
-    bpy.ops.object.armature_add(enter_editmode=True, location=(0, 0, 0))
-    mega_mini_rig = context.active_object
+    # create MegaMini mega_mini_rig with data API, instead of operators, so rig can be created without a 3D View
+    # (e.g. from 'blender -b' scripts), and without the scene/UI refresh caused by operators
     # the mega_mini_rig represents the "actual space", the ProxyField bone represents the "scaled space"
-    mega_mini_rig.name = RIG_BASENAME
+    mega_mini_rig = bpy.data.objects.new(RIG_BASENAME, bpy.data.armatures.new(RIG_BASENAME))
+    link_object_to_scene(context, mega_mini_rig)
+    set_rig_widget_objs(mega_mini_rig, widget_objs)
+    for ob in context.selected_objects:
+        select_object(ob, False)
+    select_object(mega_mini_rig, True)
+    set_active_object(context, mega_mini_rig)
+    set_object_mode(context, mega_mini_rig, 'EDIT')
     mega_mini_rig[OBJ_PROP_SCALE] = mega_mini_scale
     mega_mini_rig[OBJ_PROP_FP_POWER] = mega_mini_fp_power
     mega_mini_rig[OBJ_PROP_FP_MIN_DIST] = mega_mini_fp_min_dist
@@ -303,8 +566,8 @@ def create_mega_mini_armature(context, mega_mini_scale, mega_mini_fp_power, mega
 
     # ensure mega_mini_rig will display custom bone shapes
     mega_mini_rig.data.show_bone_custom_shapes = True
-    # modify default bone to make ProxyField bone, to hold proxies for observer(s) and actual place(s)
-    b_proxy_field = mega_mini_rig.data.edit_bones[0]
+    # create ProxyField bone, to hold proxies for observer(s) and actual place(s)
+    b_proxy_field = mega_mini_rig.data.edit_bones.new(name=PROXY_FIELD_BNAME)
     b_proxy_field.head = mathutils.Vector(PROXY_FIELD_BONEHEAD)
     b_proxy_field.tail = mathutils.Vector(PROXY_FIELD_BONETAIL)
     b_proxy_field.name = PROXY_FIELD_BNAME
@@ -330,7 +593,7 @@ def create_mega_mini_armature(context, mega_mini_scale, mega_mini_fp_power, mega
     b_observer.layers = OBSERVER_BONELAYERS
 
     # enter Pose mode to allow adding bone constraints
-    bpy.ops.object.mode_set(mode='POSE')
+    set_object_mode(context, mega_mini_rig, 'POSE')
     # apply custom bone shapes to Sun Target, Sensor, and Blinds (apply to Blinds by way of Diff Cube),
     mega_mini_rig.pose.bones[proxy_observer_bname].custom_shape = \
         bpy.data.objects[widget_objs[TRI_PINCH_WIDGET_NAME].name]
@@ -349,27 +612,31 @@ def create_mega_mini_armature(context, mega_mini_scale, mega_mini_fp_power, mega
     # add a driver to scale the influence by the mega_mini_rig's mega_mini_scale value
     add_bconst_scl_influence_driver(mega_mini_rig, proxy_obs_bconst)
 
-    bpy.ops.object.mode_set(mode=old_3dview_mode)
-
-    # parent widgets to new MegaMini Rig, first widget is "main parent" widget to other widgets
-    if len(widget_objs) > 0:
-        main_parent = None
-        for w in widget_objs.values():
-            if main_parent is None:
-                # parent first widget to rig
-                main_parent = w
-                main_parent.parent = mega_mini_rig
-                continue
-            # parent remaining widgets to first widget
-            w.parent = main_parent
+    # return to Pose mode if previous active object was in Pose mode, otherwise return to Object mode
+    set_object_mode(context, mega_mini_rig, 'POSE' if old_3dview_mode == 'POSE' else 'OBJECT')
 
     mega_mini_rig.data.layers = RIG_BONEVIS_LAYERS
 
     # move mega-mini rig to cursor location
     mega_mini_rig.location = get_cursor_location(context)
 
+    # rig bones were changed, so cached rig membership may be wrong
+    clear_rig_index()
+
     return mega_mini_rig
 
+class MEGAMINI_DedupWidgets(bpy.types.Operator):
+    bl_description = "Use one shared set of widgets (custom bone shapes) for all MegaMini Rigs, and delete " + \
+        "duplicate widget objects (e.g. from rigs created with older versions of MegaMini)"
+    bl_idname = "mega_mini.dedup_widgets"
+    bl_label = "Deduplicate Widgets"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        count = dedup_mega_mini_widgets(context)
+        self.report({'INFO'}, "Deleted " + str(count) + " duplicate widget object(s).")
+        return {'FINISHED'}
+
 class MEGAMINI_CreateMegaMiniRig(bpy.types.Operator):
     bl_description = "Create a MegaMini rig, for 'condensed space' - e.g. Solar system simulations, " + \
         "outer-space-to-Earth-surface zoom. Rig will be created with New Rig Properties"
@@ -0,0 +1,197 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# MegaMini Solver: instead of evaluating nine drivers per Place (location, rotation, and scale of each Place bone),
+# compute the location, rotation, and scale of every Place of a rig in one pass, from a frame change handler.
+# The Place bone drivers are muted (not removed) while the solver is used, so the solver can be disabled at any time
+# to return to driver evaluation, and so the Place-ProxyPlace-ProxyPlaceFocus bone relationships are kept even if
+# the user renames bones.
+
+import bpy
+import mathutils
+from bpy.app.handlers import persistent
+
+from .rig import (PROXY_OBSERVER_BNAME, OBJ_PROP_SCALE, OBJ_PROP_FP_POWER, OBJ_PROP_FP_MIN_DIST,
+    OBJ_PROP_FP_MIN_SCALE, OBJ_PROP_BONE_SCL_MULT, OBJ_PROP_USE_SOLVER, OBJ_PROP_BAKED)
+from .rig import (is_mega_mini_rig, get_mega_mini_rig_places, set_place_drivers_mute, get_tracked_rigs)
+from .fp_math import fp_place_locs_scales
+from .cull import get_culled_place_bnames
+
+# names of rigs that use the solver, so handlers do not need to search all objects every frame
+solver_rig_names = set()
+# cache of Places per rig, { rig_name: (driver_count, places) }, re-built when number of rig drivers changes
+solver_rig_places = {}
+# prevent the depsgraph handler from running the solver again because of changes made by the solver
+solver_running = False
+
+def is_solver_rig(ob):
+    return is_mega_mini_rig(ob) and ob.get(OBJ_PROP_USE_SOLVER, False)
+
+def get_solver_rig_places(mega_mini_rig):
+    driver_count = 0 if mega_mini_rig.animation_data is None else len(mega_mini_rig.animation_data.drivers)
+    cached = solver_rig_places.get(mega_mini_rig.name)
+    if cached is not None and cached[0] == driver_count:
+        return cached[1]
+    places = get_mega_mini_rig_places(mega_mini_rig)
+    # Places may have been added since solver was enabled, so ensure all Place drivers are muted
+    set_place_drivers_mute(mega_mini_rig, set([p[0] for p in places]), True)
+    solver_rig_places[mega_mini_rig.name] = (driver_count, places)
+    return places
+
+def get_bone_local_matrix(mega_mini_rig, pose_bone):
+    # same as driver variable of type 'TRANSFORMS' with 'LOCAL_SPACE' transform space, i.e. includes constraints
+    return mega_mini_rig.convert_space(pose_bone=pose_bone, matrix=pose_bone.matrix, from_space='POSE',
+                                       to_space='LOCAL')
+
+# compute location, rotation, and scale of Place bones, using the same formulas as the Place bone drivers
+# (see fp_math.py), with the math done for all Places at once
+# returns list of (place_bname, location, rotation_euler, scale)
+def solve_mega_mini_rig_places(mega_mini_rig, places):
+    rig_matrix = mega_mini_rig.matrix_world
+    pose_bones = mega_mini_rig.pose.bones
+
+    pb_proxy_obs = pose_bones[PROXY_OBSERVER_BNAME]
+    proxy_obs_world = rig_matrix @ pb_proxy_obs.head
+    proxy_obs_local = get_bone_local_matrix(mega_mini_rig, pb_proxy_obs).translation
+
+    place_bnames = []
+    proxy_place_locs = []
+    proxy_dists = []
+    bone_scl_mults = []
+    rotations = []
+    for place_bname, proxy_place_bname, proxy_place_focus_bname in places:
+        pb_place = pose_bones.get(place_bname)
+        pb_proxy_place = pose_bones.get(proxy_place_bname)
+        pb_proxy_place_focus = pose_bones.get(proxy_place_focus_bname)
+        if pb_place is None or pb_proxy_place is None or pb_proxy_place_focus is None:
+            continue
+        place_bnames.append(place_bname)
+        # distance is in World space, same as 'LOC_DIFF' driver variable
+        proxy_dists.append((rig_matrix @ pb_proxy_place_focus.head - proxy_obs_world).length)
+        bone_scl_mults.append(pb_place.get(OBJ_PROP_BONE_SCL_MULT, 1.0))
+        proxy_place_local = get_bone_local_matrix(mega_mini_rig, pb_proxy_place)
+        proxy_place_locs.append(proxy_place_local.translation)
+        # driver rotation is converted with ProxyPlace bone's Euler order, or XYZ if ProxyPlace uses Quaternion or
+        # Axis Angle rotation
+        rot_order = pb_proxy_place.rotation_mode
+        if rot_order in ('QUATERNION', 'AXIS_ANGLE'):
+            rot_order = 'XYZ'
+        rotations.append(proxy_place_local.to_euler(rot_order))
+    if len(place_bnames) == 0:
+        return []
+
+    locations, scales = fp_place_locs_scales(proxy_place_locs, proxy_obs_local, mega_mini_rig[OBJ_PROP_SCALE],
+        mega_mini_rig[OBJ_PROP_FP_POWER], mega_mini_rig[OBJ_PROP_FP_MIN_DIST], mega_mini_rig[OBJ_PROP_FP_MIN_SCALE],
+        bone_scl_mults, proxy_dists)
+    return [ (place_bnames[i], mathutils.Vector(locations[i]), rotations[i], float(scales[i]))
+             for i in range(len(place_bnames)) ]
+
+def solve_mega_mini_rig(mega_mini_rig):
+    places = get_solver_rig_places(mega_mini_rig)
+    # skip culled Places
+    culled_bnames = get_culled_place_bnames(mega_mini_rig)
+    if len(culled_bnames) > 0:
+        places = [ p for p in places if p[0] not in culled_bnames ]
+    pose_bones = mega_mini_rig.pose.bones
+    for place_bname, location, rotation, scale in solve_mega_mini_rig_places(mega_mini_rig, places):
+        pb_place = pose_bones[place_bname]
+        # only write changed values, to prevent unnecessary depsgraph updates
+        if pb_place.location != location:
+            pb_place.location = location
+        if tuple(pb_place.rotation_euler) != tuple(rotation):
+            pb_place.rotation_euler = rotation
+        if tuple(pb_place.scale) != (scale, scale, scale):
+            pb_place.scale = (scale, scale, scale)
+
+def solve_all_rigs():
+    global solver_running
+    if solver_running:
+        return
+    solver_running = True
+    try:
+        # forget about rigs that were deleted or had solver disabled, and find renamed rigs
+        mega_mini_rigs, lost_names = get_tracked_rigs(solver_rig_names, is_solver_rig)
+        for rig_name in lost_names:
+            solver_rig_places.pop(rig_name, None)
+        for mega_mini_rig in mega_mini_rigs:
+            solve_mega_mini_rig(mega_mini_rig)
+    finally:
+        solver_running = False
+
+@persistent
+def solver_frame_change_post(scene, *args):
+    solve_all_rigs()
+
+@persistent
+def solver_depsgraph_update_post(scene, *args):
+    solve_all_rigs()
+
+@persistent
+def solver_load_post(*args):
+    solver_rig_names.clear()
+    solver_rig_places.clear()
+    for ob in bpy.data.objects:
+        if is_solver_rig(ob):
+            solver_rig_names.add(ob.name)
+
+def enable_rig_solver(mega_mini_rig):
+    mega_mini_rig[OBJ_PROP_USE_SOLVER] = True
+    solver_rig_places.pop(mega_mini_rig.name, None)
+    solver_rig_names.add(mega_mini_rig.name)
+    # mutes Place drivers
+    solve_mega_mini_rig(mega_mini_rig)
+
+def disable_rig_solver(mega_mini_rig):
+    mega_mini_rig[OBJ_PROP_USE_SOLVER] = False
+    solver_rig_places.pop(mega_mini_rig.name, None)
+    solver_rig_names.discard(mega_mini_rig.name)
+    # drivers of culled Places stay muted
+    set_place_drivers_mute(mega_mini_rig, set([p[0] for p in get_mega_mini_rig_places(mega_mini_rig)]) -
+                           get_culled_place_bnames(mega_mini_rig), False)
+
+class MEGAMINI_SolverEnable(bpy.types.Operator):
+    bl_description = "Use MegaMini Solver for active MegaMini Rig. Place bone drivers are muted, and Place " + \
+        "locations/rotations/scales are computed for all Places at once, every frame"
+    bl_idname = "mega_mini.solver_enable"
+    bl_label = "Enable Solver"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        active_ob = context.active_object
+        if not is_mega_mini_rig(active_ob):
+            self.report({'ERROR'}, "Unable to enable Solver because Active Object is not a MegaMini Rig.")
+            return {'CANCELLED'}
+        if active_ob.get(OBJ_PROP_BAKED, False):
+            self.report({'ERROR'}, "Unable to enable Solver because MegaMini Rig is baked. Unbake rig first.")
+            return {'CANCELLED'}
+        enable_rig_solver(active_ob)
+        return {'FINISHED'}
+
+class MEGAMINI_SolverDisable(bpy.types.Operator):
+    bl_description = "Stop using MegaMini Solver for active MegaMini Rig, and un-mute Place bone drivers"
+    bl_idname = "mega_mini.solver_disable"
+    bl_label = "Disable Solver"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        active_ob = context.active_object
+        if not is_mega_mini_rig(active_ob):
+            self.report({'ERROR'}, "Unable to disable Solver because Active Object is not a MegaMini Rig.")
+            return {'CANCELLED'}
+        disable_rig_solver(active_ob)
+        return {'FINISHED'}
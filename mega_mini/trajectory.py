@@ -0,0 +1,390 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# MegaMini trajectories: instead of keyframing ProxyPlace bones, a Place can have a trajectory - Keplerian orbital
+# elements, or a uniformly sampled ephemeris table - stored in the Place pose bone's 'mega_mini_trajectory' custom
+# property:
+#     { "type": "KEPLER", "center": center Place bone name (or ""), "semi_major_axis": float, "eccentricity": float,
+#       "inclination": float, "ascending_node": float, "arg_periapsis": float, "mean_anomaly": float,
+#       "epoch": float (frame), "period": float (frames) }
+#     { "type": "EPHEMERIS", "center": center Place bone name (or ""), "start_frame": float, "frame_step": float,
+#       "positions": flat array of x, y, z values }
+# Trajectory positions are actual locations relative to the center Place (e.g. moon orbiting planet). The positions
+# of all trajectory Places of a rig are evaluated in one vectorized call per frame (see orbit_math.py), converted to
+# ProxyPlace locations (divided by mega_mini_scale), and written by a frame change handler before the scene is
+# evaluated. ProxyPlace locations are cached per frame, with least recently used frames removed first, so scrubbing
+# back and forth over the timeline does not re-evaluate trajectories. Center Places without a trajectory (e.g. a
+# keyframed planet) are read every frame, and their locations are part of the cache key.
+# ProxyPlace location F-Curves of trajectory Places are muted, so they do not overwrite the trajectory locations.
+
+from collections import OrderedDict
+
+import bpy
+import numpy as np
+from bpy.app.handlers import persistent
+
+from .rig import (OBJ_PROP_SCALE, OBJ_PROP_ACTUAL_LOC, OBJ_PROP_TRAJECTORY, OBJ_PROP_USE_TRAJECTORY,
+    is_mega_mini_rig, get_mega_mini_rig_places, get_tracked_rigs)
+from .orbit_math import (kepler_positions, ephemeris_positions, center_depths, resolve_center_positions)
+from .keyframes import (get_pose_bone_data_path, get_armature_action, get_bone_fcurves)
+from .catalog import iter_catalog_chunks
+
+# maximum number of frames of ProxyPlace locations cached per rig
+TRAJECTORY_CACHE_FRAMES = 1000
+KEPLER_ELEMENT_NAMES = ("semi_major_axis", "eccentricity", "inclination", "ascending_node", "arg_periapsis",
+                        "mean_anomaly", "epoch", "period")
+
+# names of rigs with trajectories
+trajectory_rig_names = set()
+# packed trajectory data and frame cache per rig, { rig_name: dict }
+trajectory_rig_data = {}
+
+def is_trajectory_rig(ob):
+    return is_mega_mini_rig(ob) and ob.get(OBJ_PROP_USE_TRAJECTORY) != None
+
+def track_trajectory_rig(mega_mini_rig):
+    trajectory_rig_names.add(mega_mini_rig.name)
+
+# packed trajectory data must be re-built after trajectories are changed
+def clear_trajectory_rig_data(mega_mini_rig):
+    trajectory_rig_data.pop(mega_mini_rig.name, None)
+
+# returns (place_bname, proxy_place_bname, proxy_place_focus_bname) of Place with a bone named 'bname', or None
+def get_place_for_bname(mega_mini_rig, bname):
+    for place in get_mega_mini_rig_places(mega_mini_rig):
+        if bname in place:
+            return place
+    return None
+
+# actual locations of center Places without trajectory (static bodies) at 'frame', returns array of shape (N, 3) -
+# each location component is evaluated from its F-Curve if animated (more than one keyframe), because pose bone
+# locations are not yet evaluated for the new frame when frame change pre handler runs, otherwise it is the stored
+# actual location (double precision) if it matches the current ProxyPlace location, or the current ProxyPlace location
+# (e.g. center Place was moved)
+def get_static_center_actual_locs(mega_mini_rig, data, frame, pose_locs):
+    mega_mini_scale = mega_mini_rig[OBJ_PROP_SCALE]
+    pose_bones = mega_mini_rig.pose.bones
+    static_locs = np.empty((len(data["static_bnames"]), 3))
+    action = get_armature_action(mega_mini_rig)
+    for index, (place_bname, proxy_place_bname, bone_index) in enumerate(data["static_bnames"]):
+        actual_loc = pose_bones[place_bname].get(OBJ_PROP_ACTUAL_LOC)
+        data_path = get_pose_bone_data_path(proxy_place_bname, ".location")
+        for axis in range(3):
+            fc = None if action is None else action.fcurves.find(data_path, index=axis)
+            if fc != None and not fc.mute and len(fc.keyframe_points) > 1:
+                static_locs[index, axis] = fc.evaluate(frame) * mega_mini_scale
+            elif actual_loc != None and np.isclose(actual_loc[axis] / mega_mini_scale, pose_locs[bone_index, axis],
+                                                   rtol=1e-6, atol=1e-9):
+                static_locs[index, axis] = actual_loc[axis]
+            else:
+                static_locs[index, axis] = pose_locs[bone_index, axis] * mega_mini_scale
+    return static_locs
+
+# pack trajectories of all Places of rig into arrays, for vectorized evaluation - bodies are trajectory Places,
+# followed by center Places without trajectories (static bodies)
+def build_trajectory_rig_data(mega_mini_rig):
+    pose_bones = mega_mini_rig.pose.bones
+    places = get_mega_mini_rig_places(mega_mini_rig)
+    traj_places = [ (place_bname, proxy_place_bname) for place_bname, proxy_place_bname, _ in places
+                    if pose_bones[place_bname].get(OBJ_PROP_TRAJECTORY) != None ]
+    body_indexes = { place_bname: index for index, (place_bname, _) in enumerate(traj_places) }
+    proxy_place_bnames = { place_bname: proxy_place_bname for place_bname, proxy_place_bname, _ in places }
+    static_bnames = []
+    center_indexes = []
+    kepler_indexes = []
+    kepler_elements = []
+    ephemeris_indexes = []
+    ephemeris_positions_list = []
+    ephemeris_params = []
+    for index, (place_bname, _) in enumerate(traj_places):
+        traj = pose_bones[place_bname][OBJ_PROP_TRAJECTORY]
+        center_bname = traj.get("center", "")
+        if center_bname in proxy_place_bnames and center_bname != place_bname:
+            if center_bname not in body_indexes:
+                body_indexes[center_bname] = len(traj_places) + len(static_bnames)
+                static_bnames.append((center_bname, proxy_place_bnames[center_bname]))
+            center_indexes.append(body_indexes[center_bname])
+        else:
+            center_indexes.append(-1)
+        if traj.get("type") == 'EPHEMERIS':
+            positions = np.array(traj["positions"].to_list(), dtype=np.float64).reshape(-1, 3)
+            if len(positions) == 0:
+                positions = np.zeros((1, 3))
+            ephemeris_indexes.append(index)
+            ephemeris_positions_list.append(positions)
+            ephemeris_params.append((traj.get("start_frame", 0.0), traj.get("frame_step", 1.0)))
+        else:
+            kepler_indexes.append(index)
+            kepler_elements.append([ traj.get(name, 0.0) for name in KEPLER_ELEMENT_NAMES ])
+    center_indexes += [ -1 ] * len(static_bnames)
+    ephemeris_counts = np.array([ len(p) for p in ephemeris_positions_list ], dtype=np.int64)
+    bone_indexes = { pb.name: index for index, pb in enumerate(pose_bones) }
+    data = {
+        "bone_count": len(pose_bones),
+        "proxy_indexes": np.array([ bone_indexes[proxy_place_bname] for _, proxy_place_bname in traj_places ],
+                                  dtype=np.int64),
+        "static_bnames": [ (place_bname, proxy_place_bname, bone_indexes[proxy_place_bname])
+                           for place_bname, proxy_place_bname in static_bnames ],
+        "center_indexes": np.array(center_indexes, dtype=np.int64),
+        "depths": center_depths(center_indexes),
+        "kepler_indexes": np.array(kepler_indexes, dtype=np.int64),
+        "kepler_elements": np.array(kepler_elements, dtype=np.float64).reshape(-1, len(KEPLER_ELEMENT_NAMES)).T,
+        "ephemeris_indexes": np.array(ephemeris_indexes, dtype=np.int64),
+        "ephemeris_positions": np.concatenate(ephemeris_positions_list) if len(ephemeris_positions_list) > 0 \
+            else np.zeros((0, 3)),
+        "ephemeris_offsets": np.concatenate(([0], np.cumsum(ephemeris_counts)[:-1])).astype(np.int64) \
+            if len(ephemeris_counts) > 0 else np.zeros(0, dtype=np.int64),
+        "ephemeris_counts": ephemeris_counts,
+        "ephemeris_params": np.array(ephemeris_params, dtype=np.float64).reshape(-1, 2).T,
+        "cache": OrderedDict(),
+    }
+    trajectory_rig_data[mega_mini_rig.name] = data
+    return data
+
+def get_trajectory_rig_data(mega_mini_rig):
+    data = trajectory_rig_data.get(mega_mini_rig.name)
+    if data is not None and data["bone_count"] == len(mega_mini_rig.pose.bones):
+        return data
+    return build_trajectory_rig_data(mega_mini_rig)
+
+# actual locations of trajectory Places at 'frame', returns array of shape (N, 3)
+def evaluate_trajectory_actual_locs(data, frame, static_locs):
+    traj_count = len(data["proxy_indexes"])
+    positions = np.zeros((traj_count + len(static_locs), 3))
+    positions[traj_count:] = static_locs
+    if len(data["kepler_indexes"]) > 0:
+        positions[data["kepler_indexes"]] = kepler_positions(*data["kepler_elements"], t=frame)
+    if len(data["ephemeris_indexes"]) > 0:
+        start_frames, frame_steps = data["ephemeris_params"]
+        positions[data["ephemeris_indexes"]] = ephemeris_positions(data["ephemeris_positions"],
+            data["ephemeris_offsets"], data["ephemeris_counts"], start_frames, frame_steps, frame)
+    return resolve_center_positions(positions, data["center_indexes"], data["depths"])[:traj_count]
+
+# ProxyPlace locations of trajectory Places at 'frame', from cache if available
+def get_trajectory_proxy_locs(mega_mini_rig, data, frame, pose_locs):
+    cache = data["cache"]
+    static_locs = get_static_center_actual_locs(mega_mini_rig, data, frame, pose_locs)
+    key = (frame, mega_mini_rig[OBJ_PROP_SCALE], static_locs.tobytes())
+    proxy_locs = cache.get(key)
+    if proxy_locs is not None:
+        cache.move_to_end(key)
+        return proxy_locs
+    proxy_locs = (evaluate_trajectory_actual_locs(data, frame, static_locs) /
+                  mega_mini_rig[OBJ_PROP_SCALE]).astype(np.float32)
+    cache[key] = proxy_locs
+    if len(cache) > TRAJECTORY_CACHE_FRAMES:
+        cache.popitem(last=False)
+    return proxy_locs
+
+def update_rig_trajectories(mega_mini_rig, frame):
+    data = get_trajectory_rig_data(mega_mini_rig)
+    if len(data["proxy_indexes"]) == 0:
+        return
+    pose_bones = mega_mini_rig.pose.bones
+    locs = np.empty(len(pose_bones) * 3, dtype=np.float32)
+    pose_bones.foreach_get("location", locs)
+    locs = locs.reshape(-1, 3)
+    locs[data["proxy_indexes"]] = get_trajectory_proxy_locs(mega_mini_rig, data, frame, locs)
+    pose_bones.foreach_set("location", locs.reshape(-1))
+    # foreach_set does not tag the rig for update, so tag it to make sure evaluated pose uses the new locations
+    mega_mini_rig.update_tag()
+
+def update_all_trajectory_rigs(scene):
+    frame = getattr(scene, "frame_current_final", scene.frame_current)
+    # forget about rigs that were deleted, and find renamed rigs
+    mega_mini_rigs, lost_names = get_tracked_rigs(trajectory_rig_names, is_trajectory_rig)
+    for rig_name in lost_names:
+        trajectory_rig_data.pop(rig_name, None)
+    for mega_mini_rig in mega_mini_rigs:
+        if mega_mini_rig.get(OBJ_PROP_USE_TRAJECTORY, False):
+            update_rig_trajectories(mega_mini_rig, frame)
+
+@persistent
+def trajectory_frame_change_pre(scene, *args):
+    update_all_trajectory_rigs(scene)
+
+@persistent
+def trajectory_load_post(*args):
+    trajectory_rig_names.clear()
+    trajectory_rig_data.clear()
+    for ob in bpy.data.objects:
+        if is_trajectory_rig(ob):
+            trajectory_rig_names.add(ob.name)
+
+def set_proxy_place_location_fcurves_mute(mega_mini_rig, proxy_place_bname, mute):
+    for fc in get_bone_fcurves(mega_mini_rig, [proxy_place_bname]):
+        if fc != None:
+            fc.mute = mute
+
+# returns True if 'center_bname' is 'place_bname', or if 'place_bname' is in the center chain of 'center_bname'
+def is_center_loop(mega_mini_rig, place_bname, center_bname):
+    pose_bones = mega_mini_rig.pose.bones
+    visited = set()
+    while center_bname != "" and center_bname not in visited:
+        if center_bname == place_bname:
+            return True
+        visited.add(center_bname)
+        traj = pose_bones[center_bname].get(OBJ_PROP_TRAJECTORY) if center_bname in pose_bones else None
+        center_bname = "" if traj is None else traj.get("center", "")
+    return False
+
+def set_place_trajectory(mega_mini_rig, place, traj):
+    place_bname, proxy_place_bname, _ = place
+    mega_mini_rig.pose.bones[place_bname][OBJ_PROP_TRAJECTORY] = traj
+    set_proxy_place_location_fcurves_mute(mega_mini_rig, proxy_place_bname, True)
+    if OBJ_PROP_USE_TRAJECTORY not in mega_mini_rig:
+        mega_mini_rig[OBJ_PROP_USE_TRAJECTORY] = True
+    track_trajectory_rig(mega_mini_rig)
+    clear_trajectory_rig_data(mega_mini_rig)
+
+def clear_place_trajectory(mega_mini_rig, place):
+    place_bname, proxy_place_bname, _ = place
+    pb_place = mega_mini_rig.pose.bones[place_bname]
+    if OBJ_PROP_TRAJECTORY in pb_place:
+        del pb_place[OBJ_PROP_TRAJECTORY]
+    set_proxy_place_location_fcurves_mute(mega_mini_rig, proxy_place_bname, False)
+    clear_trajectory_rig_data(mega_mini_rig)
+
+# returns (mega_mini_rig, place, center_place_bname) for active bone of active object, or an error message string
+def get_active_trajectory_place(context):
+    active_ob = context.active_object
+    if not is_mega_mini_rig(active_ob):
+        return "Active Object is not a MegaMini Rig."
+    active_bone = active_ob.data.bones.active
+    place = None if active_bone is None else get_place_for_bname(active_ob, active_bone.name)
+    if place is None:
+        return "active bone is not a Place, ProxyPlace, or ProxyPlaceFocus bone."
+    center_bname = ""
+    if context.scene.MegaMini_TrajectoryCenter != "":
+        center_place = get_place_for_bname(active_ob, context.scene.MegaMini_TrajectoryCenter)
+        if center_place is None:
+            return "Center is not a Place, ProxyPlace, or ProxyPlaceFocus bone."
+        center_bname = center_place[0]
+        if is_center_loop(active_ob, place[0], center_bname):
+            return "Center would orbit active Place."
+    return active_ob, place, center_bname
+
+class MEGAMINI_TrajectoryAddKepler(bpy.types.Operator):
+    bl_description = "Set Kepler orbit trajectory of active Place (or ProxyPlace) bone of active MegaMini Rig, " + \
+        "from Kepler orbit options. ProxyPlace location keyframes are muted"
+    bl_idname = "mega_mini.trajectory_add_kepler"
+    bl_label = "Set Kepler Orbit"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        scn = context.scene
+        result = get_active_trajectory_place(context)
+        if isinstance(result, str):
+            self.report({'ERROR'}, "Unable to set Kepler orbit because " + result)
+            return {'CANCELLED'}
+        mega_mini_rig, place, center_bname = result
+        if scn.MegaMini_KeplerPeriod <= 0:
+            self.report({'ERROR'}, "Unable to set Kepler orbit because Period is not greater than zero.")
+            return {'CANCELLED'}
+        set_place_trajectory(mega_mini_rig, place, {
+            "type": 'KEPLER',
+            "center": center_bname,
+            "semi_major_axis": scn.MegaMini_KeplerSemiMajorAxis,
+            "eccentricity": scn.MegaMini_KeplerEccentricity,
+            "inclination": scn.MegaMini_KeplerInclination,
+            "ascending_node": scn.MegaMini_KeplerAscendingNode,
+            "arg_periapsis": scn.MegaMini_KeplerArgPeriapsis,
+            "mean_anomaly": scn.MegaMini_KeplerMeanAnomaly,
+            "epoch": scn.MegaMini_KeplerEpoch,
+            "period": scn.MegaMini_KeplerPeriod,
+        })
+        update_all_trajectory_rigs(scn)
+        return {'FINISHED'}
+
+class MEGAMINI_TrajectoryLoadEphemeris(bpy.types.Operator):
+    bl_description = "Set ephemeris trajectory of active Place (or ProxyPlace) bone of active MegaMini Rig, from " + \
+        "Ephemeris File (CSV or .npy, same format and column options as Catalog import). Each row is one sample " + \
+        "of actual position. ProxyPlace location keyframes are muted"
+    bl_idname = "mega_mini.trajectory_load_ephemeris"
+    bl_label = "Load Ephemeris"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        scn = context.scene
+        result = get_active_trajectory_place(context)
+        if isinstance(result, str):
+            self.report({'ERROR'}, "Unable to load ephemeris because " + result)
+            return {'CANCELLED'}
+        mega_mini_rig, place, center_bname = result
+        if scn.MegaMini_EphemerisFrameStep <= 0:
+            self.report({'ERROR'}, "Unable to load ephemeris because Frame Step is not greater than zero.")
+            return {'CANCELLED'}
+        filepath = bpy.path.abspath(scn.MegaMini_EphemerisFilepath)
+        try:
+            positions = [ chunk_positions for chunk_positions, _, _ in iter_catalog_chunks(filepath, 100000,
+                scn.MegaMini_CatalogColumnX, scn.MegaMini_CatalogColumnY, scn.MegaMini_CatalogColumnZ) ]
+        except (OSError, ValueError) as e:
+            self.report({'ERROR'}, "Unable to load ephemeris: " + str(e))
+            return {'CANCELLED'}
+        if len(positions) == 0:
+            self.report({'ERROR'}, "Unable to load ephemeris because file has no rows.")
+            return {'CANCELLED'}
+        positions = np.concatenate(positions) * scn.MegaMini_CatalogPositionScale
+        set_place_trajectory(mega_mini_rig, place, {
+            "type": 'EPHEMERIS',
+            "center": center_bname,
+            "start_frame": scn.MegaMini_EphemerisStartFrame,
+            "frame_step": scn.MegaMini_EphemerisFrameStep,
+            "positions": positions.reshape(-1).tolist(),
+        })
+        update_all_trajectory_rigs(scn)
+        return {'FINISHED'}
+
+class MEGAMINI_TrajectoryClear(bpy.types.Operator):
+    bl_description = "Remove trajectory of active Place (or ProxyPlace) bone of active MegaMini Rig, and un-mute " + \
+        "ProxyPlace location keyframes"
+    bl_idname = "mega_mini.trajectory_clear"
+    bl_label = "Clear Trajectory"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        active_ob = context.active_object
+        if not is_mega_mini_rig(active_ob):
+            self.report({'ERROR'}, "Unable to clear trajectory because Active Object is not a MegaMini Rig.")
+            return {'CANCELLED'}
+        active_bone = active_ob.data.bones.active
+        place = None if active_bone is None else get_place_for_bname(active_ob, active_bone.name)
+        if place is None:
+            self.report({'ERROR'}, "Unable to clear trajectory because active bone is not a Place, ProxyPlace, " +
+                        "or ProxyPlaceFocus bone.")
+            return {'CANCELLED'}
+        clear_place_trajectory(active_ob, place)
+        return {'FINISHED'}
+
+class MEGAMINI_TrajectoryRefresh(bpy.types.Operator):
+    bl_description = "Re-read trajectories of active MegaMini Rig and clear cached ProxyPlace locations, e.g. " + \
+        "after trajectory custom properties were edited"
+    bl_idname = "mega_mini.trajectory_refresh"
+    bl_label = "Refresh Trajectories"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        active_ob = context.active_object
+        if not is_mega_mini_rig(active_ob):
+            self.report({'ERROR'}, "Unable to refresh trajectories because Active Object is not a MegaMini Rig.")
+            return {'CANCELLED'}
+        clear_trajectory_rig_data(active_ob)
+        if active_ob.get(OBJ_PROP_USE_TRAJECTORY) != None:
+            track_trajectory_rig(active_ob)
+        update_all_trajectory_rigs(context.scene)
+        return {'FINISHED'}